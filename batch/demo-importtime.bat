@@ -0,0 +1,20 @@
+::|============================================================================
+::|
+::|     demo-importtime.bat                         [MS Windows batch file]
+::|
+::|         This batch file reports how long it takes to import the
+::|         simulator modules (using Python's -X importtime option),
+::|         and checks that doing so doesn't load the GUI modules.
+::|         It assumes that an appropriate version of Python is in
+::|         the user's %PATH%.
+::|
+::|----------------------------------------------------------------------------
+@echo off
+
+cd ..\test
+
+python importtime.py %*
+
+echo.
+echo Batch file will terminate in 10 seconds...
+timeout 10
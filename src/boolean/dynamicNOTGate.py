@@ -84,6 +84,7 @@ from numbers import Real    # Used only for type declarations.
 from logmaster import doDebug   # Whether to show debug output.
 
 from functions.binaryDifferentiableFunction import BinaryDifferentiableFunction
+from functions.polynomialFunction           import PolynomialFunction
     # A class for two-argument differentiable functions, which we subclass.
 
 from network.dynamicNode                    import  DynamicNode
@@ -139,7 +140,7 @@ __all__ = [
             #|
             #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
 
-class DynamicNOTFunction(BinaryDifferentiableFunction):
+class DynamicNOTFunction(PolynomialFunction, BinaryDifferentiableFunction):
 
     """This class, a subclass of the class of binary differentiable
        functions, represents interaction functions of the form that we
@@ -191,20 +192,14 @@ class DynamicNOTFunction(BinaryDifferentiableFunction):
 
         inst.stiffness = stiffness    # Remember my stiffness value
         
-        function = lambda x,y:  0.5 * inst.stiffness * (x + y - 1)**2
+        x, y = PolynomialFunction.variables(argName1, argName2)
+        potential = 0.5 * stiffness * (x + y - 1)**2
 
-            # Set up our partial derivatives with respect to x and y.
+            # Do generic initialization for polynomial functions.  (Our
+            # partial derivatives w.r.t. x and y are derived from this.)
 
-        partial = lambda x,y:  inst.stiffness * (x + y - 1)   # partial wrt x or y
-
-        deriv1 = partial    # The two partials are the same
-        deriv2 = partial
-
-            # Do generic initialization for binary differentiable functions.
-
-        BinaryDifferentiableFunction.__init__(inst, name=name, argName1=argName1,
-                                              argName2=argName2, function=function,
-                                              deriv1=deriv1, deriv2=deriv2)
+        PolynomialFunction.__init__(inst, name=name, argNames=[argName1, argName2],
+                                    terms=potential.terms)
 
     #__/ End method DynamicNOTFunction.__init__().
 
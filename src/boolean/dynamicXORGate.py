@@ -89,6 +89,10 @@ from functions.ternaryDifferentiableFunction import (
         # (Our potential energy function is a subclass of this.)
     )
 
+from functions.polynomialFunction import PolynomialFunction
+    # Our potential energy function is a polynomial, which takes
+    # care of evaluating it and its partial derivatives for us.
+
 from network.dynamicNode                import  DynamicNode
 from network.dynamicThreeTerminalGate   import  DynamicThreeTerminalGate
 from network.dynamicNetwork             import  DynamicNetwork
@@ -143,7 +147,7 @@ __all__ = [
             #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
 
 
-class DynamicXORFunction(TernaryDifferentiableFunction):
+class DynamicXORFunction(PolynomialFunction, TernaryDifferentiableFunction):
 
     """This class, a subclass of the class of ternary differentiable
        functions, represents interaction functions of the form that we
@@ -197,22 +201,15 @@ class DynamicXORFunction(TernaryDifferentiableFunction):
 
         me.stiffness = stiffness    # Remember my stiffness value
         
-        function = lambda x, y, z:  0.5 * me.stiffness * (z - x - y + 2*x*y)**2
-
-            # Set up our partial derivatives w.r.t. x, y, and z.
-
-        partial_x = lambda x,y,z: me.stiffness * (2*y - 1) * (z - x - y + 2*x*y)  # partial wrt x
-        partial_y = lambda x,y,z: me.stiffness * (2*x - 1) * (z - x - y + 2*x*y)  # partial wrt y
-        partial_z = lambda x,y,z: me.stiffness *             (z - x - y + 2*x*y)  # partial wrt z
-
-        TernaryDifferentiableFunction.__init__(me, name=name,
-                                               argName1=argName1,
-                                               argName2=argName2,
-                                               argName3=argName3,
-                                               function=function,
-                                               deriv1=partial_x,
-                                               deriv2=partial_y,
-                                               deriv3=partial_z)
+        x, y, z = PolynomialFunction.variables(argName1, argName2, argName3)
+        potential = 0.5 * stiffness * (z - x - y + 2*x*y)**2
+
+            # Do generic initialization for polynomial functions.  (Our
+            # partial derivatives w.r.t. x, y, and z are derived from this.)
+
+        PolynomialFunction.__init__(me, name=name,
+                                    argNames=[argName1, argName2, argName3],
+                                    terms=potential.terms)
 
     #__/ End DynamicXORFunction.__init__()
 
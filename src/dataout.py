@@ -0,0 +1,456 @@
+#|==============================================================================
+#|                          TOP OF FILE:    dataout.py
+#|------------------------------------------------------------------------------
+#|   The below module documentation string will be displayed by pydoc3.
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+"""
+    FILE NAME:              dataout.py          [Python 3 module source file]
+
+    MODULE NAME:            dataout
+
+    SOFTWARE SYSTEM:        Dynamic         (simulator for dynamic networks)
+
+    SOFTWARE COMPONENT:     Dynamic.dataout (simulation data output channel)
+
+
+    MODULE DESCRIPTION:
+    -------------------
+
+        The dataout module provides a dedicated, high-throughput output
+        channel for simulation data samples (such as the CSV rows that
+        are produced by the printDiagnostics() methods of the example
+        networks), which is kept separate from the diagnostic logging
+        facilities provided by the logmaster module.
+
+        Sending bulk data through logmaster is expensive, since every
+        message is turned into a LogRecord, the caller's stack frame is
+        looked up, and the record is passed through every handler and
+        formatter, even though none of this is of any use for raw data.
+        A DataChannel, in contrast, simply accumulates the text rows
+        given to it in a buffer, and writes them out in large batches
+        to a plain buffered file (and, optionally, echoes them to the
+        current standard output stream), whenever either a size
+        threshold (number of rows or number of characters) or a time
+        threshold (age of the oldest buffered row) is exceeded.
+
+        This lets the data output and the diagnostic logging be tuned
+        independently of each other; e.g., the log level can be
+        turned down without losing the data, or the data channel can
+        be disabled altogether while the log stays verbose.
+
+
+    BASIC MODULE USAGE:
+    -------------------
+
+        from dataout import dataChannel
+
+        data = dataChannel()        # Get the default data channel.
+
+        if data.enabled:
+            data.writeRow("%d, %.9f" % (t, q))      # Buffer one row.
+
+        data.flush()    # Force buffered rows out (e.g., end of a run).
+
+
+    PUBLIC CLASSES:
+    ---------------
+
+        Regular classes:
+        ----------------
+
+            DataChannel                                 [module public class]
+
+                A buffered output channel for rows of simulation data.
+
+
+        Exception classes:
+        ------------------
+
+            DataOutError                        [module public exception class]
+
+                Base class for error exceptions in the dataout module.
+
+            ChannelClosedError                  [module public exception class]
+
+                An attempt was made to write to a DataChannel that
+                has already been closed.
+
+
+    PUBLIC FUNCTIONS:
+    -----------------
+
+            dataChannel()                            [module public function]
+
+                Returns the default data channel for this application,
+                creating it if it does not exist yet.
+
+                                                                             """
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#| End of module documentation string.
+#|------------------------------------------------------------------------------
+
+
+    #|==========================================================================
+    #|   1. Module imports.                                [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+        #|======================================================================
+        #|  1.1. Imports of standard python modules.    [module code subsection]
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import sys          # For sys.stdout (looked up at flush time).
+import atexit       # So we can flush buffered data when the program exits.
+
+from time       import  monotonic       # Clock used for the time threshold.
+from threading  import  RLock, Timer    # For thread-safe, timed flushing.
+
+        #|======================================================================
+        #|  1.2. Imports of custom application modules. [module code subsection]
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import logmaster                        # Provides logging capabilities.
+from logmaster import * # ErrorException, appName, getComponentLogger, doDebug
+
+
+    #|==========================================================================
+    #|  2.  Global constants, variables, and objects.      [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+        #|======================================================================
+        #|  2.1.  Special globals.                      [module code subsection]
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+__all__ = [                 # List of all explicitly-exported public names.
+    'DATA_FILENAME',        # Default file name for the default data channel.
+    'DataChannel',          # Buffered output channel for simulation data.
+    'dataChannel',          # Returns the default data channel.
+    'DataOutError',         # Exception classes.
+    'ChannelClosedError',
+    ]
+
+        #|======================================================================
+        #|  2.2.  Public globals.                       [module code subsection]
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+            #|------------------------------------------------------------------
+            #|  DATA_FILENAME:str                  [public global constant]
+            #|
+            #|      Name of the file that the default data channel
+            #|      writes to.  Like logmaster.LOG_FILENAME, it is
+            #|      not really constant; it may be reassigned before
+            #|      dataChannel() is first called.  If it is set to
+            #|      None, the default channel only echoes to stdout.
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+DATA_FILENAME = '../log/' + appName + ".data.csv"
+
+        #|======================================================================
+        #|  2.3.  Private globals.                      [module code subsection]
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+_component = 'dataout'
+_logger = getComponentLogger(_component)     # Module's logger.
+
+_theDataChannel = None      # The default data channel; created on demand.
+_channelsLock = RLock()     # Protects creation of the default channel.
+_openChannels = []          # Channels to flush & close when we exit.
+
+
+    #|==========================================================================
+    #|  3.  Class definitions.                             [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+        #|======================================================================
+        #|  3.1.  Exception classes.                    [module code subsection]
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class DataOutError(ErrorException):     # Error in this data-output module.
+    """This base class is for errors detected in 'dataout', the
+       simulation data output module."""
+    def __init__(inst, msg:str=None):
+        ErrorException.__init__(inst, msg=msg, logger=_logger)
+
+class ChannelClosedError(DataOutError):
+    """An attempt was made to write a row to a DataChannel after
+       that channel had already been closed."""
+    pass
+
+
+        #|======================================================================
+        #|   3.2.  Normal public classes.               [module code subsection]
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+            #|------------------------------------------------------------------
+            #|  DataChannel                                     [public class]
+            #|
+            #|      A DataChannel accepts rows of simulation data
+            #|      (already formatted as strings, without trailing
+            #|      newlines), buffers them, and writes them out in
+            #|      batches to a buffered output file and/or to the
+            #|      current sys.stdout.  A batch is written when any
+            #|      of the following thresholds is reached:
+            #|
+            #|          maxRows  - Number of rows in the buffer.
+            #|          maxChars - Number of characters in the buffer.
+            #|          maxDelay - Age (in seconds) of the oldest row
+            #|                     in the buffer.  This is enforced by
+            #|                     a one-shot timer thread which is
+            #|                     armed when a row is added to an
+            #|                     empty buffer, so rows never sit in
+            #|                     the buffer for long even if the
+            #|                     writer goes quiet.
+            #|
+            #|      No caller lookup, record construction or formatting
+            #|      is done; the rows are written out verbatim.
+            #|
+            #|      All methods may be called from any thread.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class DataChannel:
+
+    """A buffered output channel for rows of simulation data.  Rows
+       are accumulated in memory and written out in batches, either
+       to a file, or echoed to the current stdout, or both, whenever
+       a row-count, character-count, or time threshold is exceeded."""
+
+    defaultMaxRows  = 256       # Flush after this many buffered rows,
+    defaultMaxChars = 65536     # or after this many buffered characters,
+    defaultMaxDelay = 0.5       # or when the oldest row is this old (secs).
+
+    def __init__(inst, filename:str=None, stream=None, echo:bool=False,
+                 maxRows:int=None, maxChars:int=None, maxDelay:float=None,
+                 enabled:bool=True):
+
+        """Creates a new data channel.  If <filename> is given, rows
+           are appended to that file (opened lazily, on first flush).
+           If <stream> is given, rows are written to that file-like
+           object.  If <echo> is true, rows are also written to
+           whatever sys.stdout is at the time of the flush (so that
+           they still show up in a console window that has grabbed
+           stdout).  The remaining arguments override the default
+           flush thresholds; a <maxDelay> of 0 disables timed flushes.
+           Writes are ignored while <enabled> is false."""
+
+        if maxRows  is None:    maxRows  = inst.defaultMaxRows
+        if maxChars is None:    maxChars = inst.defaultMaxChars
+        if maxDelay is None:    maxDelay = inst.defaultMaxDelay
+
+        inst.lock     = RLock()     # Reentrant mutex for our state.
+
+        inst.filename = filename    # File to append rows to, or None.
+        inst.stream   = stream      # Other file-like sink, or None.
+        inst.echo     = echo        # Also echo rows to sys.stdout?
+
+        inst.maxRows  = maxRows     # Flush thresholds.
+        inst.maxChars = maxChars
+        inst.maxDelay = maxDelay
+
+        inst.enabled  = enabled     # Callers check this before formatting.
+        inst.closed   = False       # Set once close() has been called.
+
+        inst._file    = None        # Opened lazily at first flush.
+        inst._rows    = []          # Buffered rows (without newlines).
+        inst._nChars  = 0           # Total characters in buffered rows.
+        inst._since   = None        # Time at which oldest row was buffered.
+        inst._timer   = None        # Pending timed-flush timer, if any.
+
+        with _channelsLock:
+            _openChannels.append(inst)  # Make sure we get flushed at exit.
+
+    #__/ End method DataChannel.__init__().
+
+
+        #|----------------------------------------------------------------------
+        #|  inst.writeRow(row)                          [public instance method]
+        #|
+        #|      Buffers a single row of data (a string, without a
+        #|      trailing newline), flushing the buffer if doing so
+        #|      reaches the row-count or character-count threshold.
+        #|
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def writeRow(inst, row:str):
+
+        """Buffers one row of data for output.  The row should not
+           include a trailing newline; one is added on output."""
+
+        if not inst.enabled: return     # Quietly discard if disabled.
+
+        with inst.lock:
+
+            if inst.closed:
+                raise ChannelClosedError("DataChannel.writeRow(): Can't "
+                                         "write to a closed data channel.")
+
+            if not inst._rows:                  # First row in this batch?
+                inst._since = monotonic()           # Remember when it came.
+                inst._armTimer()                    # Start the delay timer.
+
+            inst._rows.append(row)
+            inst._nChars += len(row) + 1
+
+            if (len(inst._rows) >= inst.maxRows or
+                inst._nChars >= inst.maxChars):
+                inst.flush()
+
+    #__/ End method DataChannel.writeRow().
+
+
+    def writeRows(inst, rows):
+
+        """Buffers each of the rows in the given iterable, as if
+           by calling writeRow() on each of them in turn."""
+
+        for row in rows:
+            inst.writeRow(row)
+
+
+        #|----------------------------------------------------------------------
+        #|  inst.flush()                                [public instance method]
+        #|
+        #|      Writes out all of the currently buffered rows as a
+        #|      single batch, to each of our configured sinks.
+        #|
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def flush(inst):
+
+        """Writes out all buffered rows now, as one batch."""
+
+        with inst.lock:
+
+            inst._cancelTimer()
+
+            if not inst._rows: return       # Nothing to do.
+
+            text = "\n".join(inst._rows) + "\n"     # Whole batch at once.
+
+            inst._rows   = []
+            inst._nChars = 0
+            inst._since  = None
+
+            if inst.filename is not None:
+                if inst._file is None:
+                    inst._file = open(inst.filename, 'a')
+                inst._file.write(text)
+                inst._file.flush()
+
+            if inst.stream is not None:
+                inst.stream.write(text)
+                inst.stream.flush()
+
+            if inst.echo:
+                out = sys.stdout            # Whatever it is right now.
+                if out is not None:
+                    out.write(text)
+                    out.flush()
+
+    #__/ End method DataChannel.flush().
+
+
+        #|----------------------------------------------------------------------
+        #|  inst.close()                                [public instance method]
+        #|
+        #|      Flushes any remaining rows and closes our file (if
+        #|      we opened one).  Subsequent writes will raise a
+        #|      ChannelClosedError.  Closing twice is harmless.
+        #|
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def close(inst):
+
+        """Flushes any buffered rows and closes the channel."""
+
+        with inst.lock:
+
+            if inst.closed: return
+
+            inst.flush()
+            inst.closed = True
+
+            if inst._file is not None:
+                inst._file.close()
+                inst._file = None
+
+        with _channelsLock:
+            if inst in _openChannels:
+                _openChannels.remove(inst)
+
+    #__/ End method DataChannel.close().
+
+
+        #|----------------------------------------------------------------------
+        #|  Private instance methods.                   [class code section]
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def _armTimer(inst):
+        # Start a one-shot timer to flush the buffer after maxDelay seconds.
+        # Called with inst.lock held, when a row goes into an empty buffer.
+        if inst.maxDelay and inst._timer is None:
+            inst._timer = Timer(inst.maxDelay, inst._timedFlush)
+            inst._timer.daemon = True       # Don't hold up program exit.
+            inst._timer.name = "dataFlushTimer"
+            inst._timer.start()
+
+    def _cancelTimer(inst):
+        # Cancel the pending timed flush, if any.  Called with inst.lock held.
+        if inst._timer is not None:
+            inst._timer.cancel()
+            inst._timer = None
+
+    def _timedFlush(inst):
+        # Runs in the timer thread.  The timer is cleared first so that
+        # flush() doesn't try to cancel the very timer we're running in.
+        with inst.lock:
+            inst._timer = None
+            if doDebug:
+                _logger.debug("DataChannel: Flushing %d rows after timeout."
+                              % len(inst._rows))
+            inst.flush()
+
+#__/ End class DataChannel.
+
+
+    #|==========================================================================
+    #|  4.  Function definitions.                          [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+        #|----------------------------------------------------------------------
+        #|  dataChannel()                                     [public function]
+        #|
+        #|      Returns the default data channel for this application,
+        #|      creating it on first use.  The default channel appends
+        #|      to DATA_FILENAME and echoes the rows to stdout, which
+        #|      matches what users of printDiagnostics() used to see.
+        #|
+        #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+def dataChannel() -> DataChannel:
+
+    """Returns the default data channel, creating it if necessary."""
+
+    global _theDataChannel
+
+    with _channelsLock:
+        if _theDataChannel is None or _theDataChannel.closed:
+            _theDataChannel = DataChannel(filename=DATA_FILENAME, echo=True)
+        return _theDataChannel
+
+
+def _closeAllChannels():
+    # Flush and close every channel that is still open.  Registered
+    # with atexit below, so that no buffered data is lost on exit.
+    with _channelsLock:
+        channels = list(_openChannels)
+    for channel in channels:
+        try:
+            channel.close()
+        except Exception:
+            pass        # Nowhere sensible left to report this.
+
+atexit.register(_closeAllChannels)
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#                   BOTTOM OF FILE:    dataout.py
+#===============================================================================
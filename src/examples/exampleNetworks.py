@@ -124,6 +124,7 @@ from . import _logger       # Our component logger.
 
 from    logmaster   import  doDebug, doNorm   # Whether to show debug/normal output.
 from    fixed       import  Fixed     # Our custom class for fixed-point numbers.
+from    dataout     import  dataChannel     # Buffered output channel for CSV data.
 
 from    network.dynamicNetwork      import  DynamicNetwork, netName     # Dynamic networks.
 from    .dynamicMemCell             import  DynamicMemCell              # Memory-cell component.
@@ -420,7 +421,7 @@ class InverterNet(DynamicNetwork):
         #|----------------------------------------------------------------------
         #| inst.printDiagnostics()                      [public instance method]
         #|
-        #|      Displays some network diagnostics to standard output
+        #|      Writes some network diagnostics to the data channel
         #|      as a CSV format row.  Column order is
         #|
         #|          Xqt,Xq,Xpt,Xp,Yqt,Yq,Ypt,Yp
@@ -442,14 +443,15 @@ class InverterNet(DynamicNetwork):
         inCoords  = me._inNode.coord    # Generalized coordinates of input.
         outCoords = me._outNode.coord   # Generalized coordinates of output.
         
-        if doNorm:
-            _logger.normal("%d, %.9f, %d, %.9f, %d, %.9f, %d, %.9f" %
-                           (inCoords.position.time,  inCoords.position(),
-                            inCoords.momentum.time,  inCoords.momentum(),
-                            outCoords.position.time, outCoords.position(),
-                            outCoords.momentum.time, outCoords.momentum()))
+        data = dataChannel()    # Buffered channel for simulation data.
+        if data.enabled:
+            data.writeRow("%d, %.9f, %d, %.9f, %d, %.9f, %d, %.9f" %
+                          (inCoords.position.time,  inCoords.position(),
+                           inCoords.momentum.time,  inCoords.momentum(),
+                           outCoords.position.time, outCoords.position(),
+                           outCoords.momentum.time, outCoords.momentum()))
             
-        #__/ End if doNorm.
+        #__/ End if data.enabled.
         
     #__/ End method printDiagnostics().
 
@@ -545,7 +547,7 @@ class AndGateNet(DynamicNetwork):
         #|----------------------------------------------------------------------
         #| inst.printDiagnostics()                      [public instance method]
         #|
-        #|      Displays some network diagnostics to standard output
+        #|      Writes some network diagnostics to the data channel
         #|      as a CSV format row.  Column order is
         #|
         #|          Aqt,Aq,Apt,Ap,Bqt,Bq,Bpt,Bp,Qqt,Qq,Qpt,Qp
@@ -568,22 +570,23 @@ class AndGateNet(DynamicNetwork):
         Bcoords = me._nodeB.coord
         Qcoords = me._nodeQ.coord
 
-        if doNorm:
-            _logger.normal("%d, %.9f, %d, %.9f, "
-                           "%d, %.9f, %d, %.9f, "
-                           "%d, %.9f, %d, %.9f" %
+        data = dataChannel()    # Buffered channel for simulation data.
+        if data.enabled:
+            data.writeRow("%d, %.9f, %d, %.9f, "
+                          "%d, %.9f, %d, %.9f, "
+                          "%d, %.9f, %d, %.9f" %
+                          
+                          (Acoords.position.time, Acoords.position(),
+                           Acoords.momentum.time, Acoords.momentum(),
                            
-                           (Acoords.position.time, Acoords.position(),
-                            Acoords.momentum.time, Acoords.momentum(),
-                            
-                            Bcoords.position.time, Bcoords.position(),
-                            Bcoords.momentum.time, Bcoords.momentum(),
-                            
-                            Qcoords.position.time, Qcoords.position(),
-                            Qcoords.momentum.time, Qcoords.momentum()))
-            #______________/ End _logger.normal() call.
+                           Bcoords.position.time, Bcoords.position(),
+                           Bcoords.momentum.time, Bcoords.momentum(),
+                           
+                           Qcoords.position.time, Qcoords.position(),
+                           Qcoords.momentum.time, Qcoords.momentum()))
+            #_____________/ End data.writeRow() call.
             
-        #__/ End if doNorm.
+        #__/ End if data.enabled.
             
     #__/ End AndGateNet.printDiagnostics()
 
@@ -640,7 +643,7 @@ class AndGateNet(DynamicNetwork):
         #|----------------------------------------------------------------------
         #|  inst.printCsvHeader()                       [public instance method]
         #|
-        #|      Prints to standard output one CSV row, which is the
+        #|      Writes to the data channel one CSV row, which is the
         #|      header row for the data rows that are generated by
         #|      the printDiagnostics() method.
         #|
@@ -648,16 +651,17 @@ class AndGateNet(DynamicNetwork):
 
     def printCsvHeader(me):
 
-        """ Prints to standard output one CSV row, which is the
+        """ Writes to the data channel one CSV row, which is the
             header row for the data rows that are generated by
             the printDiagnostics() method.                            """
         
-        if doNorm:
-            _logger.normal("A.qt, A.q, A.pt, A.p, "
-                           "B.qt, B.q, B.pt, B.p, "
-                           "Q.qt, Q.q, Q.pt, Q.p")
-            #______________/ End _logger.normal() call.            
-        #__/ End if doNorm.
+        data = dataChannel()    # Buffered channel for simulation data.
+        if data.enabled:
+            data.writeRow("A.qt, A.q, A.pt, A.p, "
+                          "B.qt, B.q, B.pt, B.p, "
+                          "Q.qt, Q.q, Q.pt, Q.p")
+            #_____________/ End data.writeRow() call.            
+        #__/ End if data.enabled.
     #__/ End AndGateNet.printCsvHeader().
             
 
@@ -811,7 +815,7 @@ class HalfAdderNet(DynamicNetwork):
         #|----------------------------------------------------------------------
         #| inst.printDiagnostics()                      [public instance method]
         #|
-        #|      Displays some network diagnostics to standard output
+        #|      Writes some network diagnostics to the data channel
         #|      as a CSV format row.  Column order is
         #|
         #|          Aqt,Aq,Apt,Ap,Bqt,Bq,Bpt,Bp,
@@ -831,24 +835,25 @@ class HalfAdderNet(DynamicNetwork):
            of position and momentum coordinates of the four nodes A,
            B (inputs) and S1, S0 (output)."""
 
-        if doNorm:
+        data = dataChannel()    # Buffered channel for simulation data.
+        if data.enabled:
             
             nodeA_c = me._nodeA.coord;  nodeS1_c = me._nodeS1.coord
             nodeB_c = me._nodeB.coord;  nodeS0_c = me._nodeS0.coord
             
-            _logger.normal(("%d, %.9f, "*7 + "%d, %.9f") %
-                           (nodeA_c.position.time, nodeA_c.position(),
-                            nodeA_c.momentum.time, nodeA_c.momentum(),
-                            nodeB_c.position.time, nodeB_c.position(),
-                            nodeB_c.momentum.time, nodeB_c.momentum(),
-                            nodeS1_c.position.time, nodeS1_c.position(),
-                            nodeS1_c.momentum.time, nodeS1_c.momentum(),
-                            nodeS0_c.position.time, nodeS0_c.position(),
-                            nodeS0_c.momentum.time, nodeS0_c.momentum()
-                            ))
-            #______________/ End _logger.normal() call.
+            data.writeRow(("%d, %.9f, "*7 + "%d, %.9f") %
+                          (nodeA_c.position.time, nodeA_c.position(),
+                           nodeA_c.momentum.time, nodeA_c.momentum(),
+                           nodeB_c.position.time, nodeB_c.position(),
+                           nodeB_c.momentum.time, nodeB_c.momentum(),
+                           nodeS1_c.position.time, nodeS1_c.position(),
+                           nodeS1_c.momentum.time, nodeS1_c.momentum(),
+                           nodeS0_c.position.time, nodeS0_c.position(),
+                           nodeS0_c.momentum.time, nodeS0_c.momentum()
+                           ))
+            #_____________/ End data.writeRow() call.
             
-        #__/ End if doNorm.
+        #__/ End if data.enabled.
             
     #__/ End HalfAdderNet.printDiagnostics()
 
@@ -908,7 +913,7 @@ class HalfAdderNet(DynamicNetwork):
         #|----------------------------------------------------------------------
         #|  inst.printCsvHeader()                       [public instance method]
         #|
-        #|      Prints to standard output one CSV row, which is the
+        #|      Writes to the data channel one CSV row, which is the
         #|      header row for the data rows that are generated by
         #|      the printDiagnostics() method.
         #|
@@ -916,17 +921,18 @@ class HalfAdderNet(DynamicNetwork):
 
     def printCsvHeader(me):
 
-        """ Prints to standard output one CSV row, which is the
+        """ Writes to the data channel one CSV row, which is the
             header row for the data rows that are generated by
             the printDiagnostics() method.                            """
         
-        if doNorm:
-            _logger.normal("A.qt, A.q, A.pt, A.p, "
-                           "B.qt, B.q, B.pt, B.p, "
-                           "S1.qt, S1.q, S1.pt, S1.p, "
-                           "S0.qt, S0.q, S0.pt, S0.p")
-            #______________/ End _logger.normal() call.            
-        #__/ End if doNorm.
+        data = dataChannel()    # Buffered channel for simulation data.
+        if data.enabled:
+            data.writeRow("A.qt, A.q, A.pt, A.p, "
+                          "B.qt, B.q, B.pt, B.p, "
+                          "S1.qt, S1.q, S1.pt, S1.p, "
+                          "S0.qt, S0.q, S0.pt, S0.p")
+            #_____________/ End data.writeRow() call.            
+        #__/ End if data.enabled.
     #__/ End HalfAdderNet.printCsvHeader().
 
 
@@ -1115,7 +1121,7 @@ class FullAdderNet(DynamicNetwork):
         #|----------------------------------------------------------------------
         #| inst.printDiagnostics()                      [public instance method]
         #|
-        #|      Displays some network diagnostics to standard output
+        #|      Writes some network diagnostics to the data channel
         #|      as a CSV format row.  Column order is
         #|
         #|          Aqt,Aq,Apt,Ap,Bqt,Bq,Bpt,Bp,Cqt,Cq,Cpt,Cp,
@@ -1135,7 +1141,8 @@ class FullAdderNet(DynamicNetwork):
            of position and momentum coordinates of the four nodes A,
            B, C (inputs) and S1, S0 (output)."""
 
-        if doNorm:
+        data = dataChannel()    # Buffered channel for simulation data.
+        if data.enabled:
             
             nodeA_c = me._nodeA.coord
             nodeB_c = me._nodeB.coord
@@ -1143,19 +1150,19 @@ class FullAdderNet(DynamicNetwork):
             nodeS0_c = me._nodeS0.coord
             nodeS1_c = me._nodeS1.coord
             
-            _logger.normal(("%d, %.9f, "*9 + "%d, %.9f") %
-                           (nodeA_c.position.time, nodeA_c.position(),
-                            nodeA_c.momentum.time, nodeA_c.momentum(),
-                            nodeB_c.position.time, nodeB_c.position(),
-                            nodeB_c.momentum.time, nodeB_c.momentum(),
-                            nodeC_c.position.time, nodeC_c.position(),
-                            nodeC_c.momentum.time, nodeC_c.momentum(),
-                            nodeS1_c.position.time, nodeS1_c.position(),
-                            nodeS1_c.momentum.time, nodeS1_c.momentum(),
-                            nodeS0_c.position.time, nodeS0_c.position(),
-                            nodeS0_c.momentum.time, nodeS0_c.momentum()))
-            #______________/ End _logger.normal() call.            
-        #__/ End if doNorm.
+            data.writeRow(("%d, %.9f, "*9 + "%d, %.9f") %
+                          (nodeA_c.position.time, nodeA_c.position(),
+                           nodeA_c.momentum.time, nodeA_c.momentum(),
+                           nodeB_c.position.time, nodeB_c.position(),
+                           nodeB_c.momentum.time, nodeB_c.momentum(),
+                           nodeC_c.position.time, nodeC_c.position(),
+                           nodeC_c.momentum.time, nodeC_c.momentum(),
+                           nodeS1_c.position.time, nodeS1_c.position(),
+                           nodeS1_c.momentum.time, nodeS1_c.momentum(),
+                           nodeS0_c.position.time, nodeS0_c.position(),
+                           nodeS0_c.momentum.time, nodeS0_c.momentum()))
+            #_____________/ End data.writeRow() call.            
+        #__/ End if data.enabled.
     #__/ End FullAdderNet.printDiagnostics()
 
 
@@ -1216,7 +1223,7 @@ class FullAdderNet(DynamicNetwork):
         #|----------------------------------------------------------------------
         #|  inst.printCsvHeader()                       [public instance method]
         #|
-        #|      Prints to standard output one CSV row, which is the
+        #|      Writes to the data channel one CSV row, which is the
         #|      header row for the data rows that are generated by
         #|      the printDiagnostics() method.
         #|
@@ -1224,16 +1231,17 @@ class FullAdderNet(DynamicNetwork):
 
     def printCsvHeader(me):
 
-        """ Prints to standard output one CSV row, which is the
+        """ Writes to the data channel one CSV row, which is the
             header row for the data rows that are generated by
             the printDiagnostics() method.                            """
         
-        if doNorm:
-            _logger.normal("A.qt, A.q, A.pt, A.p, "
-                           "B.qt, B.q, B.pt, B.p, "
-                           "C.qt, C.q, C.pt, C.p, "
-                           "S1.qt, S1.q, S1.pt, S1.p, "
-                           "S0.qt, S0.q, S0.pt, S0.p")
+        data = dataChannel()    # Buffered channel for simulation data.
+        if data.enabled:
+            data.writeRow("A.qt, A.q, A.pt, A.p, "
+                          "B.qt, B.q, B.pt, B.p, "
+                          "C.qt, C.q, C.pt, C.p, "
+                          "S1.qt, S1.q, S1.pt, S1.p, "
+                          "S0.qt, S0.q, S0.pt, S0.p")
 
 
         #|----------------------------------------------------------------------
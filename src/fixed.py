@@ -521,6 +521,22 @@ class Fixed(numbers.Rational):
     def quantum(self):
         return fractions.Fraction(1, Fixed._denominator)
 
+    #-- .quanta - The value of this number in units of the quantum, as an
+    #       integer (i.e., the numerator N of N/D, not reduced).
+    #
+    #   Fixed.fromQuanta(N) - Makes the Fixed number N/D directly, for code
+    #       that does its own integer arithmetic on quanta.
+
+    @property
+    def quanta(self):
+        return self._numerator
+
+    @classmethod
+    def fromQuanta(cls, quanta:int):
+        result = cls.__new__(cls)
+        result._numerator = quanta
+        return result
+
 #__/ End class Fixed.
     
 #^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
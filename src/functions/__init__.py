@@ -21,6 +21,8 @@ __all__ = [
     'unaryDifferentiableFunction',
     'binaryDifferentiableFunction',
     'ternaryDifferentiableFunction',
+    'polynomialFunction',
+    'tabulatedUnaryFunction',
     'linearFunction',
     'quadraticFunction',    # We should have cubicFunction here but it's not made yet
     'quarticFunction',
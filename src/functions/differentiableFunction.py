@@ -1,12 +1,28 @@
 from typing     import Callable,Iterable
-from inspect    import getargspec
+from inspect    import getfullargspec, Signature, Parameter
+from numbers    import Number
+from array      import array
+import re
 
 import logmaster; from logmaster import *
 
 # Base class from which to derive subclasses for particular types
 # of differentiable functions (of any number of variables).
-
-__all__ = ['BaseDifferentiableFunction']
+#
+# If a function is given without its partial derivatives, they are
+# derived automatically (see "Automatic differentiation," below).
+#
+# Functions can also be evaluated on arrays:  If the arguments are
+# equal-length sequences of values (of one of the ARRAY_TYPES), the
+# function (or partial) is evaluated elementwise, giving a list.  So
+# all the instances of some kind of gate can be evaluated with one
+# call, on arrays of the values of their nodes.  Subclasses can make
+# this faster by overriding .evalArray() with a batch kernel that
+# doesn't make a Python call per element.
+
+__all__ = ['BaseDifferentiableFunction', 'Dual', 'deriveGradient', 'ARRAY_TYPES']
+
+ARRAY_TYPES = (list, tuple, array)      # Argument types taken to be arrays.
 
 logger = getLogger(logmaster.sysName + '.functions')
 
@@ -28,6 +44,12 @@ class BaseDifferentiableFunction:
     #   ._argIndex:dict - map from argument names to their indices
     #   ._function:Callable - lambda from argument values to function value
     #   ._partials:Iterable[Callable] - list of partial-derivative lambdas
+    #   ._gradient:Callable - if the partials were derived automatically,
+    #       the fused function that computes all of them at once
+    #   ._partialArrays:list[Callable] - if the partials were derived
+    #       automatically, batch kernels that evaluate them on arrays
+    #   ._secondPartials:dict - map from argument index i to the list of
+    #       partials of our ith partial, derived when first needed
 
     # Instance private methods:
     #
@@ -40,7 +62,12 @@ class BaseDifferentiableFunction:
     #
     #   inst.__init__(<argnames>, [<function>,] [<partials>]) -
     #
-    #       Instance initializer.
+    #       Instance initializer.  If <function> is given but <partials>
+    #       aren't, they're derived from the function.
+
+    _gradient = None        # No fused gradient function unless we derive one,
+    _partialArrays = None   # and no batch kernels for the partials either.
+    _secondPartials = None  # Second partials are only derived on request.
 
     def __init__(inst, name:str=None,
                  argNames:Iterable[str]=None,
@@ -73,7 +100,7 @@ class BaseDifferentiableFunction:
             # user is overriding it.
 
             if argNames == None:
-                argNames = getargspec(function).args
+                argNames = getfullargspec(function).args
 
         # If the name is still unset at this point,
         # default it to 'f' (for "function").
@@ -89,13 +116,22 @@ class BaseDifferentiableFunction:
             
         inst._setArgs(*argNames)
 
-        if partials != None:  inst._partials = partials
+        if partials:
+            inst._partials = partials
+        elif function != None:
+            inst._gradient, inst._partials, inst._partialArrays = \
+                deriveGradient(function, len(argNames))
+        elif partials != None:
+            inst._partials = partials
 
     # Function application operator.
     #   For applying a BaseDifferentiableFunction instance to a
-    #   list of arguments.
+    #   list of arguments (or to arrays of them; see above).
 
     def __call__(this, *argVals):
+        if argVals and isinstance(argVals[0], ARRAY_TYPES):
+            return this.evalArray(*argVals)
+
         value = this.function(*argVals)
 
         if doDebug:
@@ -123,6 +159,66 @@ class BaseDifferentiableFunction:
                                                                             len(this._partials)))
             raise e
 
+    # Returns the second partial derivative of this function with respect to
+    # its <i>th and <j>th arguments, as a callable like partialDerivWRT()'s.
+    # If our <i>th partial is itself a differentiable function (as, e.g., a
+    # polynomial's partials are), it's just that function's <j>th partial.
+    # Otherwise, the <i>th partial is differentiated automatically, the same
+    # way (see below), the first time any of its partials is asked for.
+
+    def secondPartialDerivWRT(this, i:int, j:int):
+        partial = this.partialDerivWRT(i)
+        if isinstance(partial, BaseDifferentiableFunction):
+            return partial.partialDerivWRT(j)
+        if this._secondPartials is None:
+            this._secondPartials = dict()
+        if i not in this._secondPartials:
+            gradient, partials, arrays = deriveGradient(partial, len(this._argNames))
+            this._secondPartials[i] = partials
+        return this._secondPartials[i][j]
+
+    # Returns the Hessian matrix of this function (the tuple of its rows,
+    # each the tuple of second partials) at the given point.
+
+    def hessian(this, *argVals) -> tuple:
+        n = len(this._argNames)
+        return tuple(tuple(this.secondPartialDerivWRT(i, j)(*argVals) for j in range(n))
+                     for i in range(n))
+
+    # Returns the tuple of all of our partial derivatives at the given
+    # point.  If they were derived automatically, this is done in one go.
+
+    def gradient(this, *argVals) -> tuple:
+        if this._gradient is not None:
+            return this._gradient(*argVals)
+        return tuple(partial(*argVals) for partial in this.partials)
+
+    # Array-valued evaluation:  Given an array of values for each of our
+    # arguments, returns the list of our values (or of our gradients, or
+    # of our partial derivative with respect to the <argumentIndex>th
+    # argument) at each point.
+
+    def evalArray(this, *argArrays) -> list:
+        return list(map(this.function, *argArrays))
+
+    def partialArray(this, argumentIndex:int, *argArrays) -> list:
+        partial = this.partialDerivWRT(argumentIndex)
+        if isinstance(partial, BaseDifferentiableFunction):
+            return partial.evalArray(*argArrays)
+        if this._partialArrays is not None:
+            return this._partialArrays[argumentIndex](*argArrays)
+        return list(map(partial, *argArrays))
+
+    def secondPartialArray(this, i:int, j:int, *argArrays) -> list:
+        partial = this.secondPartialDerivWRT(i, j)
+        if isinstance(partial, BaseDifferentiableFunction):
+            return partial.evalArray(*argArrays)
+        return list(map(partial, *argArrays))
+
+    def gradientArray(this, *argArrays) -> tuple:
+        return tuple(this.partialArray(i, *argArrays)
+                     for i in range(len(this._argNames)))
+
     # ._addArg(argName) - Adds an argument named <argName> to this
     #   function's argument list.
 
@@ -142,12 +238,19 @@ class BaseDifferentiableFunction:
         
         this._argIndex[argName] = pos
 
+            # Keep our signature up to date, so that code that inspects us
+            # (such as PartiallyEvaluatableFunction) sees our arguments.
+
+        this.__signature__ = Signature([Parameter(name, Parameter.POSITIONAL_OR_KEYWORD)
+                                        for name in this._argNames])
+
     # ._setArgs(<arg1>[, <argi>]*) - Set the argument list of this
     #       function to the given string(s).
 
     def _setArgs(this, *names):
         this._argNames = []
         this._argIndex = dict()
+        this.__signature__ = Signature()
         for name in names:
             this._addArg(name)    
 
@@ -161,5 +264,376 @@ class BaseDifferentiableFunction:
     def argNames(this):
         return this._argNames
 
+        # List of all our partial derivatives, in argument order.
+
+    @property
+    def partials(this):
+        return [this.partialDerivWRT(i) for i in range(len(this._argNames))]
+
     # Public methods that derived classes should define:
     
+
+
+#|==============================================================================
+#|
+#|      Automatic differentiation.
+#|
+#|  To differentiate a function given only as a Python callable, we use
+#|  forward-mode automatic differentiation, with dual numbers:  A Dual
+#|  carries a value together with its gradient (the tuple of its partial
+#|  derivatives with respect to each of the function's arguments), and
+#|  arithmetic on Duals carries the gradients along by the usual rules.
+#|  Calling the function on Duals for its arguments (with unit gradients)
+#|  thus gives us its value and all of its partials at once.
+#|
+#|  Doing that on every call would be slow, though.  So deriveGradient()
+#|  first tries to trace the function:  It's called just once, on tracer
+#|  objects that record the arithmetic done on them, and from the record
+#|  we generate straight-line Python code that does the same arithmetic
+#|  as the dual numbers would have, with all the zero terms left out.
+#|  That gives us a single fused gradient function that's about as fast
+#|  as hand-coded partials, plus a separate function for each partial
+#|  (with only the code that partial needs).
+#|
+#|  Tracing only works if the function does nothing with its arguments
+#|  but arithmetic (+, -, *, / and powers with constant exponents), in
+#|  a way that doesn't depend on their values.  That covers polynomial
+#|  and rational potentials.  For anything else (e.g., a function that
+#|  branches on its arguments' values), we fall back to evaluating the
+#|  function on Duals at each call.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    # Dual [module public class] - A value along with its gradient.  Numbers
+    # mixed in with Duals are treated as constants.  Powers must have
+    # constant exponents.
+
+class Dual:
+
+    __slots__ = ('value', 'grad')
+
+    def __init__(self, value, grad:tuple):
+        self.value = value
+        self.grad = grad
+
+    def __repr__(self):
+        return 'Dual(%r, %r)' % (self.value, self.grad)
+
+    def __add__(a, b):
+        if isinstance(b, Dual):
+            return Dual(a.value + b.value, tuple(x + y for x, y in zip(a.grad, b.grad)))
+        return Dual(a.value + b, a.grad)
+
+    __radd__ = __add__
+
+    def __sub__(a, b):
+        if isinstance(b, Dual):
+            return Dual(a.value - b.value, tuple(x - y for x, y in zip(a.grad, b.grad)))
+        return Dual(a.value - b, a.grad)
+
+    def __rsub__(a, b):
+        return Dual(b - a.value, tuple(-x for x in a.grad))
+
+    def __neg__(a):
+        return Dual(-a.value, tuple(-x for x in a.grad))
+
+    def __pos__(a):
+        return a
+
+    def __mul__(a, b):
+        if isinstance(b, Dual):
+            return Dual(a.value * b.value, tuple(x*b.value + a.value*y
+                                                 for x, y in zip(a.grad, b.grad)))
+        return Dual(a.value * b, tuple(x*b for x in a.grad))
+
+    __rmul__ = __mul__
+
+    def __truediv__(a, b):
+        if isinstance(b, Dual):
+            value = a.value / b.value
+            return Dual(value, tuple((x - value*y) / b.value
+                                     for x, y in zip(a.grad, b.grad)))
+        return Dual(a.value / b, tuple(x / b for x in a.grad))
+
+    def __rtruediv__(a, b):
+        value = b / a.value
+        return Dual(value, tuple(-value*x / a.value for x in a.grad))
+
+    def __pow__(a, k):
+        if isinstance(k, Dual):
+            return NotImplemented
+        factor = k * a.value**(k - 1)
+        return Dual(a.value**k, tuple(factor*x for x in a.grad))
+
+        # Comparisons just compare values, so functions can branch on them.
+
+    def _valueOf(x):
+        return x.value if isinstance(x, Dual) else x
+
+    def __lt__(a, b):   return a.value <  Dual._valueOf(b)
+    def __le__(a, b):   return a.value <= Dual._valueOf(b)
+    def __gt__(a, b):   return a.value >  Dual._valueOf(b)
+    def __ge__(a, b):   return a.value >= Dual._valueOf(b)
+
+#__/ End class Dual.
+
+
+    # deriveGradient() [module public function] - Derives the partial
+    # derivatives of <function>, a callable of <nArgs> arguments, as
+    # described above.  Returns a triple (gradient, partials, arrays),
+    # where gradient(*args) returns the tuple of all the partials at
+    # once, partials is a list of functions for the individual partials,
+    # and arrays is a list of batch kernels that evaluate them on arrays
+    # of argument values (or None, if the function couldn't be traced).
+
+def deriveGradient(function:Callable, nArgs:int):
+    try:
+        tape, result = _trace(function, nArgs)
+    except Exception:
+        return _dualGradient(function, nArgs) + (None,)
+    gradient = _generate(tape, result, nArgs, list(range(nArgs)))
+    partials = [_generate(tape, result, nArgs, i) for i in range(nArgs)]
+    arrays = [_generate(tape, result, nArgs, i, array=True) for i in range(nArgs)]
+    return gradient, partials, arrays
+
+
+    # Raised by tracers when the function does something we can't record.
+
+class _Untraceable(Exception): pass
+
+    # _Traced [module private class] - A tracer, standing in for the value
+    # of the <index>th entry of its tape (entries 0 to nArgs-1 are the
+    # function's arguments).  Each operation on it appends an entry
+    # (op, a, b) to the tape, where a and b are tracers or constants.
+
+class _Traced:
+
+    __slots__ = ('tape', 'index')
+
+    def __init__(self, tape:list, index:int):
+        self.tape = tape
+        self.index = index
+
+    def _record(self, op:str, a, b=None):
+        if isinstance(a, _Traced) and a.tape is not self.tape or \
+           isinstance(b, _Traced) and b.tape is not self.tape:
+            raise _Untraceable("mixing traces")
+        if not isinstance(a, (_Traced, Number)) or \
+           not isinstance(b, (_Traced, Number, type(None))):
+            return NotImplemented
+        self.tape.append((op, a, b))
+        return _Traced(self.tape, len(self.tape) - 1)
+
+    def __add__(a, b):      return a._record('+', a, b)
+    def __radd__(a, b):     return a._record('+', b, a)
+    def __sub__(a, b):      return a._record('-', a, b)
+    def __rsub__(a, b):     return a._record('-', b, a)
+    def __mul__(a, b):      return a._record('*', a, b)
+    def __rmul__(a, b):     return a._record('*', b, a)
+    def __truediv__(a, b):  return a._record('/', a, b)
+    def __rtruediv__(a, b): return a._record('/', b, a)
+    def __neg__(a):         return a._record('neg', a)
+    def __pos__(a):         return a
+
+    def __pow__(a, k):
+        if not isinstance(k, Number):
+            raise _Untraceable("non-constant exponent")
+        return a._record('**', a, k)
+
+    def __rpow__(a, b):
+        raise _Untraceable("non-constant exponent")
+
+    def _untraceable(self, *args):
+        raise _Untraceable("value-dependent operation")
+
+    __bool__ = __float__ = __int__ = __index__ = _untraceable
+    __lt__ = __le__ = __gt__ = __ge__ = __eq__ = __ne__ = _untraceable
+    __abs__ = __floor__ = __ceil__ = __round__ = __trunc__ = _untraceable
+
+    __hash__ = object.__hash__
+
+#__/ End class _Traced.
+
+
+    # Calls <function> on tracers, returning the tape and its result (a
+    # tracer or a constant).
+
+def _trace(function:Callable, nArgs:int):
+    tape = [('arg', i, None) for i in range(nArgs)]
+    result = function(*[_Traced(tape, i) for i in range(nArgs)])
+    if not isinstance(result, (_Traced, Number)):
+        raise _Untraceable("result is %r" % result)
+    return tape, result
+
+
+    # Generates a function that computes the partials of the traced function
+    # with respect to the arguments whose indices are in <columns>, as a
+    # tuple (even if there's only one), or if <columns> is just an index,
+    # the one partial with respect to that argument.
+    # If <array> is set, the function instead takes arrays of argument
+    # values, and returns the list of its results at each point, computed
+    # in a single loop.
+    # The generated code works out each tape entry's value (as v<k>) and its
+    # derivative with respect to each argument j in <columns> (as d<k>_<j>),
+    # leaving out anything that's known to be zero.  Then, we keep only the
+    # lines that the result actually depends on.
+
+def _generate(tape:list, result, nArgs:int, columns, array:bool=False):
+
+    single = isinstance(columns, int)
+    columns = [columns] if single else list(columns)
+    consts = dict()
+    lines = []                  # Pairs (name, expression).
+    values = []                 # Expression for each tape entry's value.
+    derivs = []                 # Per entry, dict from column to expression (or None if 0).
+
+    def const(c) -> str:
+        name = 'c%d' % len(consts)
+        consts[name] = c
+        return name
+
+    def operand(x):             # (value, derivs) of a tracer or constant.
+        if isinstance(x, _Traced):
+            return values[x.index], derivs[x.index]
+        return const(x), {j: None for j in columns}
+
+    def name(expr:str, var:str) -> str:     # Name <expr>, unless it's simple.
+        if _simple(expr):
+            return expr
+        lines.append((var, expr))
+        return var
+
+    for k, (op, a, b) in enumerate(tape):
+
+        if op == 'arg':
+            values.append('v%d' % a)
+            derivs.append({j: ('1' if j == a else None) for j in columns})
+            continue
+
+        va, da = operand(a)
+        vb, db = operand(b) if b is not None else (None, None)
+
+        if op == 'neg':
+            v = '-%s' % _p(va)
+            d = {j: _neg(da[j]) for j in columns}
+        elif op == '+':
+            v = '%s + %s' % (va, vb)
+            d = {j: _add(da[j], db[j]) for j in columns}
+        elif op == '-':
+            v = '%s - %s' % (va, _p(vb))
+            d = {j: _add(da[j], _neg(db[j])) for j in columns}
+        elif op == '*':
+            v = '%s*%s' % (_p(va), _p(vb))
+            d = {j: _add(_mul(da[j], vb), _mul(va, db[j])) for j in columns}
+        elif op == '/':
+            v = '%s/%s' % (_p(va), _p(vb))
+            vName = name(v, 'v%d' % k)
+            v = vName
+            d = {j: _div(_add(da[j], _neg(_mul(vName, db[j]))), vb) for j in columns}
+        elif op == '**':
+            v = '%s**%s' % (_p(va), const(b))
+            if b == 0:                  # A constant, even where a is 0.
+                d = {j: None for j in columns}
+            else:
+                if b == 1:
+                    factor = '1'
+                elif b == 2:
+                    factor = '2*%s' % _p(va)
+                else:
+                    factor = '%s*%s**%s' % (const(b), _p(va), const(b - 1))
+                factor = name(factor, 'f%d' % k)     # Shared by all the columns.
+                d = {j: _mul(factor, da[j]) for j in columns}
+
+        values.append(name(v, 'v%d' % k))
+        derivs.append({j: (name(e, 'd%d_%d' % (k, j)) if e is not None else None)
+                       for j, e in d.items()})
+
+    if isinstance(result, _Traced):
+        final = [derivs[result.index][j] or '0' for j in columns]
+    else:
+        final = ['0' for j in columns]
+    ret = final[0] if single else '(%s,)' % ', '.join(final)
+
+        # Dead-code elimination:  Working backwards, keep just the lines
+        # whose results are used by the return value or by other kept lines.
+
+    needed = set(_names(ret))
+    kept = []
+    for var, expr in reversed(lines):
+        if var in needed:
+            kept.append('    %s = %s' % (var, expr))
+            needed.update(_names(expr))
+    kept.reverse()
+
+    params = ', '.join('v%d' % i for i in range(nArgs))
+    if array:
+        arrays = ', '.join('V%d' % i for i in range(nArgs))
+        source = ('def partials(%s):\n'
+                  '    out = []\n'
+                  '    append = out.append\n'
+                  '    for %s, in zip(%s):\n'
+                  '%s\n'
+                  '        append(%s)\n'
+                  '    return out\n') % (arrays, params, arrays,
+                                        '\n'.join('    ' + line for line in kept), ret)
+    else:
+        source = 'def partials(%s):\n%s\n    return %s\n' % (params, '\n'.join(kept), ret)
+    exec(source, consts)
+    return consts['partials']
+
+
+    # Falls back to evaluating the function on dual numbers at each call.
+
+def _dualGradient(function:Callable, nArgs:int):
+
+    units = [tuple(int(i == j) for j in range(nArgs)) for i in range(nArgs)]
+    zero = (0,)*nArgs
+
+    def gradient(*argVals):
+        result = function(*[Dual(a, unit) for a, unit in zip(argVals, units)])
+        return result.grad if isinstance(result, Dual) else zero
+
+    params = ', '.join('v%d' % i for i in range(nArgs))
+    partials = [eval('lambda %s: gradient(%s)[%d]' % (params, params, i),
+                     {'gradient': gradient})
+                for i in range(nArgs)]
+
+    return gradient, partials
+
+
+    # Helpers for building up derivative expressions, where None means 0.
+
+def _add(x, y):
+    if x is None:   return y
+    if y is None:   return x
+    if y.startswith('-'):
+        return '%s - %s' % (x, _p(y[1:]))
+    return '%s + %s' % (x, y)
+
+def _neg(x):
+    if x is None:           return None
+    if x.startswith('-'):   return x[1:] if _simple(x[1:]) else '(%s)' % x[1:]
+    return '-%s' % _p(x)
+
+def _mul(x, y):
+    if x is None or y is None:  return None
+    if x == '1':                return y
+    if y == '1':                return x
+    return '%s*%s' % (_p(x), _p(y))
+
+def _div(x, y):
+    if x is None:   return None
+    return '%s/%s' % (_p(x), _p(y))
+
+_simpleRE = re.compile(r'[A-Za-z_][A-Za-z_0-9]*$|[0-9]+$')
+
+def _simple(expr:str) -> bool:     # Just a name or an integer?
+    return _simpleRE.match(expr) is not None
+
+def _p(expr:str) -> str:            # Parenthesize <expr> unless it's simple.
+    return expr if _simple(expr) else '(%s)' % expr
+
+_nameRE = re.compile(r'[A-Za-z_][A-Za-z_0-9]*')
+
+def _names(expr:str):
+    return _nameRE.findall(expr)
@@ -1,6 +1,7 @@
 from .unaryDifferentiableFunction import UnaryDifferentiableFunction
+from .polynomialFunction          import PolynomialFunction
 
-class LinearFunction(UnaryDifferentiableFunction):
+class LinearFunction(PolynomialFunction, UnaryDifferentiableFunction):
 
     def __init__(inst, name:str=None, argName:str=None,
                  c1=None, c0=None):
@@ -8,14 +9,10 @@ class LinearFunction(UnaryDifferentiableFunction):
         if c1 == None: c1 = 1
         if c0 == None: c0 = 0
 
-        function = lambda x: (c1*x) + c0
+        if argName == None: argName = 'x'
 
-        derivative = lambda x:  c1
-
-        UnaryDifferentiableFunction.__init__(inst, name=name,
-                                             argName=argName,
-                                             function=function,
-                                             derivative=derivative)
+        PolynomialFunction.__init__(inst, name=name, argNames=[argName],
+                                    terms={(1,): c1, (0,): c0})
 
         inst._c1 = c1
         inst._c0 = c0
@@ -0,0 +1,404 @@
+#|==============================================================================
+#|                      TOP OF FILE:    polynomialFunction.py
+#|
+#|      A class for sparse multivariate polynomial functions.
+#|
+#|      Every potential energy function we use is a polynomial in
+#|      the coordinates, so rather than write each one (and each of
+#|      its partial derivatives) out by hand as a lambda, we can just
+#|      give its terms.  A PolynomialFunction keeps its terms as a
+#|      dict mapping exponent tuples (one exponent per argument) to
+#|      coefficients; e.g., for f(x,y) = 3x^2y - y + 1, that's
+#|
+#|              {(2,1): 3,  (0,1): -1,  (0,0): 1}.
+#|
+#|      Partial derivatives are derived from the terms (the first
+#|      time each one is asked for), and are PolynomialFunctions
+#|      themselves, so they can be differentiated again.
+#|
+#|      For speed, the first time a PolynomialFunction is called, it
+#|      compiles its terms into a single Python expression in nested
+#|      Horner form; e.g., the above becomes
+#|
+#|              c0*x1*x0*x0 + c1*x1 + c2
+#|
+#|      so that powers are never computed separately, and the powers
+#|      of each variable are shared between all the terms that use
+#|      them.
+#|
+#|      Polynomials can also be built up arithmetically, starting
+#|      from variables(); e.g.,
+#|
+#|              x, y, z = PolynomialFunction.variables('x', 'y', 'z')
+#|              f = 0.5*k*(z - x*y)**2
+#|
+#|      Exact mode:  Ordinarily, arithmetic on Fixed arguments rounds
+#|      to the fixed-point quantum after every operation, so that the
+#|      result depends on how the expression happens to be written.
+#|      If .exact is set (as it is by default), then when any of the
+#|      arguments is a Fixed, the polynomial is instead evaluated in
+#|      integer arithmetic on the arguments' quanta (with the terms
+#|      scaled to a common denominator, so that the coefficients are
+#|      taken exactly as given), and rounded to a Fixed just once, at
+#|      the end.  The result is the exact value of the polynomial at
+#|      that point, correctly rounded, no matter how the terms were
+#|      written; and since it's all integer arithmetic, it's several
+#|      times faster than doing the same thing with Fixed operations.
+#|
+#|      Note that this changes the numbers:  the potentials used to be
+#|      hand-written lambdas on Fixed values, rounded after every
+#|      operation, and the exact values differ from those in the last
+#|      place now and then.  The inverter and memory cell examples
+#|      step just as before, but the gate networks (e.g., the AND gate
+#|      and the adders) are chaotic, so the differences grow, and
+#|      seeded runs leave their old trajectories after anywhere from
+#|      about fifteen to a hundred steps.  Turning .exact off doesn't
+#|      bring the old ones back (it rounds at different points than
+#|      the old lambdas did), so nothing does; the new trajectories
+#|      are the ones computed with correctly rounded potentials.
+#|
+#|      Arrays:  Polynomials (and so their partials) can be evaluated
+#|      on arrays of argument values (see differentiableFunction.py),
+#|      by a batch kernel that evaluates the same Horner expression in
+#|      a single list comprehension.  The arrays are evaluated exactly
+#|      if exact mode is on and the first element of any of them is a
+#|      Fixed (so arrays should be all Fixed, or none), giving the same
+#|      results as evaluating each point separately.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+from typing     import Iterable
+from numbers    import Number
+from fractions  import Fraction
+from math       import lcm
+
+from fixed import Fixed     # Fixed-point numbers, for exact mode.
+
+from .differentiableFunction import BaseDifferentiableFunction
+
+__all__ = ['PolynomialFunction']
+
+class PolynomialFunction(BaseDifferentiableFunction):
+
+    # Instance public properties:
+    #
+    #   .terms:dict - A copy of our map from exponent tuples to (nonzero)
+    #       coefficients.
+    #
+    #   .degree:int - The highest total degree of any of our terms (or -1
+    #       for the zero polynomial).
+    #
+    #   .exact:bool - Whether to evaluate exactly on Fixed arguments (see
+    #       above).  True by default; may be changed at any time.
+    #
+    # Instance private data members:
+    #
+    #   ._terms:dict - Our map from exponent tuples to coefficients.
+    #   ._exact:bool - Value of the .exact property.
+    #   ._derivs:list - Cache of our partial derivatives (None where
+    #       not yet derived).
+    #   ._fast, ._exactFn - Our compiled evaluators (None until needed).
+    #   ._fastArray, ._exactArray - Our compiled batch kernels (likewise).
+
+    def __init__(inst, name:str=None, argNames:Iterable[str]=None,
+                 terms:dict=None, exact:bool=True):
+
+        if argNames is None:    argNames = ['x']
+        argNames = list(argNames)
+        nArgs = len(argNames)
+
+            # Normalize the terms:  Make sure each exponent tuple is the
+            # right length, and combine and drop terms as needed.
+
+        inst._terms = dict()
+        if terms is not None:
+            for exps, coeff in terms.items():
+                exps = tuple(exps)
+                if len(exps) != nArgs:
+                    raise ValueError("PolynomialFunction.__init__(): Term %s "
+                                     "doesn't have one exponent for each of "
+                                     "the arguments %s." % (exps, argNames))
+                inst._addTerm(exps, coeff)
+
+        inst._exact = exact
+        inst._derivs = [None]*nArgs
+        inst._fast = None
+        inst._exactFn = None
+        inst._fastArray = None
+        inst._exactArray = None
+
+            # Do generic initialization for differentiable functions.  Our
+            # .function compiles us the first time it's called.
+
+        BaseDifferentiableFunction.__init__(inst, name, argNames)
+
+        inst.function = inst._compileAndCall
+
+    # Alternative constructor:  Returns a tuple of polynomials, one for each
+    # of the given argument names, each consisting of just that variable.
+
+    @classmethod
+    def variables(cls, *argNames:str):
+        n = len(argNames)
+        return tuple(PolynomialFunction(argNames=argNames,
+                                        terms={tuple(int(j == i) for j in range(n)): 1})
+                     for i in range(n))
+
+    @property
+    def terms(this):
+        return dict(this._terms)
+
+    @property
+    def degree(this):
+        return max((sum(exps) for exps in this._terms), default=-1)
+
+    @property
+    def exact(this):
+        return this._exact
+
+    @exact.setter
+    def exact(this, exact:bool):
+        this._exact = exact
+        this.function = this._compileAndCall    # Pick the right evaluator.
+
+    # Evaluates the polynomial exactly (see above) at the given argument
+    # values, returning a Fixed, regardless of whether exact mode is on.
+
+    def evalFixed(this, *argVals):
+        if this._exactFn is None:
+            this._exactFn = this._compileExact()
+        return this._exactFn(*argVals)
+
+    # Returns the pair (terms, M), where <terms> are our terms with integer
+    # coefficients, as functions of the arguments' quanta, such that our
+    # exact value in quanta is their polynomial's value divided by M (see
+    # _compileExact() below).  For generating exact code elsewhere.
+
+    def integerForm(this):
+        D = Fixed(1).quanta
+        n = max(this.degree, 1)
+        coeffs = {exps: Fraction(coeff) for exps, coeff in this._terms.items()}
+        Q = lcm(*[c.denominator for c in coeffs.values()]) if coeffs else 1
+        return ({exps: int(c*Q) * D**(n - sum(exps)) for exps, c in coeffs.items()},
+                Q * D**(n - 1))
+
+    # Evaluates the polynomial at each point given by the argument arrays,
+    # returning a list of the values.
+
+    def evalArray(this, *argArrays) -> list:
+        if this._exact and any(a and isinstance(a[0], Fixed) for a in argArrays):
+            if this._exactArray is None:
+                this._exactArray = this._compileExact(array=True)
+            return this._exactArray(*argArrays)
+        if this._fastArray is None:
+            this._fastArray = this._compile(array=True)
+        return this._fastArray(*argArrays)
+
+    # Returns the partial derivative of this polynomial with respect to
+    # its <argumentIndex>th argument, as another PolynomialFunction (with
+    # the same argument names, and the same exactness).
+
+    def partialDerivWRT(this, argumentIndex:int):
+        deriv = this._derivs[argumentIndex]     # Raises IndexError if no such arg.
+        if deriv is None:
+            terms = dict()
+            for exps, coeff in this._terms.items():
+                e = exps[argumentIndex]
+                if e:
+                    terms[exps[:argumentIndex] + (e - 1,) + exps[argumentIndex+1:]] = e*coeff
+            deriv = PolynomialFunction(name = 'd%s_d%s' % (this.name, this.argNames[argumentIndex]),
+                                       argNames = this.argNames, terms = terms,
+                                       exact = this._exact)
+            this._derivs[argumentIndex] = deriv
+        return deriv
+
+    # Arithmetic.  Polynomials can be added, subtracted and multiplied with
+    # each other (if they have the same arguments) and with numbers, and
+    # raised to non-negative integer powers.
+
+    def __add__(this, other):
+        terms = this._coerce(other)
+        if terms is NotImplemented:
+            return NotImplemented
+        result = this._like(this._terms)
+        for exps, coeff in terms.items():
+            result._addTerm(exps, coeff)
+        return result
+
+    __radd__ = __add__
+
+    def __neg__(this):
+        return this._like({exps: -coeff for exps, coeff in this._terms.items()})
+
+    def __sub__(this, other):
+        terms = this._coerce(other)
+        if terms is NotImplemented:
+            return NotImplemented
+        return this + (-this._like(terms))
+
+    def __rsub__(this, other):
+        return (-this) + other
+
+    def __mul__(this, other):
+        terms = this._coerce(other)
+        if terms is NotImplemented:
+            return NotImplemented
+        result = this._like()
+        for exps2, coeff2 in terms.items():
+            for exps1, coeff1 in this._terms.items():
+                result._addTerm(tuple(e1 + e2 for e1, e2 in zip(exps1, exps2)),
+                                coeff1*coeff2)
+        return result
+
+    __rmul__ = __mul__
+
+    def __pow__(this, n:int):
+        if not isinstance(n, int) or n < 0:
+            raise ValueError("PolynomialFunction.__pow__(): Can only raise a "
+                             "polynomial to a non-negative integer power, not %s." % n)
+        result = this._like(this._coerce(1))
+        for i in range(n):
+            result = result * this
+        return result
+
+    # Private methods.
+
+        # Adds <coeff> to the coefficient of the term with exponents <exps>.
+
+    def _addTerm(this, exps:tuple, coeff):
+        coeff = this._terms.get(exps, 0) + coeff
+        if coeff == 0:
+            this._terms.pop(exps, None)
+        else:
+            this._terms[exps] = coeff
+
+        # A new polynomial with our arguments (and exactness) and the given terms.
+
+    def _like(this, terms:dict=None):
+        return PolynomialFunction(argNames=this.argNames, terms=terms, exact=this._exact)
+
+        # The terms of <other> (a number or a polynomial with our arguments).
+
+    def _coerce(this, other) -> dict:
+        if isinstance(other, PolynomialFunction):
+            if other.argNames != this.argNames:
+                raise ValueError("PolynomialFunction: Can't combine polynomials in "
+                                 "%s with ones in %s." % (this.argNames, other.argNames))
+            return other._terms
+        if isinstance(other, Number):
+            return {(0,)*len(this.argNames): other}
+        return NotImplemented
+
+        # Our .function until we've been compiled.  Compiles us, installs
+        # the right evaluator as .function, and calls it.
+
+    def _compileAndCall(this, *argVals):
+        if this._fast is None:
+            this._fast = this._compile()
+        if this._exact and this._exactFn is None:
+            this._exactFn = this._compileExact()
+        this.function = this._exactCall if this._exact else this._fast
+        return this.function(*argVals)
+
+    def _exactCall(this, *argVals):
+        if Fixed in map(type, argVals):
+            return this._exactFn(*argVals)
+        return this._fast(*argVals)
+
+        # Compiles the given terms (by default, ours) into a lambda that
+        # evaluates them in Horner form.  If <array> is set, the lambda
+        # instead takes arrays of argument values, and returns a list.
+
+    def _compile(this, terms:dict=None, array:bool=False):
+        consts = dict()
+        expr = _horner(this._terms if terms is None else terms,
+                       0, len(this.argNames), consts)
+        params = ', '.join('x%d' % i for i in range(len(this.argNames)))
+        if array and this.argNames:
+            arrays = ', '.join('X%d' % i for i in range(len(this.argNames)))
+            return eval('lambda %s: [%s for %s, in zip(%s)]' %
+                        (arrays, expr, params, arrays), consts)
+        return eval('lambda %s: %s' % (params, expr), consts)
+
+        # Compiles our exact evaluator.  If D is the Fixed denominator, n is
+        # our degree, and Q is the least common denominator of our (exact)
+        # coefficients, then multiplying each term of degree d by Q*D^(n-d)
+        # gives it integer coefficients and makes it a function of the
+        # arguments' quanta; its value in quanta is then that integer
+        # polynomial's value divided by Q*D^(n-1).  We round that division
+        # half-to-even, the same as Fixed() does.  (With <array> set, we
+        # compile a batch kernel instead, as in _compile().)
+
+    def _compileExact(this, array:bool=False):
+        terms, M = this.integerForm()
+        poly = this._compile(terms, array)
+        fromQuanta = Fixed.fromQuanta
+
+        def rounded(N):
+            q, r = divmod(N, M)
+            if 2*r > M or (2*r == M and q & 1):
+                q += 1
+            return fromQuanta(q)
+
+        if array:
+            return lambda *argArrays: list(map(rounded, poly(
+                *[[a.quanta if isinstance(a, Fixed) else Fixed(a).quanta for a in arr]
+                  for arr in argArrays])))
+
+        def exact(*argVals):
+            q, r = divmod(poly(*[(a if isinstance(a, Fixed) else Fixed(a)).quanta
+                                 for a in argVals]), M)
+            if 2*r > M or (2*r == M and q & 1):
+                q += 1
+            return fromQuanta(q)
+
+        return exact
+
+#__/ End class PolynomialFunction.
+
+
+# Returns a Python expression for the polynomial with the given terms, in
+# the variables x<var>, x<var+1>, ... x<nVars-1> (the terms' exponents for
+# earlier variables are all zero).  The terms are grouped by their power of
+# x<var>; the polynomial in the remaining variables that multiplies each
+# power is done recursively, and these are combined Horner-style.  The
+# coefficients are added to <consts>, under the names used for them in the
+# expression.
+
+def _horner(terms:dict, var:int, nVars:int, consts:dict) -> str:
+
+    if not terms:
+        return '0'
+
+    if var == nVars:                    # All that's left is a coefficient.
+        (coeff,) = terms.values()
+        name = 'c%d' % len(consts)
+        consts[name] = coeff
+        return name
+
+    groups = dict()
+    for exps, coeff in terms.items():
+        groups.setdefault(exps[var], dict())[exps] = coeff
+
+    x = 'x%d' % var
+    expr = None
+    for d in sorted(groups, reverse=True):
+        sub = _horner(groups[d], var + 1, nVars, consts)
+        if expr is None:
+            expr = sub
+        else:
+            expr = '%s*%s + %s' % (_group(expr), _power(x, prev - d), sub)
+        prev = d
+    if prev:
+        expr = '%s*%s' % (_group(expr), _power(x, prev))
+    return expr
+
+def _group(expr:str) -> str:    # Parenthesize <expr> if it's a sum.
+    return '(%s)' % expr if ' + ' in expr else expr
+
+def _power(x:str, n:int) -> str:
+    return '*'.join([x]*n) if n <= 4 else '%s**%d' % (x, n)
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      BOTTOM OF FILE:    polynomialFunction.py
+#|==============================================================================
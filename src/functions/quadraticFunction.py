@@ -1,10 +1,14 @@
 from .unaryDifferentiableFunction import UnaryDifferentiableFunction
+from .polynomialFunction          import PolynomialFunction
 
 #-- A class for general univariate quadratic functions, of the form:
 #
 #       f(x) = c2*x^2 + c1*x + c0
+#
+# It's just a PolynomialFunction with those terms, which takes care of
+# evaluating it and its derivative.
 
-class QuadraticFunction(UnaryDifferentiableFunction):
+class QuadraticFunction(PolynomialFunction, UnaryDifferentiableFunction):
 
     # Initializer.  Given coefficients (c2, c1, c0), creates a new
     #   quadratic function with those coefficients.  The default
@@ -20,21 +24,12 @@ class QuadraticFunction(UnaryDifferentiableFunction):
         if c1 == None:  c1 = 0
         if c0 == None:  c0 = 0
 
-            # Construct our function.
-
-        function = lambda x:  (c2 * x**2) + (c1 * x) + c0
-
-            # Construct our derivative.
-
-        derivative = lambda x:  2*c2*x + c1
+        if argName == None:  argName = 'x'
 
-            # Do generic initialization for unary differentiable
-            # functions.
+            # Do generic initialization for polynomial functions.
 
-        UnaryDifferentiableFunction.__init__(inst, name=name,
-                                             argName=argName,
-                                             function=function,
-                                             derivative=derivative)
+        PolynomialFunction.__init__(inst, name=name, argNames=[argName],
+                                    terms={(2,): c2, (1,): c1, (0,): c0})
 
             # Remember coefficients of our terms for later reference.
 
@@ -58,6 +53,4 @@ class SimpleQuadraticFunction(QuadraticFunction):
         #print("SQF name=%s argName=%s c=%s" % (name, argName, str(c)))
         
         QuadraticFunction.__init__(inst, name, argName, c)
-            # We could optimize this implementation here
-            # replacing ._function and ._partials with
-            # simpler versions of them.
+            # (The zero terms just drop out of the polynomial.)
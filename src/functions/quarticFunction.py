@@ -1,10 +1,14 @@
 from .unaryDifferentiableFunction import UnaryDifferentiableFunction
+from .polynomialFunction          import PolynomialFunction
 
 #-- A class for general univariate quartic functions, of the form:
 #
 #       f(x) = c4*x^4 + x3*x^3 + c2*x^2 + c1*x + c0
+#
+# It's just a PolynomialFunction with those terms, which takes care of
+# evaluating it and its derivative.
 
-class QuarticFunction(UnaryDifferentiableFunction):
+class QuarticFunction(PolynomialFunction, UnaryDifferentiableFunction):
 
     # Initializer.  Given coefficients (c4, c3, c2, c1, c0), creates a new
     #   quartic function with those coefficients.  The default
@@ -22,21 +26,13 @@ class QuarticFunction(UnaryDifferentiableFunction):
         if c1 == None:  c1 = 0
         if c0 == None:  c0 = 0
 
-            # Construct our function.
-
-        function = lambda x:  (c4 * x**4) + (c3 * x**3) + (c2 * x**2) + (c1 * x) + c0
-
-            # Construct our derivative.
-
-        derivative = lambda x:  (4*c4 * x**3) + (3*c3 * x**2) + 2*c2*x + c1
+        if argName == None:  argName = 'x'
 
-            # Do generic initialization for unary differentiable
-            # functions.
+            # Do generic initialization for polynomial functions.
 
-        UnaryDifferentiableFunction.__init__(inst, name=name,
-                                             argName=argName,
-                                             function=function,
-                                             derivative=derivative)
+        PolynomialFunction.__init__(inst, name=name, argNames=[argName],
+                                    terms={(4,): c4, (3,): c3, (2,): c2,
+                                           (1,): c1, (0,): c0})
 
             # Remember coefficients of our terms for later reference.
 
@@ -0,0 +1,203 @@
+#|==============================================================================
+#|                      TOP OF FILE:    tabulatedUnaryFunction.py
+#|
+#|      A class for unary functions evaluated from lookup tables.
+#|
+#|      A potential that isn't a polynomial (or is a complicated one)
+#|      can be slow to evaluate at every step.  A TabulatedUnaryFunction
+#|      is built from any UnaryDifferentiableFunction by sampling its
+#|      value and derivative, once, at the points of a regular grid
+#|      on the fixed-point line; after that, it's evaluated by cubic
+#|      Hermite interpolation between the two neighboring grid points,
+#|      which takes just a couple of list lookups and a handful of
+#|      integer operations.
+#|
+#|      The table is kept in quanta (see fixed.py), and interpolation
+#|      is done in exact integer arithmetic on the argument's quanta,
+#|      rounding (half-to-even) just once at the end.  So the result
+#|      is a deterministic function of the argument's exact value, as
+#|      reversibility requires; it doesn't depend on the platform's
+#|      floating point, or on the order the arithmetic is done in.
+#|
+#|      The derivative is the exact derivative of the interpolating
+#|      cubic (likewise rounded once), not a separate interpolation of
+#|      the tabulated derivatives; that way, the forces are consistent
+#|      with the energy.  Both the value and the derivative are
+#|      continuous across grid points.  The second derivative (for
+#|      stiffness analysis) is likewise the interpolant's own; it's
+#|      linear within each grid interval, and jumps at grid points,
+#|      where it's taken from the interval to the right.
+#|
+#|      Memory vs. accuracy:  The table holds two integers per grid
+#|      point, so it takes (hi - lo)/step + 1 of each.  The error of
+#|      cubic Hermite interpolation shrinks as the fourth power of the
+#|      step (about step^4/384 times the function's 4th derivative),
+#|      so halving the step doubles the memory and cuts the error by
+#|      16.  Use .maxError() to see what a given step actually costs.
+#|      Outside the range [lo, hi], the original function is just
+#|      called directly (but rounded the same way).
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+from fixed import Fixed
+
+from .unaryDifferentiableFunction import UnaryDifferentiableFunction
+
+__all__ = ['TabulatedUnaryFunction']
+
+class TabulatedUnaryFunction(UnaryDifferentiableFunction):
+
+    # Instance public properties:
+    #
+    #   .source:UnaryDifferentiableFunction - The function we tabulate.
+    #
+    #   .lo, .hi, .step:Fixed - The range of the table, and its grid
+    #       spacing.  (.hi is rounded down to a grid point.)
+    #
+    #   .size:int - The number of grid points.
+    #
+    # Instance private data members:
+    #
+    #   ._lo, ._hi, ._h:int - .lo, .hi and .step, in quanta.
+    #   ._values:list - The source's value at each grid point, in quanta.
+    #   ._slopes:list - Its derivative at each grid point, in quanta.
+    #   ._curvature:Callable - Our second derivative.
+
+    def __init__(inst, source:UnaryDifferentiableFunction,
+                 lo=0, hi=1, step=Fixed(1/1024), name:str=None):
+
+        D = Fixed(1).quanta
+        lo = Fixed(lo).quanta
+        h = Fixed(step).quanta
+        if h <= 0:
+            raise ValueError("TabulatedUnaryFunction.__init__(): The grid step "
+                             "must be at least one quantum, not %s." % step)
+        n = (Fixed(hi).quanta - lo)//h + 1
+        if n < 2:
+            raise ValueError("TabulatedUnaryFunction.__init__(): The range "
+                             "[%s, %s] must span at least one grid step." % (lo, hi))
+
+        inst.source = source
+        inst._lo = lo
+        inst._h = h
+        inst._hi = lo + (n - 1)*h
+
+            # Sample the source (and its derivative) at the grid points.
+
+        derivative = source.partialDerivWRT(0)
+        points = [Fixed.fromQuanta(lo + i*h) for i in range(n)]
+        inst._values = [_quantaOf(source(x)) for x in points]
+        inst._slopes = [_quantaOf(derivative(x)) for x in points]
+
+            # Bind everything the evaluators need into their defaults, so
+            # that they run on local variables only.
+
+        def value(x, lo=lo, hi=inst._hi, h=h, D=D, h3=D*h**3,
+                  Y=inst._values, M=inst._slopes, f=source):
+            X = x.quanta if isinstance(x, Fixed) else Fixed(x).quanta
+            if not lo <= X <= hi:
+                return _result(x, _quantaOf(f(Fixed.fromQuanta(X))))
+            i, r = divmod(X - lo, h)
+            if not r:
+                return _result(x, Y[i])
+            s = h - r
+            y0 = Y[i];  y1 = Y[i+1]
+            num = D*(s*s*(h + 2*r)*y0 + r*r*(3*h - 2*r)*y1) \
+                  + h*r*s*(M[i]*s - M[i+1]*r)
+            return _result(x, _divRound(num, h3))
+
+        def derivative(x, lo=lo, hi=inst._hi, h=h, D=D, h3=h**3,
+                       Y=inst._values, M=inst._slopes, f=derivative):
+            X = x.quanta if isinstance(x, Fixed) else Fixed(x).quanta
+            if not lo <= X <= hi:
+                return _result(x, _quantaOf(f(Fixed.fromQuanta(X))))
+            i, r = divmod(X - lo, h)
+            if not r:
+                return _result(x, M[i])
+            s = h - r
+            num = 6*D*r*s*(Y[i+1] - Y[i]) \
+                  + h*(M[i]*s*(h - 3*r) + M[i+1]*r*(3*r - 2*h))
+            return _result(x, _divRound(num, h3))
+
+        def curvature(x, lo=lo, hi=inst._hi, h=h, D=D, h3=h**3,
+                      Y=inst._values, M=inst._slopes, f=source):
+            X = x.quanta if isinstance(x, Fixed) else Fixed(x).quanta
+            if not lo <= X <= hi:
+                return _result(x, _quantaOf(f.secondPartialDerivWRT(0, 0)(Fixed.fromQuanta(X))))
+            i, r = divmod(X - lo, h)
+            if i == len(Y) - 1:
+                i, r = i - 1, h             # At hi, use the last interval.
+            s = h - r
+            num = D*(6*D*(s - r)*(Y[i+1] - Y[i])
+                     + h*(M[i]*(6*r - 4*h) + M[i+1]*(6*r - 2*h)))
+            return _result(x, _divRound(num, h3))
+
+        inst._curvature = curvature
+
+        if name is None:
+            name = 'T%s' % source.name
+
+        UnaryDifferentiableFunction.__init__(inst, name, source.argName,
+                                             value, derivative)
+
+    # Our second derivative is the interpolant's (see above).
+
+    def secondPartialDerivWRT(this, i:int, j:int):
+        if i or j:
+            raise IndexError("TabulatedUnaryFunction.secondPartialDerivWRT(): "
+                             "%s has just one argument." % this.name)
+        return this._curvature
+
+    @property
+    def lo(this):
+        return Fixed.fromQuanta(this._lo)
+
+    @property
+    def hi(this):
+        return Fixed.fromQuanta(this._hi)
+
+    @property
+    def step(this):
+        return Fixed.fromQuanta(this._h)
+
+    @property
+    def size(this):
+        return len(this._values)
+
+    # Returns the largest difference between our value and the source's
+    # (as a float), over the midpoints of all the grid intervals, which is
+    # about where interpolation error is largest.
+
+    def maxError(this) -> float:
+        worst = 0.0
+        for i in range(this.size - 1):
+            x = Fixed.fromQuanta(this._lo + i*this._h + this._h//2)
+            worst = max(worst, abs(float(this(x)) - float(this.source(x))))
+        return worst
+
+#__/ End class TabulatedUnaryFunction.
+
+
+# The value <v> (a number) in quanta.
+
+def _quantaOf(v) -> int:
+    return v.quanta if isinstance(v, Fixed) else Fixed(v).quanta
+
+# <num>/<den> (den > 0), rounded half-to-even, the same as Fixed() does.
+
+def _divRound(num:int, den:int) -> int:
+    q, r = divmod(num, den)
+    if 2*r > den or (2*r == den and q & 1):
+        q += 1
+    return q
+
+# Our result, given its value in quanta:  a Fixed if the argument was one,
+# otherwise a float.
+
+def _result(x, quanta:int):
+    result = Fixed.fromQuanta(quanta)
+    return result if isinstance(x, Fixed) else float(result)
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      BOTTOM OF FILE:    tabulatedUnaryFunction.py
+#|==============================================================================
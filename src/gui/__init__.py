@@ -21,11 +21,14 @@ __all__ = [
     'desque',       # Double-ended synchronous queues.
     'dyngui',       # Application-specific GUI stuff.
     'flag',         # Checkable, waitable condition variables.
+    'forceLayout',  # Force-directed layout of network diagrams.
     'guiapp',       # Thread to consolidate GUI ops.
     'terminal',     # Generic Terminal class
     'tikiterm',     # TkInter-based terminal windows
     'utils',        # Miscellaneous utilities
-    'worklist'      # Queues of callables to call
+    'workerPool',   # Teams of workers that share work
+    'worklist',     # Queues of callables to call
+    'workstats'     # Accounting for worklists and workers
     ]
 
 #print("__path__ is %s" % __path__)
@@ -29,7 +29,23 @@
 #       _putleft(), which does the actual insert using the under-
 #       lying Deque object's appendleft().  We also add putfront()
 #       and putfront_nowait() methods, as more concise alterna-
-#       tives to the extra argument.
+#       tives to the extra argument.  Similarly, get() gets an
+#       extra argument (back=False) for taking items off the back
+#       of the queue, which is done by the new _getright() method;
+#       this is used by worker pools, whose idle workers steal
+#       work from the back of other workers' queues.
+#
+#       Since every put() or get() takes the queue's lock and
+#       pokes a condition variable, moving lots of small items
+#       one at a time spends much of its time on lock traffic.
+#       So there are also bulk operations:  put_many() and
+#       get_many() move a whole batch of items with a single
+#       acquisition of the lock and a single notification, and
+#       drain() takes everything that's there without waiting.
+#       And the common cases of put() into an unbounded desque,
+#       and get() from a nonempty one, take a fast path that
+#       skips the timeout logic and only notifies a condition
+#       if some thread is actually waiting on it.
 #
 #===================================================================
 
@@ -96,25 +112,28 @@ class Desque(Queue):
         self.unfinished_tasks = 0
     #<-- end method Desque.__init__()
         
-        # This new method (which depends on our re-entrant lock)
-        # simply drains all items from the queue, one at a time, without
+        # This new method simply drains all items from the queue, without
         # processing or returning any of them.  At the moment it returns,
         # the queue is guaranteed to be empty (although it may get re-
         # filled immediately afterwards if not still locked).
 
     def flush(self):
-        with self.mutex:     # Blocks queue changes by other threads while in here.
-            try:
-                while True:
-                    self.get(block=False)
-            except Empty:
-                return
+        self.drain()
+
+        #-----------------------------------------------------------------
+        # drain() - Removes and returns all of the items in the queue, as a
+        # list (possibly empty), without waiting.
+
+    def drain(self):
+        """Remove and return all items in the queue, without blocking."""
+        with self.mutex:
+            return self._getmany(self._qsize())
 
         # Override Queue's put() method.  This implementation should be
         # identical to queue.Queue.put(), except for the extra "front"
-        # argument, and how that is used.  It may need to be updated
-        # in the future for compatibility with future versions of the
-        # queue module.
+        # argument, and how that is used, and the fast path for unbounded
+        # queues.  It may need to be updated in the future for
+        # compatibility with future versions of the queue module.
 
     def put(self, item, block=True, timeout=None, front=False):
         """Put an item into the queue, at either end.
@@ -125,6 +144,16 @@ class Desque(Queue):
 
         See queue.Queue.put() for remaining documentation.
         """
+        if self.maxsize <= 0:       # Fast path: there's always room.
+            with self.mutex:
+                if front:
+                    self._putleft(item)
+                else:
+                    self._put(item)
+                self.unfinished_tasks += 1
+                if self.not_empty._waiters:     # Only notify if someone's waiting.
+                    self.not_empty.notify()
+            return
         self.not_full.acquire()
         try:
             if self.maxsize > 0:
@@ -166,6 +195,55 @@ class Desque(Queue):
         """
         return self.put(item, False, front=front)
 
+        #-----------------------------------------------------------------
+        # put_many() - Puts all of the given items into the queue, in
+        # order, taking the lock just once (unless the queue is bounded
+        # and fills up, in which case we wait for room as put() would,
+        # and put in as many items as fit each time).  With front=True,
+        # the items go at the front of the queue, still in their given
+        # order (so the first item given ends up first in line).  If we
+        # time out (or block is false) with only some of the items put,
+        # Full is raised, and the rest are not put.
+
+    def put_many(self, items, block=True, timeout=None, front=False):
+        """Put all of the given items into the queue, at either end,
+        with as few lock acquisitions as possible."""
+        items = list(items)
+        if not items:
+            return
+        if front:
+            items.reverse()         # So that the first one ends up in front.
+        with self.not_full:
+            if timeout is not None:
+                if timeout < 0:
+                    raise ValueError("'timeout' must be a non-negative number")
+                endtime = _time() + timeout
+            done = 0
+            while done < len(items):
+                room = len(items) - done
+                if self.maxsize > 0:
+                    room = min(room, self.maxsize - self._qsize())
+                    if room <= 0:
+                        if not block:
+                            raise Full
+                        if timeout is None:
+                            self.not_full.wait()
+                        else:
+                            remaining = endtime - _time()
+                            if remaining <= 0.0:
+                                raise Full
+                            self.not_full.wait(remaining)
+                        continue
+                batch = items[done:done + room]
+                if front:
+                    self._putmanyleft(batch)
+                else:
+                    self._putmany(batch)
+                done += room
+                self.unfinished_tasks += room
+                if self.not_empty._waiters:
+                    self.not_empty.notify(room)
+
         # Provide new public putfront() and putfront_nowait() methods.
 
     def putfront(self, item, block=True, timeout=None):
@@ -185,6 +263,97 @@ class Desque(Queue):
 
         return put_nowait(self, item, front=True)
 
+        # Override Queue's get() method.  As with put(), this should be
+        # identical to queue.Queue.get(), except for the extra "back"
+        # argument, and how that is used.
+
+    def get(self, block=True, timeout=None, back=False):
+        """Remove and return an item from the queue, from either end.
+
+        If the optional argument back is True, then the item is
+        taken from the back of the queue (the most recently added
+        item, unless items were added at the front), rather than
+        from the front.
+
+        See queue.Queue.get() for remaining documentation.
+        """
+        with self.mutex:            # Fast path: there's something there already.
+            if self._qsize():
+                item = self._getright() if back else self._get()
+                if self.not_full._waiters:
+                    self.not_full.notify()
+                return item
+        with self.not_empty:
+            if not block:
+                if not self._qsize():
+                    raise Empty
+            elif timeout is None:
+                while not self._qsize():
+                    self.not_empty.wait()
+            elif timeout < 0:
+                raise ValueError("'timeout' must be a non-negative number")
+            else:
+                endtime = _time() + timeout
+                while not self._qsize():
+                    remaining = endtime - _time()
+                    if remaining <= 0.0:
+                        raise Empty
+                    self.not_empty.wait(remaining)
+            if back:
+                item = self._getright()
+            else:
+                item = self._get()
+            self.not_full.notify()
+            return item
+
+    def get_nowait(self, back=False):
+        """Remove and return an item from the queue without blocking.
+
+        Only get an item if one is immediately available. Otherwise
+        raise the Empty exception.
+        """
+        return self.get(False, back=back)
+
+        #-----------------------------------------------------------------
+        # get_many() - Waits (as get() would) until the queue is nonempty,
+        # and then removes and returns up to <maxItems> items from it (or
+        # all of them, if <maxItems> is None), as a list, in queue order.
+        # Only the first item is waited for; after that we just take what's
+        # there.
+
+    def get_many(self, maxItems=None, block=True, timeout=None):
+        """Remove and return up to maxItems items from the front of
+        the queue (at least one, unless we time out), as a list."""
+        with self.not_empty:
+            if not block:
+                if not self._qsize():
+                    raise Empty
+            elif timeout is None:
+                while not self._qsize():
+                    self.not_empty.wait()
+            elif timeout < 0:
+                raise ValueError("'timeout' must be a non-negative number")
+            else:
+                endtime = _time() + timeout
+                while not self._qsize():
+                    remaining = endtime - _time()
+                    if remaining <= 0.0:
+                        raise Empty
+                    self.not_empty.wait(remaining)
+            n = self._qsize()
+            if maxItems is not None and maxItems < n:
+                n = maxItems
+            return self._getmany(n)
+
+        # Takes <n> items (n <= qsize) off the front, and lets any threads
+        # waiting for room know about it.  Lock must be held.
+
+    def _getmany(self, n):
+        items = self._getmanyfront(n)
+        if n and self.not_full._waiters:
+            self.not_full.notify(n)
+        return items
+
         # Define new private _putleft() method to implement the
         # actual work of putting items at the front of the queue.
         # Subclasses may override this if needed to use a
@@ -195,6 +364,26 @@ class Desque(Queue):
     def _putleft(self, item):
         self.queue.appendleft(item)
 
+        # Likewise, _getright() does the actual work of taking items
+        # off the back of the queue.
+
+    def _getright(self):
+        return self.queue.pop()
+
+        # And the bulk versions of _put(), _putleft() and _get().
+        # _putmanyleft() is given the items in the order in which they're
+        # to be pushed onto the front (i.e., the last one ends up first).
+
+    def _putmany(self, items):
+        self.queue.extend(items)
+
+    def _putmanyleft(self, items):
+        self.queue.extendleft(items)
+
+    def _getmanyfront(self, n):
+        popleft = self.queue.popleft
+        return [popleft() for i in range(n)]
+
 #|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 #|  END FILE:   desque.py
 #|============================================================================
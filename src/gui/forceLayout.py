@@ -0,0 +1,259 @@
+#|=========================================================================
+#|   forceLayout.py                          [python module source code]
+#|
+#|       Force-directed layout of network diagrams.
+#|
+#|       A ForceLayout is a small damped auxiliary simulation that
+#|       moves the vertices of a graph (for us, the nodes and gates
+#|       of a DynamicNetwork) around until they settle into a tidy
+#|       arrangement:  edges (links) act like springs that try to
+#|       stay near an ideal length, and all vertices repel each
+#|       other at short range.  Unlike the real dynamical system
+#|       being simulated, the motion here is strongly damped.
+#|
+#|       To keep this usable for generated circuits with thousands
+#|       of gates, the state is kept in flat parallel lists, and
+#|       repulsion is only computed between vertices in the same or
+#|       adjacent cells of a uniform grid, which also serve as the
+#|       repulsion cutoff.  The vertices are kept inside the box, so
+#|       in a big graph they get crowded, and cells as big as the
+#|       ideal cutoff would fill up, making each iteration O(n^2)
+#|       again.  So the cells are sized to the actual density:  each
+#|       iteration, they're resized so that a vertex shares its cell
+#|       with only a few others on average (never growing past the
+#|       ideal cutoff, though), which keeps each iteration O(n).  In
+#|       crowded places, that shortens the range of the repulsion,
+#|       which is fine, since it's the nearest vertices that matter.
+#|
+#|       The caller runs the layout a few iterations at a time (e.g.,
+#|       once per animation frame, within a time budget) until
+#|       .converged goes true.  An iteration is only started if it's
+#|       expected to fit in the budget; otherwise, the budget is saved
+#|       up over calls until it does, so the layout takes no more than
+#|       its share of the time on average.  The distance vertices may
+#|       move per iteration shrinks geometrically (simulated annealing
+#|       style), so that the layout always settles down.
+#|
+#|       Converged positions are remembered in a module-level cache
+#|       keyed on the structure of the graph, so that laying out the
+#|       same network again (e.g., reopening its visualizer window)
+#|       starts out already converged.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+"""Force-directed layout of network diagrams."""
+
+from time import monotonic
+
+    #|--------------------------------------------------------------------
+    #| Our public (exported) names.
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+__all__ = ['ForceLayout']
+
+    # Converged layouts, keyed by graph signature (see ForceLayout.key).
+
+_cache = {}
+
+    #|---------------------------------------------------------------------------------
+    #|   ForceLayout                                            [module public class]
+    #|
+    #|       Damped spring/repulsion layout of a graph whose vertices
+    #|       are identified by hashable keys, within a box of the
+    #|       given width and height.
+    #|
+    #|       Usage example:
+    #|
+    #|           layout = ForceLayout(positions, edges, 800, 600)
+    #|           while not layout.converged:
+    #|               layout.run(budget=0.005)    # Seconds of work.
+    #|               ... redraw using layout.position(key) ...
+    #|
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class ForceLayout:
+
+        # Tuning parameters.
+
+    edgeLength = 90.0       # Ideal length of an edge, in pixels.
+    springK    = 0.05       # Spring constant for edges.
+    repulsion  = 4000.0     # Strength of short-range repulsion.
+    gravity    = 0.002      # Weak pull towards the middle of the box.
+    damping    = 0.8        # Fraction of velocity kept each iteration.
+    maxSpeed   = 20.0       # Max distance a vertex moves per iteration, at first.
+    cooling    = 0.99       # Factor the max distance shrinks by each iteration.
+    tolerance  = 0.2        # Converged once no vertex moves more than this.
+    margin     = 30.0       # Keep vertices this far inside the box.
+    crowding   = 4.0        # Target mean number of vertices per vertex's grid cell.
+
+        #-------------------------------------------------------------------
+        #   Initializer.
+        #
+        #       <positions> maps each vertex key to its starting (x,y).
+        #       <edges> is a sequence of (key1, key2) pairs.  If a
+        #       converged layout of the same graph is in the cache,
+        #       we start from that (and so are converged right away).
+
+    def __init__(self, positions:dict, edges, width:float, height:float):
+
+        self.keys = list(positions.keys())
+        index = {key: i for i, key in enumerate(self.keys)}
+
+        self.xs = [float(positions[key][0]) for key in self.keys]
+        self.ys = [float(positions[key][1]) for key in self.keys]
+        self.vxs = [0.0]*len(self.keys)
+        self.vys = [0.0]*len(self.keys)
+
+        self.edges = [(index[a], index[b]) for (a, b) in edges]
+        self.index = index
+        self.width = width;  self.height = height
+        self.converged = False
+        self.iterations = 0
+        self.temperature = self.maxSpeed    # Current max distance per iteration.
+        self.cellSize = None    # Grid cell size to use next (None = the ideal cutoff).
+        self.stepTime = 0.0     # How long the last iteration took (seconds).
+        self.credit = 0.0       # Time budget saved up from earlier runs.
+
+        self.key = (width, height, frozenset(self.keys),
+                    frozenset(frozenset(edge) for edge in edges))
+        cached = _cache.get(self.key)
+        if cached is not None:
+            for key, (x, y) in cached.items():
+                i = index[key];  self.xs[i] = x;  self.ys[i] = y
+            self.converged = True
+
+        # The current position of vertex <key>, as an (x,y) tuple.
+
+    def position(self, key):
+        i = self.index[key]
+        return (self.xs[i], self.ys[i])
+
+        #-------------------------------------------------------------------
+        #   run()                                       [public method]
+        #
+        #       Runs layout iterations for up to <budget> seconds, or
+        #       until <maxIterations> have been done, or the layout
+        #       converges.  Returns the number done.  An iteration is
+        #       only started if it's expected (from how long the last
+        #       one took) to fit in the time left, counting any budget
+        #       saved up from earlier calls that couldn't fit one, so
+        #       this may do none.  (The very first iteration is always
+        #       done, to find out how long they take.)  Once it
+        #       converges, the positions are saved in the cache.
+
+    def run(self, budget:float=0.005, maxIterations:int=None):
+
+        if self.converged: return 0
+        self.credit += budget
+        done = 0
+        while self.credit >= self.stepTime:
+            start = monotonic()
+            moved = self.step()
+            self.stepTime = monotonic() - start
+            self.credit -= self.stepTime
+            done += 1
+            if moved <= self.tolerance:
+                self.converged = True
+                _cache[self.key] = {key: (self.xs[i], self.ys[i])
+                                    for i, key in enumerate(self.keys)}
+                break
+            if maxIterations is not None and done >= maxIterations: break
+        if done:
+                # Don't save up time left over from cheap iterations, but
+                # do carry any overrun forward, as a debt.
+            self.credit = min(self.credit, budget)
+        return done
+
+        #-------------------------------------------------------------------
+        #   step()                                      [public method]
+        #
+        #       Does a single layout iteration.  Returns the largest
+        #       distance any vertex moved.
+
+    def step(self):
+
+        xs = self.xs;  ys = self.ys;  vxs = self.vxs;  vys = self.vys
+        n = len(xs)
+        fxs = [0.0]*n;  fys = [0.0]*n
+
+            # Springs along edges.
+
+        L = self.edgeLength;  k = self.springK
+        for (a, b) in self.edges:
+            dx = xs[b] - xs[a];  dy = ys[b] - ys[a]
+            d = (dx*dx + dy*dy)**0.5 or 0.01
+            f = k*(d - L)/d
+            fxs[a] += f*dx;  fys[a] += f*dy
+            fxs[b] -= f*dx;  fys[b] -= f*dy
+
+            # Short-range repulsion, using a grid whose cells are as
+            # big as the cutoff distance, so we only need to look at
+            # vertices in the same or neighboring cells.  The cutoff is
+            # 2*L, or less if that would crowd the cells (see above).
+
+        cutoff = min(self.cellSize or 2*L, 2*L)
+        while True:
+            grid = {}
+            for i in range(n):
+                cell = (int(xs[i]//cutoff), int(ys[i]//cutoff))
+                members = grid.get(cell)
+                if members is None: grid[cell] = [i]
+                else: members.append(i)
+
+                # Resize the cells for next time, to bring the average
+                # number of vertices sharing each vertex's cell to
+                # .crowding.  (That goes as the cells' area, so as the
+                # size squared.)  If they're far too crowded already
+                # (e.g., the first time), redo the grid right away.
+
+            crowding = sum(len(members)**2 for members in grid.values())/max(n, 1)
+            resized = max(cutoff*(self.crowding/max(crowding, 1.0))**0.5, 1.0)
+            if crowding <= 4*self.crowding or resized >= cutoff: break
+            cutoff = resized
+        self.cellSize = resized
+        cutoff2 = cutoff*cutoff;  C = self.repulsion
+
+        for (cx, cy), members in grid.items():
+            neighbors = []
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    other = grid.get((gx, gy))
+                    if other is not None: neighbors += other
+            for i in members:
+                xi = xs[i];  yi = ys[i];  fx = 0.0;  fy = 0.0
+                for j in neighbors:
+                    if j == i: continue
+                    dx = xi - xs[j];  dy = yi - ys[j]
+                    d2 = dx*dx + dy*dy
+                    if d2 >= cutoff2: continue
+                    if d2 < 0.01:                   # Coincident; nudge apart.
+                        dx = 0.1*((i - j) % 3 - 1) or 0.1;  d2 = 0.01
+                    f = C/d2
+                    fx += f*dx;  fy += f*dy
+                fxs[i] += fx;  fys[i] += fy
+
+            # Weak gravity, then damped motion, confined to the box.
+
+        mx = self.width/2;  my = self.height/2;  g = self.gravity
+        damp = self.damping;  vmax = self.temperature;  m = self.margin
+        moved = 0.0
+        for i in range(n):
+            vx = (vxs[i] + fxs[i] + g*(mx - xs[i]))*damp
+            vy = (vys[i] + fys[i] + g*(my - ys[i]))*damp
+            speed = (vx*vx + vy*vy)**0.5
+            if speed > vmax:
+                vx *= vmax/speed;  vy *= vmax/speed
+            x = min(max(xs[i] + vx, m), self.width - m)
+            y = min(max(ys[i] + vy, m), self.height - m)
+            dist = abs(x - xs[i]) + abs(y - ys[i])     # (Walls may stop us.)
+            vxs[i] = x - xs[i];  vys[i] = y - ys[i]
+            xs[i] = x;  ys[i] = y
+            if dist > moved: moved = dist
+
+        self.iterations += 1
+        self.temperature *= self.cooling    # Cool down, so we're sure to settle.
+        return moved
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|  END FILE:   forceLayout.py
+#|-------------------------------------------------------------------------
@@ -37,7 +37,7 @@
     #
     #============================================================================
 
-import sys, traceback
+import sys, time, traceback
 import _thread
 from tkinter import *       # TkInter, for Tcl/Tk Interpreter, is the GUI toolkit that comes with python.
 from threading import *     # High-level interface for working with threads.
@@ -195,11 +195,20 @@ class WrongThread(Exception):pass
     #       This subclass of Tk represents a TkInter main window
     #       within the context of a guiapp-based application.  It
     #       is special in that it arranges for the guibot worker
-    #       to be invoked periodically to check for commands that
-    #       may be sent to the GUI main loop from other threads.
+    #       to be woken up to check for commands that may be sent
+    #       to the GUI main loop from other threads.
 
 class _MainWin(Tk):
 
+        # Max time (in seconds) that check_worklist() will spend doing
+        # guibot jobs before giving TkInter a chance to process events.
+
+    jobBudget = 0.02    # 20 ms.
+
+        # Name of the virtual event used to wake up check_worklist().
+
+    wakeupEvent = '<<GuibotWakeup>>'
+
 
         #------------------------------------------------------------------
         #   Initializer.                        [instance special method]
@@ -281,6 +290,11 @@ class _MainWin(Tk):
             
             mainWinExists.rise()
 
+                # Arrange for us to be woken up whenever someone adds a new
+                # item to the guibot worklist, rather than polling for it.
+
+            inst.start_waker()
+
                 # Ask TkInter to have the main window check the guibot worklist
                 # for new things to do as soon as the GUI mainloop is running
                 # & idle (waiting for events).
@@ -353,18 +367,88 @@ class _MainWin(Tk):
     # End _MainWin.go().
     #---------------------------
 
+        #------------------------------------------------------------------
+        #   start_waker()                       [instance private method]
+        #
+        #       Sets up event-driven wakeups of check_worklist().  A
+        #       wakeup callback is installed on guibot's worklist that
+        #       just sets a threading.Event; a small daemon "waker"
+        #       thread waits on that event and turns it into a TkInter
+        #       virtual event, which is bound to check_worklist().  We
+        #       go through the waker thread, rather than generating the
+        #       Tk event directly from the worklist callback, so that
+        #       threads handing work to guibot never block waiting for
+        #       the Tcl interpreter (which could deadlock if guibot is
+        #       itself waiting on that thread).
+        #
+        #       This only works if Tcl was built with thread support.
+        #       If not, we leave .waker as None, and check_worklist()
+        #       falls back to polling every 100 ms as it always did.
+
+    def start_waker(inst):
+
+        inst.wakeFlag = Event()     # Set when new work arrives for guibot.
+        inst.waker = None           # No waker thread yet.
+
+        try:
+            threaded = inst.tk.eval('set tcl_platform(threaded)')
+        except TclError:
+            threaded = '0'
+
+        if threaded in ('', '0'):
+            logger.info("_MainWin.start_waker(): Tcl isn't threaded; guibot will poll its worklist.")
+            return
+
+        inst.bind(inst.wakeupEvent, lambda event: inst.check_worklist())
+
+        guibot.ensure_worklist()
+        guibot.todo.setWakeup(inst.wakeFlag.set)
+
+        inst.waker = ThreadActor(target=inst._waker_main, role='guiWaker',
+                                 component='GUI', daemon=True)
+        inst.waker.start()
+
+    # End _MainWin.start_waker().
+    #---------------------------------
+
+        #------------------------------------------------------------------
+        #   _waker_main()                       [instance private method]
+        #
+        #       Main routine of the waker thread (see start_waker()).
+        #       Runs until the main window is destroyed.
+
+    def _waker_main(inst):
+        while True:
+            inst.wakeFlag.wait()
+            inst.wakeFlag.clear()   # Clear first, so we can't miss a later set().
+            if inst.destroyed:
+                return
+            try:
+                inst.event_generate(inst.wakeupEvent, when='tail')
+            except RuntimeError:        # Main thread is not in main loop (yet).
+                mainloopRunning.wait()      # Wait for it to start,
+                inst.wakeFlag.set()         # and then try again.
+            except TclError:            # Window went away.
+                return
+
+    # End _MainWin._waker_main().
+    #---------------------------------
+
         #------------------------------------------------------------------
         #   check_worklist()                    [instance private method]
         #
         #       This method should only be called from within the
         #       guibot thread.  When guibot is in the TkInter mainloop,
-        #       it arranges for TkInter to call this callback
-        #       periodically, to ensure that guibot can still check for
+        #       it arranges for TkInter to call this callback whenever
+        #       new work arrives (or periodically, if Tcl isn't
+        #       threaded), to ensure that guibot can still check for
         #       more tasks to do while within the context of the fact
         #       that it is already in the middle of doing the "go"
         #       (run mainloop) task).  Needless to say, all tasks done
         #       by the guibot within here need to finish quickly, so
-        #       that the GUI don't become unresponsive.
+        #       that the GUI don't become unresponsive.  We also stop
+        #       after .jobBudget seconds and come back once TkInter has
+        #       had a chance to process pending events.
         
 
     def check_worklist(self):
@@ -381,14 +465,16 @@ class _MainWin(Tk):
             # Try doing any tasks that might be waiting in our worklist queue.
             # (But catch exceptions while doing so.)
 
+        deadline = time.monotonic() + self.jobBudget
+        
         try:
 
                 # The point of this loop is that if multiple tasks for us 
                 # got queued up since the last time we woke up, we go ahead
-                # and do them all now (clear the queue) rather than going
-                # to sleep for another tenth of a second after each item.
-                # This loop is only exited when do1job() throws an Empty
-                # exception (which it can do in nonblocking mode).
+                # and do them all now (clear the queue) rather than waking
+                # up once per item.  This loop is normally exited when
+                # do1job() throws an Empty exception (which it can do in
+                # nonblocking mode), or when we run out of time budget.
             
             while True:
                     # If someone asked us to exit, comply by throwing ExitingByRequest.
@@ -415,15 +501,19 @@ class _MainWin(Tk):
                     self.quit()     # Tells TkInter to quit its main loop.
                     return          # Return from this routine without scheduling an "after" callback.
 
-                    # In between guibot tasks, let TkInter check for common events
-                    # like resize, etc., for better overall responsiveness of the GUI.
-                    
-                self.update_idletasks()
+                    # If we've used up our time budget, come back for the rest
+                    # of the work after TkInter has handled pending events
+                    # (resize, redraw, etc.), for better responsiveness.
+
+                if time.monotonic() >= deadline:
+                    self.after(1, self.check_worklist)
+                    return
 
             # If worklist is empty now, there's nothing else to do; just return.
 
         except Empty:                   # Is the worklist queue empty?
-            pass                            # That's our normal way out of the loop.
+            if self.waker is not None:      # The waker will call us when there's more.
+                return
 
             # If someone asked the guibot to exit, then exit TkInter's mainloop also.
 
@@ -449,11 +539,11 @@ class _MainWin(Tk):
 #            self.destroy()  # Destroy _MainWin widget and all subwidgets.  Bad idea to do it this early?
 #            raise       # Re-raise that exception. Or does TkInter just swallow it up?
 
-        # If we exited the above queue-consumption loop normally, or because of an
-        # un-handled exception, then ask TkInter to call this routine again in not
-        # less than 100 milliseconds.  This effectively gives us our own main loop,
-        # inside of TkInter's mainloop.  The delay prevents excessive polling while
-        # remaining reasonably responsive.  
+        # If we have no waker thread, or an un-handled exception interrupted the
+        # above queue-consumption loop, then ask TkInter to call this routine again
+        # in not less than 100 milliseconds.  (Without a waker, this effectively gives
+        # us our own main loop, inside of TkInter's mainloop.)  The delay prevents
+        # excessive polling while remaining reasonably responsive.
         
         self.after(100, self.check_worklist)    # 100 ms = 1/10th sec.  Decently responsive.
 
@@ -489,6 +579,10 @@ class _MainWin(Tk):
 
         this.destroyed.rise()
 
+        if this.waker is not None:              # Let the waker thread exit.
+            guibot.todo.setWakeup(None)
+            this.wakeFlag.set()
+
     # End _MainWin.destroy().
     #-------------------------
 
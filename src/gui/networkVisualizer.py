@@ -27,6 +27,8 @@
 #|
 #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
 
+from    math            import  cos, sin, pi
+from    time            import  sleep, monotonic
 from    threading       import  *
 
 from    tkinter         import  *
@@ -34,6 +36,8 @@ from    tkinter         import  *
 from    logmaster   import  *
 from    gui         import  _logger
 
+from    .flag       import  *
+from    .forceLayout import ForceLayout
 from    .worklist   import  *
 from    .           import  guiapp       # For refreshing guibot
 from    .guiapp     import  *
@@ -49,17 +53,64 @@ __all__ = [
     # be implementing the guts of our functionality.  Later we may add more
     # widgets around the edges and the Canvas may be demoted to an instance
     # attribute.
+    #
+    # Rendering works like this:  The canvas items for nodes, gates and
+    # links are all created once, when the visualizer is created.  After
+    # that, our outputDriver thread runs a render loop that, at most
+    # .maxFps times a second, picks up the latest state snapshot that the
+    # simulator has published (see simulator.stateSnapshot), works out
+    # the new coordinates of everything that moves, and hands them to
+    # guibot as a single job that just applies them with .coords().  The
+    # simulator itself never calls us; all it does is publish a snapshot
+    # at the end of a time step when we've asked for one.  (Or, if the
+    # simulation is running in another process, we're handed its
+    # StateRing instead, which works the same way from our side; see
+    # simulator.simProcess.)
+    #
+    # Phase-portrait trails work similarly, except that the simulator
+    # records every step into a PhaseTrails ring buffer.  Each node has a
+    # matching ring of line-segment items, one per slot, so each frame
+    # only has to move the segments for the samples that are new since
+    # the last frame.  Fading is done by splitting each ring into
+    # .trailBands bands of slots, each band having its own tag; once
+    # per frame we recolor each band (by tag) according to how far it
+    # is behind the band currently being written.  Just before the
+    # writer enters a band, that band's stale segments (now the oldest
+    # ones) are collapsed out of sight, so they don't show up bright.
+    #
+    # The initial placement of nodes and gates is then tidied up by a
+    # force-directed layout (see forceLayout.py), which the render loop
+    # runs for up to .layoutBudget seconds per frame until it settles.
+    # All the items belonging to a given node or gate share a tag, so
+    # moving one is a single .move() call; only the links need their
+    # coordinates recomputed.  Settled layouts are cached, so opening
+    # another visualizer on the same network skips straight to the end.
 
 class NetworkVisualizer(Canvas):
 
+        # Appearance & pacing parameters.
+
+    maxFps      = 30        # Max frames per second we'll render.
+    nodeRadius  = 24        # Radius of the gray dot for each node, in pixels.
+    pointRadius = 3         # Radius of the dot marking a node's (q,p) state.
+    phaseScale  = 12        # Pixels per unit of q or p in phase diagrams.
+    gateSize    = (44, 24)  # Width, height of the box for each gate.
+    trailLength = 500       # Number of samples in each node's trail.
+    trailBands  = 10        # Number of steps in each trail's fade.
+    trailColor  = (255, 204, 0)     # RGB color of the newest part of a trail.
+    autoLayout  = True      # Tidy up the diagram with a force-directed layout?
+    layoutBudget = 0.005    # Max seconds per frame to spend on the layout.
+    framePriority = -1      # Frames go ahead of guibot's ordinary work.
+
     def __init__(inst, master:BaseWidget=None,
-                 title:str="Dynamic Network Visualizer",
-                 network:DynamicNetwork=None):
+                 title:str=None, network:DynamicNetwork=None,
+                 width:int=800, height:int=600, snapshots=None):
 
         global guibot;  guibot = guiapp.guibot      # Refresh this global
 
         if not ambot():
-            return guibot(lambda: inst.__init__(master, title, network))
+            return guibot(lambda: inst.__init__(master, title, network,
+                                                width, height, snapshots))
         
         inst.lock = RLock()
 
@@ -67,14 +118,359 @@ class NetworkVisualizer(Canvas):
 
             inst.network = network
 
+            if title is None:
+                title = "Network Visualizer for network '%s'" % str(network)
+
             if master is None:
                 master = TopWin(title=title)
 
-            Canvas.__init__(inst, master=master)
+            Canvas.__init__(inst, master=master, width=width, height=height,
+                            bg="black", highlightthickness=0)
+            inst.pack(side=TOP, expand=YES, fill=BOTH)
                             
             guigo()     # Start TkInter if not already running.
 
+            inst.closed = Flag()            # Raised when we go away.
+            inst.bind("<Destroy>", lambda event: inst.closed.rise(), add=True)
+
+            inst.nodeItems = {}     # Map from node name to its state-point item.
+            inst.nodeCenters = {}   # Map from node name to (x,y) of its center.
+            inst.nodeTags = {}      # Map from node name to the tag on all its items.
+            inst.linkItems = []     # List of (item, gate index, node name) for links.
+            inst.layout = None      # Our ForceLayout, while it's still settling.
+            inst.framePending = False   # True while guibot has a frame to apply.
+
+            inst.trails = None      # The simulator's PhaseTrails, if any.
+            inst.trailItems = {}    # Map from node name to its ring of segment items.
+            inst.trailSeen = 0      # Number of trail samples we've drawn so far.
+            inst.trailHead = None   # Band that was being written at the last frame.
+
+                # Where we get snapshots from.  Unless we're given some
+                # other source, it's the network's own simulation context,
+                # which can also record trails for us.
+
+            if snapshots is None and network is not None \
+                   and network.context is not None:
+                snapshots = network.context.snapshots
+                inst.trails = network.context.enableTrails(inst.trailLength)
+                inst.trailSeen = inst.trails.count
+
+            inst.snapshots = snapshots
+
+            if network is not None:
+                inst._layout(width, height)
+                if inst.autoLayout:
+                    inst._startLayout(width, height)
+                inst._createItems()
+
             inst.outputDriver = Worker(role="netVisDrv")
+
+            if network is not None and snapshots is not None:
+                inst.outputDriver.do(inst._renderLoop)
             
     def  amDriver(this):  return  current_thread() == this.outputDriver    
 
+        #-----------------------------------------------------------------
+        #   _layout()                           [instance private method]
+        #
+        #       Works out where on the canvas each node and gate goes.
+        #       Nodes are spaced evenly around a circle; each gate goes
+        #       at the centroid of the nodes it's linked to, pulled in
+        #       towards the middle (or, for a gate linked to only one
+        #       node, pushed out beyond it).  Gates that would land on
+        #       top of each other are nudged apart.
+
+    def _layout(this, width:int, height:int):
+
+        cx, cy = width/2, height/2
+        names = list(this.network.nodes.keys())
+        radius = 0.35*min(width, height)
+
+        for i in range(len(names)):     # (Not enumerate(); threading's shadows it.)
+            name = names[i]
+            angle = 2*pi*i/len(names) - pi/2
+            this.nodeCenters[name] = (cx + radius*cos(angle), cy + radius*sin(angle))
+
+        this.gatePlaces = []    # List of (component, (x,y), [node names]).
+        w, h = this.gateSize
+
+        for comp in this.network.components:
+            linked = [port.link.node.name for port in comp.ports.values()
+                      if port.linked]
+            if linked == []: continue
+            x = sum(this.nodeCenters[n][0] for n in linked)/len(linked)
+            y = sum(this.nodeCenters[n][1] for n in linked)/len(linked)
+            if len(linked) == 1:            # Push it out beyond its node.
+                d = max(1.0, ((x - cx)**2 + (y - cy)**2)**0.5)
+                out = this.nodeRadius + h + 12
+                x += (x - cx)/d*out;  y += (y - cy)/d*out
+            else:                           # Pull it in towards the middle.
+                x += (cx - x)*0.25;  y += (cy - y)*0.25
+            while any(abs(x - gx) < w + 4 and abs(y - gy) < h + 4
+                      for (_, (gx, gy), _) in this.gatePlaces):
+                y += h + 4
+            this.gatePlaces.append((comp, (x, y), linked))
+
+        #-----------------------------------------------------------------
+        #   _startLayout()                      [instance private method]
+        #
+        #       Sets up a ForceLayout starting from the positions found
+        #       by _layout().  If that layout is already cached, we move
+        #       everything to its final positions right away; otherwise
+        #       the render loop animates it as it settles.
+
+    def _startLayout(this, width:int, height:int):
+
+        positions = {('n', name): xy for name, xy in this.nodeCenters.items()}
+        edges = []
+        for g in range(len(this.gatePlaces)):
+            comp, xy, linked = this.gatePlaces[g]
+            positions[('g', g)] = xy
+            edges += [(('g', g), ('n', name)) for name in linked]
+
+        layout = ForceLayout(positions, edges, width, height)
+        layout.edgeLength = 2*this.nodeRadius + this.gateSize[0]
+
+        if layout.converged:
+            this._takeLayoutPositions(layout)
+        else:
+            this.layout = layout
+
+        # Copies the layout's current positions into .nodeCenters and
+        # .gatePlaces.
+
+    def _takeLayoutPositions(this, layout):
+        for name in this.nodeCenters:
+            this.nodeCenters[name] = layout.position(('n', name))
+        for g in range(len(this.gatePlaces)):
+            comp, xy, linked = this.gatePlaces[g]
+            this.gatePlaces[g] = (comp, layout.position(('g', g)), linked)
+
+        #-----------------------------------------------------------------
+        #   _createItems()                      [instance private method]
+        #
+        #       Creates all the canvas items, once.  Runs in guibot.
+        #       Links go first, so they end up underneath everything.
+
+    def _createItems(this):
+
+        w, h = this.gateSize;  r = this.nodeRadius;  pr = this.pointRadius
+
+        for g in range(len(this.gatePlaces)):
+            comp, (x, y), linked = this.gatePlaces[g]
+            for name in linked:
+                nx, ny = this.nodeCenters[name]
+                this.linkItems.append((this.create_line(x, y, nx, ny, fill="#555"),
+                                       g, name))
+
+        for g in range(len(this.gatePlaces)):
+            comp, (x, y), linked = this.gatePlaces[g]
+            tag = 'gate%d' % g
+            this.create_rectangle(x - w/2, y - h/2, x + w/2, y + h/2,
+                                  outline="white", fill="#223", tags=tag)
+            this.create_text(x, y, text=str(comp), fill="white", tags=tag)
+
+        length = this.trailLength;  bandSize = this._bandSize()
+        fade = this._fadeColors()
+
+        for name, (x, y) in this.nodeCenters.items():
+            tag = this.nodeTags[name] = 'node%d' % len(this.nodeTags)
+            this.create_oval(x - r, y - r, x + r, y + r, fill="#444", outline="", tags=tag)
+            this.create_line(x - r, y, x + r, y, fill="white", tags=tag)
+            this.create_line(x, y - r, x, y + r, fill="white", tags=tag)
+            this.create_text(x, y + r + 8, text=name, fill="white", tags=tag)
+            if this.trails is not None:
+                this.trailItems[name] = [       # Zero-length until drawn.
+                    this.create_line(x, y, x, y, fill=fade[-1],
+                                     tags=(tag, 'trail', 'trailband%d' % (slot // bandSize)))
+                    for slot in range(length)]
+            this.nodeItems[name] = this.create_oval(x - pr, y - pr, x + pr, y + pr,
+                                                    fill="yellow", outline="", tags=tag)
+
+        #-----------------------------------------------------------------
+        #   _renderLoop()                       [instance private method]
+        #
+        #       Runs in our outputDriver thread until the window closes
+        #       (or the driver is asked to exit).  Each time around, if
+        #       a new snapshot has been published and guibot has finished
+        #       applying the previous frame, computes and sends off the
+        #       next frame; then asks the simulator for another snapshot
+        #       and sleeps out the rest of the frame period.
+
+    def _renderLoop(this):
+
+        publisher = this.snapshots
+        period = 1.0/this.maxFps
+        seqno = 0
+
+        while not this.closed:
+
+            this.outputDriver.check_exitflag()
+            start = monotonic()
+
+            if not this.framePending:
+                updates = [];  recolors = [];  moves = []
+                if this.layout is not None:     # Still settling the layout?
+                    moves, updates = this._layoutUpdates()
+                latest = publisher.newerThan(seqno)
+                if latest is not None:
+                    seqno, snapshot = latest
+                    updates += this._frameUpdates(snapshot)
+                if this.trails is not None and this.trails.count > this.trailSeen:
+                    updates += this._trailUpdates()
+                    recolors = this._trailRecolors()
+                if updates or recolors or moves:
+                    this.framePending = True
+                    guibot.do(lambda u=updates, r=recolors, m=moves:
+                                  this._applyFrame(u, r, m),
+                              priority=this.framePriority)
+
+            publisher.request()
+
+            sleep(max(0.0, period - (monotonic() - start)))
+
+        #-----------------------------------------------------------------
+        #   _layoutUpdates()                    [instance private method]
+        #
+        #       Runs the force-directed layout for up to .layoutBudget
+        #       seconds, and returns a list of (tag, dx, dy) moves for
+        #       the nodes and gates, and a list of (item, coords)
+        #       updates for the links.  Drops the layout once it has
+        #       settled.  Runs in outputDriver.
+
+    def _layoutUpdates(this):
+
+        layout = this.layout
+        layout.run(budget=this.layoutBudget)
+
+        oldNodes = dict(this.nodeCenters)
+        oldGates = [xy for (comp, xy, linked) in this.gatePlaces]
+        this._takeLayoutPositions(layout)
+
+        moves = []
+        for name, (x, y) in this.nodeCenters.items():
+            x0, y0 = oldNodes[name]
+            if x != x0 or y != y0:
+                moves.append((this.nodeTags[name], x - x0, y - y0))
+        for g in range(len(this.gatePlaces)):
+            x, y = this.gatePlaces[g][1];  x0, y0 = oldGates[g]
+            if x != x0 or y != y0:
+                moves.append(('gate%d' % g, x - x0, y - y0))
+
+        updates = [(item, this.gatePlaces[g][1] + this.nodeCenters[name])
+                   for (item, g, name) in this.linkItems]
+
+        if layout.converged:
+            this.layout = None
+
+        return moves, updates
+
+        #-----------------------------------------------------------------
+        #   _frameUpdates()                     [instance private method]
+        #
+        #       Given a snapshot, returns a list of (item, coords)
+        #       pairs for the canvas items that need moving.  Runs in
+        #       outputDriver, so that guibot has as little to do as
+        #       possible.
+
+    def _frameUpdates(this, snapshot):
+
+        r = this.nodeRadius - this.pointRadius;  pr = this.pointRadius
+        scale = this.phaseScale
+        updates = []
+
+        for name, q, p in zip(snapshot.names, snapshot.positions, snapshot.momenta):
+            item = this.nodeItems.get(name)
+            if item is None: continue
+            x0, y0 = this.nodeCenters[name]
+            x, y = this._phasePoint(x0, y0, q, p)
+            updates.append((item, (x - pr, y - pr, x + pr, y + pr)))
+
+        return updates
+
+        # Where on the canvas the phase-space point (q,p) goes, for a node
+        # centered at (x0,y0).  Points are kept inside the node's dot.
+        # (Momentum increases upwards.)
+
+    def _phasePoint(this, x0:float, y0:float, q:float, p:float):
+        r = this.nodeRadius - this.pointRadius;  scale = this.phaseScale
+        return (x0 + max(-r, min(r, q*scale)),
+                y0 + max(-r, min(r, -p*scale)))
+
+        # Number of ring slots in each fade band.
+
+    def _bandSize(this):
+        return -(-this.trailLength // this.trailBands)      # (Rounded up.)
+
+        # List of trail colors, newest band first, fading to black.
+
+    def _fadeColors(this):
+        R, G, B = this.trailColor;  n = this.trailBands
+        return ["#%02x%02x%02x" % (R*(n - a)//n, G*(n - a)//n, B*(n - a)//n)
+                for a in range(n)]
+
+        #-----------------------------------------------------------------
+        #   _trailUpdates()                     [instance private method]
+        #
+        #       Returns (item, coords) pairs for the trail segments
+        #       ending at each sample that's new since the last frame,
+        #       plus collapsed (zero-length) coords for the stale
+        #       segments of any band the writer has just moved into.
+        #       The work done is proportional to the number of new
+        #       samples, not to the length of the trails.  Runs in
+        #       outputDriver.
+
+    def _trailUpdates(this):
+
+        trails = this.trails;  length = trails.length
+        count = trails.count;  bandSize = this._bandSize()
+        first = max(this.trailSeen, count - (length - 2), 1)    # (Need sample k-1 too.)
+        updates = []
+
+        for name, items in this.trailItems.items():
+            qs = trails.qs[name];  ps = trails.ps[name]
+            x0, y0 = this.nodeCenters[name]
+            j = (first - 1) % length
+            prev = this._phasePoint(x0, y0, qs[j], ps[j])
+            for k in range(first, count):
+                slot = k % length
+                if slot % bandSize == 0:        # Entering a new band?
+                    for old in range(slot + 1, min(slot + bandSize, length)):
+                        updates.append((items[old], (x0, y0, x0, y0)))
+                pt = this._phasePoint(x0, y0, qs[slot], ps[slot])
+                updates.append((items[slot], prev + pt))
+                prev = pt
+
+        this.trailSeen = count
+        return updates
+
+        # Returns (tag, color) pairs to recolor the fade bands, if the
+        # writer has moved on to a different band since the last frame.
+
+    def _trailRecolors(this):
+        head = ((this.trails.count - 1) % this.trails.length) // this._bandSize()
+        if head == this.trailHead: return []
+        this.trailHead = head
+        fade = this._fadeColors();  n = this.trailBands
+        return [('trailband%d' % band, fade[(head - band) % n]) for band in range(n)]
+
+        #-----------------------------------------------------------------
+        #   _applyFrame()                       [instance private method]
+        #
+        #       Applies a frame's worth of updates (and trail recolors
+        #       and layout moves, if any).  Moves go first, since the
+        #       updates are in terms of the new positions.  Runs in guibot.
+
+    def _applyFrame(this, updates, recolors=(), moves=()):
+        try:
+            if not this.closed:
+                for tag, dx, dy in moves:
+                    this.move(tag, dx, dy)
+                for item, coords in updates:
+                    this.coords(item, *coords)
+                for tag, color in recolors:
+                    this.itemconfig(tag, fill=color)
+        except TclError:            # Window went away under us.
+            this.closed.rise()
+        finally:
+            this.framePending = False
@@ -24,6 +24,7 @@
 
 import sys      # For stdout/stderr (& double-underscore-delimited versions of them)
 import re       # For regexp search(), split().
+import tempfile # For anonymous scrollback spill files.
 
 from time                   import sleep
 from threading              import *
@@ -99,6 +100,18 @@ Pink = "#faa";      Purple = "#8a2be2"      # <- Someone else calls this RGB cod
 END_OUTPUT      = "endout"      # Marks the end of the output area of the terminal.
 START_INPUT     = "startin"     # Marks the beginning of the input area of the terminal.
 
+    #|---------------------------------------------------------------------
+    #|  Regular expressions and translation table used by TikiTerm.write()
+    #|  to normalize output a whole string at a time, rather than character
+    #|  by character as putch() does.  The set of unprintable characters
+    #|  here must agree with TikiTerm.unprintable().
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+_newlineRE      = re.compile(r'\r\n|\n\r|\r|\n')          # A line end; CR/LF & LF/CR pairs count once.
+_unprintableRE  = re.compile('[\x00\x01\x1c-\x1f\x7f-\xa0]')  # Chars with no unique glyph.
+_unprintableMap = {byte: "[%02x]" % byte                    # Show those as hex codes in [brackets].
+                   for byte in (0, 1, *range(28, 32), *range(127, 161))}
+
     # Graphic object - blurry purplish separator between output & input areas.
 
 horiz_divider = None
@@ -208,6 +221,27 @@ def style(*args):
 
 class TikiTerm(Terminal, ScrolledText):
 
+        # Tuning parameters for write().  Buffered output is flushed to the
+        # display no later than flushDelay seconds after it was written, or
+        # as soon as flushSize characters have accumulated.
+
+    flushDelay = 0.05       # 50 ms; fast enough to look immediate.
+    flushSize  = 8192       # Characters.
+
+        # Scrollback limits.  Once the output area holds more than
+        # scrollback + trimChunk lines, the oldest lines are deleted in one
+        # go, leaving <scrollback> lines, so the cost of each insert stays
+        # constant however long we run.  If a spill file was requested, the
+        # deleted lines are saved there instead, and paged back in (a chunk
+        # at a time) when the user scrolls to the top of the output area.
+        # While the user is scrolled back from the end of the output area,
+        # trimming is paused (as is scrolling to show new output), so the
+        # lines they're reading, or have just paged in, stay put.  A
+        # scrollback of 0 means unlimited.
+
+    scrollback = 10000      # Lines.
+    trimChunk  = 1000       # Lines.
+
     #-----------------------------------------------------------------------------
     #   Nested classes of TikiTerm.
     #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
@@ -446,7 +480,7 @@ class TikiTerm(Terminal, ScrolledText):
         def write(this, text:str):
             if text == "": return   # Nothing to write.
 #TMI            debug("text [%s] color [%s]" % (text, this.style.fgColor))
-            this.term.put(text, this.style)     # Output using output stream's default text style.
+            this.term.write(text, this.style)   # Output using output stream's default text style.
 
             # flush() method, expected by users of File objects.
 
@@ -488,6 +522,33 @@ class TikiTerm(Terminal, ScrolledText):
     #       up here until we get to the end of a given write request,
     #       then the whole string is sent to the display.
     #
+    #   outsegs:list - Earlier (text, tags) segments of buffered output,
+    #       that were written in different styles than the text now in
+    #       outbuf.  They all get sent to the guibot together, as a
+    #       single text insert, by the next flush.
+    #
+    #   outlen:int - Total number of characters buffered in outsegs and
+    #       outbuf.  When this reaches flushSize, we flush right away.
+    #
+    #   outstyles:list - New styles used by buffered output, which the
+    #       output driver must declare before it flushes that output.
+    #
+    #   flushTimer:Timer - A one-shot timer, armed by write(), that will
+    #       flush the buffered output after flushDelay seconds, so that
+    #       a burst of small writes becomes a single display update.
+    #       None when no timed flush is pending.
+    #
+    #   scrollback:int - Maximum number of lines kept in the output area
+    #       (plus up to trimChunk more between trims, and any output that
+    #       arrives while the user is scrolled back).  0 = unlimited.
+    #
+    #   spill:file - Binary file that trimmed output lines are saved in,
+    #       or None if they're just discarded.  Used as a stack of chunks.
+    #
+    #   spillChunks:list - Byte offsets in spill at which each saved
+    #       chunk starts, oldest first.  The most recent chunk is the one
+    #       paged back in first when the user scrolls up.
+    #
     #   lastch:char - A single character (length-1 string) that was
     #       the last character output to the display.  This is needed
     #       for purposes of processing CRLF sequences properly.  It is
@@ -531,7 +592,7 @@ class TikiTerm(Terminal, ScrolledText):
     def __init__(inst, master:BaseWidget=None, title:str="TikiTerm Virtual Terminal",
                  fg = "white", bg = "black", insertbackground = "yellow",
                  width=80, height=24,   # These are in CHARACTER CELLS, not pixels.
-                 role = "tt", in_hook=None):
+                 role = "tt", in_hook=None, scrollback:int=None, spillfile=None):
 
         global horiz_divider        # Make this global for object persistence.
 
@@ -555,7 +616,8 @@ class TikiTerm(Terminal, ScrolledText):
             #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
         
         if not ambot():
-            return guibot(lambda: inst.__init__(master, title, fg, bg, insertbackground, width, height, role, in_hook))
+            return guibot(lambda: inst.__init__(master, title, fg, bg, insertbackground, width, height, role, in_hook,
+                                                scrollback, spillfile))
 
             #--------------------------------------------------------------------------
             # Keep in mind the below is all happening within the guibot worker thread.
@@ -650,6 +712,23 @@ class TikiTerm(Terminal, ScrolledText):
                 # Initialize output buffer and last-character memory.
 
             inst.outbuf = "";   inst.lastch = ""
+            inst.outsegs = [];  inst.outlen = 0;    inst.outstyles = []
+            inst.flushTimer = None          # No timed flush pending yet.
+
+                #------------------------------------------------------------
+                #  Set up scrollback limiting.  <scrollback> defaults to the
+                #  class's value (0 means unlimited); <spillfile> may be a
+                #  filename, or True for an anonymous temporary file.
+
+            if scrollback is not None:
+                inst.scrollback = scrollback
+            inst.spill = None;  inst.spillChunks = []
+            if spillfile is True:
+                inst.spill = tempfile.TemporaryFile()
+            elif spillfile:
+                inst.spill = open(spillfile, 'w+b')
+            if inst.spill is not None:
+                inst['yscrollcommand'] = inst._yscrolled    # So we see when the user reaches the top.
 
                 #----------------------------------------------------------
                 #  Create in, out, err virtual file handles.
@@ -1044,6 +1123,138 @@ class TikiTerm(Terminal, ScrolledText):
     # End method putch().
     #---------------------
 
+        #--------------------------------------------------------------------------
+        #
+        #   _normalize()                                [instance private method]
+        #
+        #       Does the same text transformations as putch(), but on a whole
+        #       string at once:  CR, LF, CR/LF and LF/CR all become a single
+        #       newline, and unprintable characters are shown as hex codes.
+        #       Updates .lastch so that a CR/LF pair split across two calls
+        #       is still treated as one line end.  Call with the lock held.
+        #
+        #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def _normalize(this, text:str):
+
+            # If the previous text ended with the first half of a CR/LF or
+            # LF/CR pair, then drop the second half from the start of this text.
+
+        if this.lastch in ('\r', '\n') and text[:1] in ('\r', '\n') and text[0] != this.lastch:
+            text = text[1:]
+            this.lastch = ""
+            if text == "": return ""
+
+            # Figure out what lastch should be once we're done.  Only the
+            # trailing run of line-end characters (if any) needs looking at.
+
+        run = text[len(text.rstrip('\r\n')):]
+        if run == "":
+            this.lastch = text[-1]
+        else:
+            i = 0
+            while i < len(run):
+                if i + 1 < len(run) and run[i+1] != run[i]:    # A CR/LF or LF/CR pair.
+                    this.lastch = "";       i += 2
+                else:
+                    this.lastch = run[i];   i += 1
+
+            # Now transform the text itself.
+
+        if '\r' in text:
+            text = _newlineRE.sub('\n', text)
+        if _unprintableRE.search(text):
+            text = text.translate(_unprintableMap)
+
+        return text
+
+    # End method _normalize().
+    #--------------------------
+
+        #--------------------------------------------------------------------------
+        #
+        #   write()                                     [instance public method]
+        #
+        #       Buffers the text <text> for display in style <style>.
+        #       This is the fast path for bulk output:  it may be called
+        #       from any thread, it processes the whole string at once,
+        #       and it doesn't wait for the outputDriver or guibot.  The
+        #       buffered text is flushed (as one text insert, even if it
+        #       contains several styles) after flushDelay seconds, or
+        #       right away if more than flushSize characters are waiting.
+        #       Use put() instead if you want it to be flushed right away.
+        #
+        #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def write(this, text:str, style:TikiTermTextStyle = None):
+
+        if text == "": return       # Nothing to write.
+
+        with this.lock:
+
+            text = this._normalize(text)
+            if text == "": return
+
+                # Figure out the TkInter tags for this style.  If the style
+                # has changed, set aside the text buffered in the old one.
+
+            tags = None                     # If no style is given, apply no new tags.
+            if style != None:
+                tags = (style.tagName)
+                if style.tagName not in this.styleDict and style not in this.outstyles:
+                    this.outstyles.append(style)    # The output driver will declare it.
+
+            if tags != this.curtags and this.outbuf != "":
+                this.outsegs.append((this.outbuf, this.curtags))
+                this.outbuf = ""
+
+            this.curstyle = style;      this.curtags = tags
+
+            this.outbuf += text
+            this.outlen += len(text)
+
+                # Flush now if there's a lot buffered, otherwise make sure
+                # a timed flush is on its way.
+
+            flushNow = this.outlen >= this.flushSize
+            if not flushNow and this.flushTimer is None:
+                this.flushTimer = Timer(this.flushDelay, this._timedFlush)
+                this.flushTimer.daemon = True
+                this.flushTimer.start()
+
+        if flushNow: this.flush()
+
+    # End method write().
+    #---------------------
+
+        # Called by flushTimer when it goes off.
+
+    def _timedFlush(this):
+        with this.lock:
+            this.flushTimer = None
+        this.flush()
+
+        #--------------------------------------------------------------------------
+        #
+        #   _takeOutput()                               [instance private method]
+        #
+        #       Removes everything from the output buffer, and returns it as
+        #       a list of (text, tags) segments.  Also cancels any pending
+        #       timed flush, since there's nothing left for it to do.  Call
+        #       with the lock held.
+        #
+        #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def _takeOutput(this):
+        if this.flushTimer is not None:
+            this.flushTimer.cancel()
+            this.flushTimer = None
+        segs = this.outsegs
+        if this.outbuf != "":
+            segs.append((this.outbuf, this.curtags))
+        this.outsegs = [];  this.outbuf = "";   this.outlen = 0
+        return segs
+
         #----------------------------------------------------------------------
         #
         #   _raw_write()                            [instance private method]
@@ -1139,6 +1350,20 @@ class TikiTerm(Terminal, ScrolledText):
                 #  which the guibot is in the middle of trying to process.
 
             if text==None or text=="": return   # Nothing to flush.
+            if isinstance(text, list):          # A batch of (text, tags) segments?
+                if this.dying:
+                    for (segtext, segtags) in text:
+                        this._flush_to_stdio(segtext, segtags)
+                    return
+                args = []
+                for (segtext, segtags) in text:
+                    args += [segtext, segtags if segtags is not None else ()]
+                following = this._following()   # Was the view at the end?
+                this.insert(END_OUTPUT, *args)  # All segments in one insert.
+                if following:                   # Only then trim and keep up.
+                    this._trimScrollback()
+                    this.see(END)
+                return
             if this.dying:                      # Is this widget in the process of being torn down?
 #                logger.warn("guibot: TikiTerm.flush(): Warning: Terminal is dying; "
 #                           "re-routing console log output back to default stdio...")
@@ -1149,9 +1374,12 @@ class TikiTerm(Terminal, ScrolledText):
 #                      file=sys.__stdout__)
                 this._flush_to_stdio(text, tags)
                 return                          # Don't do the usual widget operation.
+            following = this._following()       # Is the user watching the end of the output?
             this.insert(END_OUTPUT, text, tags);       # Output the text using the current tags.
                 # We insert it at the end of the output area of the terminal.
-            this.see(END)                       # Make sure text that was just output is visible.
+            if following:                       # (If not, leave their view alone.)
+                this._trimScrollback()              # Don't let the output area grow without limit.
+                this.see(END)                       # Make sure text that was just output is visible.
 
             #  NOTE TO SELF:  We really need to do something above where we deal specially with any
             #  text that may be being manually typed by the user into the ScrollableText widget.
@@ -1174,14 +1402,23 @@ class TikiTerm(Terminal, ScrolledText):
         elif current_thread() == this.outputDriver:     # In outputDriver thread?
 #            print(current_thread(),": TikiTerm.flush(): Asking guibot to flush [%s]..." % this.outbuf)
             with this.lock:                         # Atomically for this tikiterm object,
-                text = this.outbuf.expandtabs()         # Expand tabs to spaces
-                tags = this.curtags                     # Get current buffer's tags
-                this.outbuf = ""                        # Then clear the output buffer. (Consume text.)
-                if text==None or text=="": return       # Nothing to print? Quit early.
+                segs = [(segtext.expandtabs(), segtags)     # Expand tabs to spaces
+                        for (segtext, segtags) in this._takeOutput()]   # in the consumed text.
+                styles = this.outstyles;    this.outstyles = []
+                if segs == []: return                   # Nothing to print? Quit early.
                 if this.dying:                          # If we're dying (can't print to terminal),
-                    this._flush_to_stdio(text, tags)        # Print text to stdio instead.
+                    for (text, tags) in segs:
+                        this._flush_to_stdio(text, tags)    # Print text to stdio instead.
                     return                                  # & quit early.
 
+                # Make sure any new styles have their tags configured first.
+                # (This goes through guibot, so don't hold our lock for it.)
+
+            for style in styles:
+                this.declareStyle(style)
+
+            with this.lock:
+
                     #-----------------------------------------------------------------------------
                     #  The reason we go ahead and send the text as an argument to the below
                     #  lambda, rather than having the guibot retrieve it directly from outbuf,
@@ -1191,7 +1428,7 @@ class TikiTerm(Terminal, ScrolledText):
                     #  sent via stderr back to the tikiterm, which then gets hung up trying to
                     #  get a response from the guibot.
 
-                guibot.do(lambda:this.flush(text,tags))     # Have the GUI worker thread do the real work.
+                guibot.do(lambda:this.flush(segs))      # Have the GUI worker thread do the real work.
 
             #----------------------------------------------------------------------------------------------
             #  OTHER THREADS
@@ -1201,8 +1438,8 @@ class TikiTerm(Terminal, ScrolledText):
             
             with this.lock:             # This "with" is to avoid going thru outputDriver if 
                 if this.dying:              # we can't really print to the terminal anyway cuz it's dying.
-                    this._flush_to_stdio(this.outbuf,this.curtags)
-                    this.outbuf = ""    # Clear buffer.
+                    for (text, tags) in this._takeOutput():     # (This also clears the buffer.)
+                        this._flush_to_stdio(text, tags)
                     return
 
                 #-------------------------------------------------------------------
@@ -1228,13 +1465,111 @@ class TikiTerm(Terminal, ScrolledText):
                     #  much choice at this point.
                     
                 with this.lock:     # Try our best to be thread-safe.  Hope it doesn't block!
-                    this._flush_to_stdio(this.outbuf,this.curtags)
-                    this.outbuf = ""    # Clear output buffer.
+                    for (text, tags) in this._takeOutput():     # (This also clears the buffer.)
+                        this._flush_to_stdio(text, tags)
                     
     #|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
     #|  End method flush().
     #|-------------------------------------------------------------------------------------------
 
+        #--------------------------------------------------------------------------
+        #
+        #   _following()                                [instance private method]
+        #
+        #       Whether the view currently shows the end of the text, i.e.,
+        #       the user hasn't scrolled back.  New output is only scrolled
+        #       into view, and old output only trimmed, when this is so.
+        #       Runs in the guibot thread.
+        #
+        #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def _following(this):
+        return float(this.yview()[1]) >= 1.0
+
+        #--------------------------------------------------------------------------
+        #
+        #   _trimScrollback()                           [instance private method]
+        #
+        #       If the output area has grown more than trimChunk lines past
+        #       our scrollback limit, deletes the oldest lines (saving them
+        #       to the spill file, if we have one) to bring it back down to
+        #       <scrollback> lines.  Trimming in chunks like this means the
+        #       (fairly expensive) delete happens only once per trimChunk
+        #       lines of output.  Only called while the user is following
+        #       the output (see above), so lines that they've scrolled back
+        #       to, or paged in, aren't deleted from under them; those are
+        #       spilled again once they return to the end.  Runs in the
+        #       guibot thread.
+        #
+        #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def _trimScrollback(this):
+
+        if not this.scrollback: return          # Unlimited scrollback.
+
+        nlines = int(this.index(END_OUTPUT).split('.')[0]) - 1     # Complete lines of output.
+        if nlines <= this.scrollback + this.trimChunk: return
+
+        cut = "%d.0" % (nlines - this.scrollback + 1)  # Start of the first line we keep.
+
+        if this.spill is not None:              # Save the lines before deleting them.
+            this.spill.seek(0, 2)
+            this.spillChunks.append(this.spill.tell())
+            this.spill.write(this.get("1.0", cut).encode('utf-8'))
+
+        this.delete("1.0", cut)
+
+    # End method _trimScrollback().
+    #-------------------------------
+
+        #--------------------------------------------------------------------------
+        #
+        #   _yscrolled()                                [instance private method]
+        #
+        #       Our yscrollcommand, when we have a spill file.  Passes the
+        #       new view position on to the scrollbar as usual, and if the
+        #       user has scrolled all the way to the top, arranges to page
+        #       in the most recently spilled chunk of output.
+        #
+        #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def _yscrolled(this, first, last):
+        this.vbar.set(first, last)
+        if float(first) == 0.0 and this.spillChunks and not this.dying:
+            this.after_idle(this._pageIn)
+
+        #--------------------------------------------------------------------------
+        #
+        #   _pageIn()                                   [instance private method]
+        #
+        #       Pages the most recently spilled chunk of output back in at the
+        #       top of the output area, and truncates it off the spill file
+        #       (which therefore works like a stack).  The view stays on the
+        #       line that was at the top before, so the user can keep
+        #       scrolling up into the restored text.  (Paged-in text is shown
+        #       without its original styles.)  Trimming is paused while the
+        #       user is scrolled back, so these lines are only spilled out
+        #       again after they've returned to the end of the output.
+        #
+        #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def _pageIn(this):
+
+        if not this.spillChunks or this.dying: return
+        if float(this.yview()[0]) != 0.0: return        # User has moved away again.
+
+        start = this.spillChunks.pop()
+        this.spill.seek(start)
+        text = this.spill.read().decode('utf-8')
+        this.spill.seek(start)
+        this.spill.truncate()
+
+        this.insert("1.0", text)
+        this.yview("%d.0" % (text.count("\n") + 1))
+
+    # End method _pageIn().
+    #-----------------------
+
         #----------------------------------------------------------------------------------------
         #
         #   put_dying()                                             [instance private method]
@@ -1310,25 +1645,12 @@ class TikiTerm(Terminal, ScrolledText):
 
 #            print(current_thread(), ": TikiTerm.put(): Acquired the terminal lock...")
 
-                #---------------------------------------------------------
-                # Figure out the text style and correponding TkInter tag.
-            
-            tags = None                     # If no style is given, apply no new tags.
-            if style != None:               # If a style is given,
-                this.declareStyle(style)    #   make sure a tag is configured for it,
-                tags = (style.tagName)      #   and make sure we'll use that tag.
-
-                #---------------------------------------------------------
-                # Remember style and tags for when we do a flush() later.
-            
-            this.curstyle = style;      this.curtags = tags
-
                 #--------------------------------------------------------------
-                #  Process all characters in the string.  This does some simple
-                #  text transformations, such as for CR/LF sequences.
+                #  Buffer up the whole string in the given style.  This does
+                #  some simple text transformations, such as for CR/LF sequences,
+                #  and remembers the style and tags for the flush() below.
             
-            for ch in text[:]:  # For each character in the string,
-                this.putch(ch)      # process it into our output buffer.
+            this.write(text, style)
 
                 #--------------------------------------------------
                 #  Flush the output buffer to the terminal display.
@@ -1569,6 +1891,13 @@ class TikiTerm(Terminal, ScrolledText):
         logger.debug("TikiTerm.destroy(): Destroying underlying ScrolledText widget...")
         ScrolledText.destroy(this)
 
+            #----------------------------------------------------
+            #  Close the scrollback spill file, if we have one.
+
+        if getattr(this, 'spill', None) is not None:
+            this.spill.close()
+            this.spill = None;  this.spillChunks = []
+
             #---------------------------------------------------------------------------
             #  At this point, we're done destroying ourselves, and we can go ahead and
             #  tell anyone who was waiting for that to happen that they can breathe a
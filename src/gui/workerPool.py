@@ -0,0 +1,369 @@
+#============================================================
+#   workerPool.py - Pools of worker threads that share work.
+#
+#       A plain Worker (see worklist.py) has one worklist, and
+#       does the items on it one at a time, in order.  That's
+#       just what we want for something like the guibot, whose
+#       tasks must all be done in one particular thread.  But
+#       for work that can be done in any thread (background
+#       analysis, file output, and other jobs that don't touch
+#       the GUI), it means that unrelated jobs queue up behind
+#       each other, even while other threads sit idle.
+#
+#       A WorkerPool is a team of N PoolWorkers, each of which
+#       has its own Worklist.  New work is dealt out to the
+#       workers' worklists in turn (or, if it's submitted by a
+#       pool worker itself, it goes onto that worker's own
+#       worklist, since it's likely to be related to what the
+#       worker is doing).  Each worker takes items from the
+#       front of its own worklist; when that's empty, it looks
+#       through the other workers' worklists and steals an item
+#       from the back of the first nonempty one it finds.  Only
+#       when there's nothing to do anywhere in the pool does it
+#       go to sleep, until new work is submitted.
+#
+#       Work can be submitted one item at a time, with submit(),
+#       which returns the WorkItem so that the caller can wait
+#       for it; or as a batch, with runAll() or map(), which
+#       wait for the whole batch and return a list of results.
+#       Batches are dealt out with one lock acquisition per
+#       worker, and wake up the pool just once.  If a pool worker
+#       waits for a batch, it helps work on it (and on anything
+#       else in the pool) while it waits, rather than just
+#       blocking, so that nested batches can't deadlock the pool.
+#
+#   Classes provided:
+#
+#       PoolWorker - A Worker that belongs to a WorkerPool.
+#
+#       WorkerPool - A team of PoolWorkers sharing their work.
+#
+#============================================================
+
+    #---------------------------------------
+    # Import some standard python modules.
+
+import os
+
+from threading import Condition, current_thread
+
+    #-----------------------------------------
+    # Import some of our own custom modules.
+
+from logmaster import *     # Our customized logging facility.
+
+from .worklist import *     # Worklists, work items and workers.
+
+logger = getLogger(appName + ".work")
+
+    #--------------------------------------------------------------------
+    # Our public (exported) names.
+
+__all__ = ['PoolWorker', 'WorkerPool']
+
+
+    #------------------------------------------------------------------
+    # PoolWorker [module class] - A worker thread in a WorkerPool.
+    #
+    #   Just like a Worker, except that when its own worklist is
+    #   empty, it steals work from the other workers in its pool,
+    #   and when there's no work in the pool at all, it waits on
+    #   the pool's condition for more to be submitted (rather than
+    #   on its own worklist), or exits if the pool is shutting down.
+    #   Also, a task that raises an exception doesn't kill a pool
+    #   worker; the exception is just left in the task's WorkItem
+    #   for whoever submitted it to find.
+    #
+    #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class PoolWorker(Worker):
+
+    defaultRole = 'poolWorker'
+
+    #---------------------------------------------------------------------------------
+    #   Instance data members (in addition to those of Worker):
+    #
+    #       pool:WorkerPool - The pool that this worker belongs to.
+    #
+    #       index:int - Our position in the pool's list of workers.
+    #
+    #----------------------------------------------------------------------------------
+
+    def __init__(inst, pool, index:int, role=None, component=None, start:bool=True):
+        inst.pool = pool
+        inst.index = index
+        Worker.__init__(inst, worklist=Worklist(), start=False,
+                        role=role, component=component)
+        inst.todo.mainWorker = inst
+        inst.daemon = True          # Don't hold up the process from exiting.
+        if start:
+            inst.start()
+
+        #-------------------------------------------------------------------------------
+        #   do1job() [instance internal method] - Like Worker.do1job(), except that
+        #       ordinary exceptions raised by the task (which Worker.do1job() has
+        #       already logged, and recorded in the WorkItem) aren't re-raised.
+
+    def do1job(self, block:bool=True, timeout=None):
+        try:
+            return Worker.do1job(self, block, timeout)
+        except (Empty, ExitingByRequest, ExitException):
+            raise
+        except Exception:
+            return None
+
+        #-------------------------------------------------------------------------------
+        #   next_task() [instance internal method] - Find the next work item to do:
+        #       first on our own worklist, then on those of the other workers in
+        #       the pool.  If there's none anywhere, then exit if the pool is
+        #       shutting down, or else either wait until some more work is
+        #       submitted (if <block> is true), or raise Empty.  While we wait,
+        #       we also check for exit requests.
+
+    def next_task(self, block:bool=True, timeout=None):
+
+        pool = self.pool
+
+        while True:
+
+            generation = pool.generation        # Read this BEFORE looking for work.
+            workers = pool.workers
+            n = len(workers)
+
+            try:
+                return (self.todo.getItem(block=False), self.todo)
+            except Empty:
+                pass
+
+                # Our worklist is empty; try stealing from the others', starting
+                # with our right-hand neighbor, so that thieves are spread out.
+
+            for i in range(1, n):
+                victim = workers[(self.index + i) % n].todo
+                try:
+                    return (victim.getItem(block=False, back=True), victim)
+                except Empty:
+                    pass
+
+            if pool.closing:
+                self.exitByRequest()
+            if not block:
+                raise Empty
+
+                # There's nothing to do anywhere.  Wait for the pool's generation
+                # count to change (which happens whenever work is submitted); if
+                # it already has since we read it, some new work was submitted
+                # while we were looking, so go look again right away.
+
+            with pool.workAvailable:
+                if pool.generation == generation:
+                    self.waiting.rise()
+                    self.check_exitflag()
+                    pool.workAvailable.wait(timeout)
+                    self.waiting.fall()
+                    self.check_exitflag()
+                    if timeout is not None and pool.generation == generation:
+                        raise Empty
+
+# End class PoolWorker.
+
+
+    #------------------------------------------------------------------
+    # WorkerPool [module class] - A team of workers sharing a load.
+    #
+    #   Usage example:
+    #
+    #       pool = WorkerPool(4, role='analysis')
+    #
+    #       item = pool.submit(lambda: writeReport(path))
+    #       ...
+    #       item.wait()                     # If we need to know it's done.
+    #
+    #       stats = pool.map(computeStats, networks)    # Waits for all.
+    #
+    #       pool.shutdown()
+    #
+    #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class WorkerPool:
+
+    #---------------------------------------------------------------------------------
+    #   Instance data members:
+    #
+    #       workers:list - The PoolWorkers in this pool.
+    #
+    #       workAvailable:Condition - Notified whenever work is submitted.
+    #
+    #       generation:int - Incremented (while holding workAvailable) whenever
+    #           work is submitted, so that a worker can tell if any was
+    #           submitted while it was looking around for something to do.
+    #
+    #       nextWorker:int - Index of the worker to deal the next item to.
+    #
+    #       closing:bool - Set by shutdown().  Workers exit when they run
+    #           out of work once this is set.
+    #
+    #----------------------------------------------------------------------------------
+
+        #-------------------------------------------------------------------------------
+        #   Instance initializer.
+        #
+        #       Creates and starts <nWorkers> PoolWorkers (by default, one per CPU),
+        #       whose thread roles will be <role> followed by their index.  None
+        #       of them is started until they're all in the list, so that every
+        #       worker sees the whole pool when it looks for work to steal.
+
+    def __init__(inst, nWorkers:int=None, role:str='pool', component:str=None):
+        if nWorkers is None:
+            nWorkers = os.cpu_count() or 2
+        inst.workAvailable = Condition()
+        inst.generation = 0
+        inst.nextWorker = 0
+        inst.closing = False
+        inst.workers = [PoolWorker(inst, i, role='%s%d' % (role, i),
+                                   component=component, start=False)
+                        for i in range(nWorkers)]
+        for worker in inst.workers:
+            worker.start()
+
+        #-------------------------------------------------------------------------------
+        #   submit()                                        [instance external method]
+        #
+        #       Adds the given task (a WorkItem, or any callable) to the pool, and
+        #       returns its WorkItem.  Wait for it with its wait() method, and then
+        #       look at its result (or exception) attributes, or use its future.
+        #       If <front> is true, the item goes at the front of its worklist,
+        #       ahead of other work at the same priority.  See WorkItem for
+        #       <priority> and <deadline>.
+
+    def submit(inst, task, front:bool=False, priority:int=None, deadline=None) -> WorkItem:
+        item = inst._workItem(task, priority, deadline)
+        inst._worklistFor().addItem(item, front=front)
+        inst._wakeup()
+        return item
+
+        #-------------------------------------------------------------------------------
+        #   runAll()                                        [instance external method]
+        #
+        #       Submits all of the given tasks as one batch, and then waits for
+        #       them all to finish.  Returns a list of their results, in order.
+        #       If any of them raised an exception, re-raises the first one (after
+        #       all of them are finished).
+
+    def runAll(inst, tasks) -> list:
+
+        items = [inst._workItem(task) for task in tasks]
+
+            # Deal the items out to the workers, taking each worklist's lock just
+            # once.  If we're a worker in this pool, keep the first share for
+            # ourselves, since we'll be helping out anyway.
+
+        n = len(inst.workers)
+        me = current_thread()
+        first = me.index if inst._isMember(me) else inst.nextWorker
+        for w in range(n):
+            share = items[w::n]
+            if share:
+                worklist = inst.workers[(first + w) % n].todo
+                with worklist.lock:
+                    for item in share:
+                        worklist.addItem(item)
+        inst.nextWorker = (first + len(items)) % n
+
+        inst._wakeup(all=True)
+
+        inst._waitFor(items)
+
+        for item in items:
+            if item.exception is not None:
+                raise item.exception
+        return [item.result for item in items]
+
+        #-------------------------------------------------------------------------------
+        #   map()                                           [instance external method]
+        #
+        #       Like the built-in map(), but the calls are done in the pool (as one
+        #       batch), and the results are returned as a list.
+
+    def map(inst, function, *iterables) -> list:
+        return inst.runAll([(lambda args=args: function(*args))
+                            for args in zip(*iterables)])
+
+        #-------------------------------------------------------------------------------
+        #   shutdown()                                      [instance external method]
+        #
+        #       Closes the pool's worklists for good, and tells the workers to exit
+        #       once they've finished everything that's already been submitted.  If
+        #       <wait> is true, waits for them to do so.
+
+    def shutdown(inst, wait:bool=True):
+        for worker in inst.workers:
+            worker.todo.closeForever()
+        inst.closing = True
+        inst._wakeup(all=True)
+        if wait:
+            for worker in inst.workers:
+                if worker is not current_thread():
+                    worker.join()
+
+        #-------------------------------------------------------------------------------
+        #   Private methods.
+
+        # Wrap plain callables in WorkItems.  These have no owner until some
+        # worker takes them, since we don't know which one that will be.
+
+    def _workItem(inst, task, priority:int=None, deadline=None):
+        if not isinstance(task, WorkItem):
+            task = WorkItem(task)
+        if priority is not None:
+            task.priority = priority
+        if deadline is not None:
+            task.deadline = deadline
+        return task
+
+    def _isMember(inst, thread):
+        return isinstance(thread, PoolWorker) and thread.pool is inst
+
+        # Which worklist should the next item submitted go on?
+
+    def _worklistFor(inst):
+        me = current_thread()
+        if inst._isMember(me):
+            return me.todo
+        with inst.workAvailable:
+            worker = inst.workers[inst.nextWorker]
+            inst.nextWorker = (inst.nextWorker + 1) % len(inst.workers)
+        return worker.todo
+
+    def _wakeup(inst, all:bool=False):
+        with inst.workAvailable:
+            inst.generation += 1
+            if all:
+                inst.workAvailable.notify_all()
+            else:
+                inst.workAvailable.notify()
+
+        # Wait for all of the given items to stop.  If we're one of the pool's
+        # own workers, we do work from the pool while we wait, instead of just
+        # blocking (which could leave nobody free to do the items we're waiting
+        # for).
+
+    def _waitFor(inst, items):
+        me = current_thread()
+        helping = inst._isMember(me)
+        for item in items:
+            while not item.stopped():
+                if helping:
+                    try:
+                        me.do1job(block=False)
+                    except Empty:
+                        item.stopped.wait(0.001)
+                    except ExitingByRequest:
+                        helping = False     # Pool's shutting down; just wait.
+                else:
+                    item.wait()
+
+# End class WorkerPool.
+
+# END MODULE workerPool.py
+#================================================================================================================
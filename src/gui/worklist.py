@@ -34,10 +34,13 @@
 #
 #       WorkItem - A specific task that needs to be done.
 #           It carries various flags for requesting and
-#           reporting various actions.
+#           reporting various actions, an optional priority
+#           and deadline, and (on request) a future that
+#           can be awaited, e.g. from asyncio.
 #
 #       Worklist - A FIFO queue of work items that need
-#           doing. A worklist can have one or more workers
+#           doing, at each of any number of integer priority
+#           levels.  A worklist can have one or more workers
 #           assigned to follow it.  The presumption is
 #           that any worker assigned to the worklist
 #           could do any item that might appear on it.
@@ -103,7 +106,13 @@
 
 import sys, traceback   # To facilitate debugging.
 
-from threading import Thread, RLock, current_thread    # High-level threading module.
+from threading import Thread, Lock, RLock, current_thread    # High-level threading module.
+
+from collections import deque   # Worklists keep a deque for each priority level.
+from bisect import insort       # ...and a sorted list of the levels.
+from time import monotonic      # Work item deadlines are in terms of this clock.
+
+from concurrent.futures import Future   # WorkItems can provide one of these.
 
 from numbers import Number      # Used in some argument type declarations.
 
@@ -122,6 +131,8 @@ from logmaster import *     # Our customized logging facility.
 
 from .utils import bind      # We use the bind() function in HireThread
 
+from .workstats import WorklistStats    # Accounting for worklists.
+
 logger = getLogger(appName + ".work")
 
     #--------------------------------------------------------------------
@@ -132,7 +143,7 @@ __all__ = ['Empty', 'Full',     # Exceptions inherited from Desque.
            'WorkItemException', 'NotOwner', 'AlreadyStarted',   # new exceptions
            'WorkAborted', 'EarlyCompletion', 'ExitingByRequest',
            'WorkerExiting', 'NullCallable', 'WorklistClosed',
-           'WorklistClosedForever', 'WorkerException', 
+           'WorklistClosedForever', 'WorkerException', 'DeadlineExpired',
            'WorkItem',      # Other classes
            'Worklist',
            'Worker', 'RPCWorker',
@@ -194,6 +205,15 @@ class WorkAborted(WorkItemException, InfoException): pass
 
 class EarlyCompletion(WorkItemException, InfoException): pass
 
+    #-----------------------------------------------------------------
+    #   DeadlineExpired [module class] - An exception declaring that
+    #       a WorkItem was dropped without being done, because its
+    #       deadline had already passed by the time a worker got to
+    #       it.  It isn't raised, just left in the item's .exception
+    #       attribute (and its future, if any).
+
+class DeadlineExpired(WorkItemException, InfoException): pass
+
     #-------------------------------------------------------------------
     #   NullCallable [module class] - Callable in the worklist is None.
 
@@ -278,8 +298,28 @@ class Worklist(Desque): pass
     #       However, work on a task could be suspended and then
     #       resumed later within the SAME worker thread by simply
     #       suspending the thread itself.
+    #
+    #       A work item has a priority (an integer; lower numbers
+    #       are done first, and the default is 0), which determines
+    #       where it goes on a worklist, and optionally a deadline
+    #       (a time.monotonic() value), after which it's stale:  a
+    #       worker that gets to it too late just drops it, rather
+    #       than doing it.
+    #
+    #       Besides waiting on its flags, a customer can ask a work
+    #       item for its .future, which is a concurrent.futures.Future
+    #       that gets the item's result (or exception) when it stops.
+    #       That makes it easy to combine with other futures, or to
+    #       wait for from asyncio code, as in "await workItem" (which
+    #       uses asyncio.wrap_future()).  Cancelling the future before
+    #       the item has started means the item won't be done at all.
 
 class WorkItem():
+
+        # Guards the lazy creation of futures.  It's a class-wide lock,
+        # since the item's own lock is held the whole time it's being done.
+
+    _futureLock = Lock()
     
     #------------------------------------------------------------
     # Instance variables:
@@ -361,9 +401,24 @@ class WorkItem():
     #               this work item failed due to an exception
     #               other than EarlyCompletion.
     #
+    #   And some that only matter to worklists and workers:
+    #
+    #       priority:int - Lower numbers are taken off worklists first.
+    #
+    #       deadline:Number - If not None, the time.monotonic() value
+    #               after which the item should be dropped undone.
+    #
+    #       kind:str - What kind of task this is, for the run-time
+    #               statistics kept by worklists (see workstats.py).
+    #               By default, the name of the task's callable.
+    #
+    #       enqueued:Number - The time.monotonic() value when the item
+    #               was last added to a worklist (or None).
+    #
     #---------------------------------------------------------------
     
-    def __init__(self, callable=None, owner=None):
+    def __init__(self, callable=None, owner=None, priority:int=0, deadline:Number=None,
+                 kind:str=None):
         self.lock = RLock()             # Reentrant lock for thread-safe access to class and instance variables.
         with self.lock:                 # Go ahead and use it, just in case.
             self.maker = current_thread()
@@ -373,6 +428,12 @@ class WorkItem():
             self.owner = owner              # Worker assigned this task.  By default, this task has no owner initially (one may be assigned later).
             self.result = None              # Result returned by this task.  Initially, none yet.
             self.exception = None           # Exception raised by this task.  Initially, none yet.
+            self.priority = priority        # Where this task goes on a worklist.
+            self.deadline = deadline        # When this task goes stale, if ever.
+            self._kind = kind               # What kind of task it is (None means, go by the callable).
+            self.enqueued = None            # When it was put on a worklist.  Not yet.
+            self._future = None             # Future for the result, once someone asks for one.
+            self._settled = False           # Whether we've told our future (if any) the outcome.
 
                 # Waitable flags for announcing various conditions.
             self.owned          = Flag(owner)   # That this task is owned.  Raise flag initially if owner is not None.
@@ -497,6 +558,69 @@ class WorkItem():
         # Set the owner of a work item to a given thread (usually a Worker thread).
         # This cannot be done after the task has already been started.
 
+        # Methods associated with deadlines.  Dropping an item doesn't need
+        # ownership, since any worker that comes across a stale item may
+        # drop it.
+
+    def expired(self):          # Has our deadline (if any) passed?
+        return self.deadline is not None and monotonic() > self.deadline
+
+    def _drop(self, exception:BaseException=None):  # Give up on the task without doing it.
+        self.exception = exception      # Record why (if we know).
+        self.haveResult.rise()          # There's no more result coming than this.
+        self.failed.rise()              # The task wasn't done, so it failed.
+        self.stopped.rise()             # And nobody's working on it.
+        self._settle()                  # Let our future know.
+
+        # The kind of task this is, for statistics.  Unless we were told,
+        # it's the name of the callable (or of the function it wraps, if
+        # it's something like a functools.partial).
+
+    @property
+    def kind(self) -> str:
+        if self._kind is not None:
+            return self._kind
+        task = getattr(self.task, 'func', self.task)
+        return getattr(task, '__qualname__', None) or type(task).__name__
+
+    @kind.setter
+    def kind(self, kind:str):
+        self._kind = kind
+
+        # Methods associated with futures.
+
+    @property
+    def future(self) -> Future:     # A Future for this item's result (made on first use).
+        with WorkItem._futureLock:
+            future = self._future
+            if future is None:
+                future = self._future = Future()
+                settled = self._settled
+            else:
+                return future
+        if settled:                     # If the outcome was already in before we
+            self._setFuture(future)         # made the future, give it to it now.
+        return future
+
+    def _settle(self):          # Tell our future (if any) what happened.
+        with WorkItem._futureLock:
+            self._settled = True
+            future = self._future
+        if future is not None:
+            self._setFuture(future)
+
+    def _setFuture(self, future:Future):
+        if future.done():               # E.g., it was cancelled.
+            return
+        if self.exception is not None:
+            future.set_exception(self.exception)
+        else:
+            future.set_result(self.result)
+
+    def __await__(self):        # Lets asyncio code do "await workItem".
+        import asyncio
+        return asyncio.wrap_future(self.future).__await__()
+
     def setOwner(self, worker:Thread):      # Set the owner of this WorkItem to the given (worker) thread.
         with self.lock:                          # Thread-safely,
             if self.started():                      # If work on this task has already been started,
@@ -528,6 +652,10 @@ class WorkItem():
                                      "started working on it!")
                     # Raise an exception to warn user about that.
             else:                       # Otherwise,
+                future = self._future
+                if future is not None and not future.set_running_or_notify_cancel():
+                    self._drop()            # Our future was cancelled, so don't do the task.
+                    return None
                 try:                        # We'll try doing the task.
                     self._start()                # First, announce that we're starting to work on the task.
                     self._checkAbortReq()        # Go ahead and check for any early abort requests.
@@ -539,12 +667,16 @@ class WorkItem():
                     except BaseException as e:      # If it raises any kind of exception whatsoever,
                         self.exception = e              # Remember what exception it was,
                         self.haveResult.rise()          # Announce that we have a result.
+                        self._settle()                  # Pass it on to our future, if any,
                         raise e                         # and re-raise it.
+                    self._settle()               # Pass the result on to our future, if any.
                     self._finish()               # Finally, announce that we finished the task.
                 except (EarlyCompletion, ExitingByRequest):     # If the task terminates by throwing an EarlyCompletion or ExitingByRequest exception, then
                     self._finish()               # Announce that we finished the task in that case as well.
                     raise                        # And re-signal the early completion to our caller also.
-                except:                     # For all other exceptions,
+                except BaseException as e:  # For all other exceptions,
+                    if not self.haveResult():    # If we never got as far as the task (e.g., we were asked to abort first),
+                        self._drop(e)               # then give up on it, and let our future know why.
                     self._fail()                 # Announce that we failed to complete the task.
                     raise                   # And re-raise the exception.
 
@@ -632,6 +764,26 @@ class Worklist(Desque):   # Extend my double-ended Queue class.
         #       closedForever - A flag stating that this worklist is closed
         #           and will never reopen.  However, a worker may still be
         #           finishing up work items that are already there.
+        #
+        #       levels:dict - Map from each priority level that has been used
+        #           to the deque of items waiting at that level.  (The deque
+        #           for the default level, 0, is also the .queue attribute
+        #           that Queue would normally have.)
+        #
+        #       order:list - The priority levels in .levels, sorted.
+        #
+        #       count:int - Total number of items on the worklist.
+        #
+        #       stats:WorklistStats - Depth, wait-time, run-time and outcome
+        #           accounting for this worklist (see workstats.py).
+        #
+        #       wakeup - An optional callable (taking no arguments) that is
+        #           called each time an item is added to the worklist.  This
+        #           lets a worker that isn't blocked in getItem() (such as
+        #           the guibot, which is off running the TkInter mainloop)
+        #           find out that it has new work to do, without polling.
+        #           It's called with the worklist lock held, so it should
+        #           be quick and must not block.  Set it with setWakeup().
         #       
         #---------------------------------------------------------------------
     
@@ -642,20 +794,22 @@ class Worklist(Desque):   # Extend my double-ended Queue class.
             self.mainWorker = worker        # Assign the main worker for this worklist, if any yet.
             self.closed = Flag(lock=self.lock)   # Create a flag for announcing when we are closed.
             self.closedForever = Flag(lock=self.lock) # Create a flag for announcing when we've closed forever.
+            self.wakeup = None              # No wakeup callback by default.
+            self.stats = WorklistStats(self)    # Nothing to report yet.
 
         #---------------------------------------------------------------------
         #   Instance methods:
         #
         #       addItem(item) - Adds the given work item to the worklist,
-        #               at the end of the queue.  Use for lower-priority
-        #               work items.  Blocks till there is room on the list.
+        #               at the end of the queue for its priority level.
+        #               Blocks till there is room on the list.
         #
         #       addItem_nowait(item) - Like addItem, but throws a Full
         #               exception instead of blocking if there's no room.
         #
         #       addItem_head(task) - Also adds the given work item to the worklist,
-        #               but at the head of the queue.  Use for high-priority
-        #               work items.
+        #               but at the head of the queue for its priority level.
+        #               Use for urgent work items.
         #
         #       addItem_head_nowait(task) - Like addItem_head(), but throws
         #               a Full exception instead of blocking if there's no room.
@@ -669,17 +823,25 @@ class Worklist(Desque):   # Extend my double-ended Queue class.
         #               worklist is full.  Not guaranteed to remain stable except
         #               within the context of a "with worklist.lock:" statement.
         #
-        #       getItem() - Removes and returns the work
-        #               item at the head of the worklist.  If no work items
-        #               are there now, waits for one to appear.
+        #       getItem() - Removes and returns the work item at the head
+        #               of the worklist (from its most urgent, i.e. lowest
+        #               numbered, priority level).  If no work items are
+        #               there now, waits for one to appear.
         #
         #       getItem_nowait() - Removes the work item
         #               at the head of the worklist, if any; otherwise,
         #               raises the Empty exception.
         #
+        #       getItem(back=True) - Takes the item at the tail of the
+        #               worklist (its least urgent level) instead.  (Used
+        #               for stealing work; see the workerPool module.)
+        #
         #       close()/reopen()/closeForever() - For closing/unclosing/
         #               permanently closing the worklist from having new
         #               work items added to it.
+        #
+        #       setWakeup(callback) - Installs (or, with None, removes) a
+        #               callback to be called whenever an item is added.
 
         # The reason for adding these addItem()/getItem() methods, rather than
         # just having the user use the underlying Desque put()/get() methods
@@ -729,11 +891,81 @@ class Worklist(Desque):   # Extend my double-ended Queue class.
                             raise WorklistClosed("Worklist.addItem(): Can't add item because this worklist is closed.")
                     else:
                         with item.onWorklist.lock:  # Want this flag to be consistent with the facts.
+                            item.enqueued = monotonic()     # Start the clock on its wait.
                             self.put(item, block, timeout, front)   # Put it on the worklist (may block).
                             item.onWorklist.rise()  # Announce that this item is on a worklist now.
+                        self.stats.added += 1
+                        if self.wakeup is not None:     # If someone wants to hear about new items,
+                            self.wakeup()                   # let them know there's one now.
         else:
             raise NotAWorkItem("Worklist.addItem(): argument to Worklist.addItem() must be a WorkItem.")
-            
+
+    def setWakeup(self, callback=None):
+        with self.lock:
+            self.wakeup = callback
+
+        # These override the underlying Queue's storage methods, to keep a
+        # separate FIFO for each priority level.  They're only ever called
+        # with the lock held.  There are normally only a few levels, so we
+        # just scan the sorted list of them to find the first nonempty one.
+
+    def _init(self, maxsize):
+        self.queue = deque()            # The default level's deque.
+        self.levels = {0: self.queue}
+        self.order = [0]
+        self.count = 0
+
+    def _qsize(self):
+        return self.count
+
+    def _level(self, priority:int):     # The deque for the given level.
+        level = self.levels.get(priority)
+        if level is None:
+            level = self.levels[priority] = deque()
+            insort(self.order, priority)
+        return level
+
+    def _put(self, item):
+        self._level(item.priority).append(item)
+        self.count += 1
+        if self.count > self.stats.peak:
+            self.stats.peak = self.count
+
+    def _putleft(self, item):
+        self._level(item.priority).appendleft(item)
+        self.count += 1
+        if self.count > self.stats.peak:
+            self.stats.peak = self.count
+
+    def _get(self):
+        for priority in self.order:
+            level = self.levels[priority]
+            if level:
+                self.count -= 1
+                return level.popleft()
+
+    def _getright(self):
+        for priority in reversed(self.order):
+            level = self.levels[priority]
+            if level:
+                self.count -= 1
+                return level.pop()
+
+        # The bulk versions (used by Desque's put_many(), get_many() and
+        # drain(), and so by flush() and reset()) just go one at a time,
+        # so that each item lands at (or comes from) its own level.
+
+    def _putmany(self, items):
+        for item in items:
+            self._put(item)
+
+    def _putmanyleft(self, items):
+        for item in items:
+            self._putleft(item)
+
+    def _getmanyfront(self, n):
+        return [self._get() for i in range(n)]
+
     def addItem_nowait(self, item:WorkItem):
         self.addItem(item, block=False)
 
@@ -754,9 +986,9 @@ class Worklist(Desque):   # Extend my double-ended Queue class.
         # would block any calls to getItem(), if another lock was
         # used.)
 
-    def getItem(self, block:bool=True, timeout:Number=None):
+    def getItem(self, block:bool=True, timeout:Number=None, back:bool=False):
         with self.lock:
-            item = self.get(block, timeout);  item.onWorklist.fall()
+            item = self.get(block, timeout, back);  item.onWorklist.fall()
                 #-There will be a tiny gap after the item is actually
                 # removed from the worklist, and before this flag falls.
                 # I don't think this will cause any problems though - no
@@ -783,6 +1015,26 @@ class Worklist(Desque):   # Extend my double-ended Queue class.
         else:
             self.closed.fall()
 
+        #-----------------------------------------------------------------------
+        #   flush()                                 [instance external method]
+        #
+        #       Removes all existing items from the worklist, without
+        #       executing them.  They're dropped (with a WorkAborted
+        #       exception), so that anyone waiting on them, or on their
+        #       futures, finds out that they won't be done.
+
+    def flush(self):
+        with self.lock:
+            items = self.drain()
+            now = monotonic()
+            for item in items:
+                item.onWorklist.fall()
+                self.stats.record(item, now, now, 'dropped')
+                self.task_done()
+        for item in items:
+            item._drop(WorkAborted("Worklist.flush(): Dropped this item, "
+                                   "unstarted, from a flushed worklist."))
+
         #-----------------------------------------------------------------------
         #   reset()                                 [instance external method]
         #
@@ -1070,12 +1322,14 @@ class Worker(ThreadActor):
             #       Optional arguments specify nonblocking mode, timeout values, and front
             #       (LIFO) mode.
     
-    def __call__(inst, task, block:bool=True, timeout:Number=None, front:bool=False, override:bool=False):
+    def __call__(inst, task, block:bool=True, timeout:Number=None, front:bool=False, override:bool=False,
+                 priority:int=None, deadline:Number=None):
 
         if inst.waitByDefault:
-            return inst.getResult(task, block=block, timeout=timeout, front=front)
+            return inst.getResult(task, block=block, timeout=timeout, front=front,
+                                  priority=priority, deadline=deadline)
         else:
-            inst.do(task, block, timeout, front, override)
+            inst.do(task, block, timeout, front, override, priority, deadline)
 
 
             #----------------------------------------------------------------------------------
@@ -1084,9 +1338,12 @@ class Worker(ThreadActor):
             #       This simply adds the given workitem to the worker's main worklist, in
             #       FIFO mode.  Optional arguments specify nonblocking mode, timeout values,
             #       and front (LIFO) mode.  This routine does not return a result - it exits
-            #       as soon as the work item is added to the worker's queue.
+            #       as soon as the work item is added to the worker's queue.  If <priority>
+            #       or <deadline> is given, it's set on the work item first (see WorkItem).
+            #       The work item is returned, e.g. so the caller can ask for its future.
 
-    def do(inst, task, block:bool=True, timeout:Number=None, front:bool=False, override:bool=False):
+    def do(inst, task, block:bool=True, timeout:Number=None, front:bool=False, override:bool=False,
+           priority:int=None, deadline:Number=None):
         if inst.exiting:            # If we are already in the process of exiting,
 
                 # For this one, we can't use the logger because it can cause an
@@ -1103,23 +1360,40 @@ class Worker(ThreadActor):
 #                  "that worker is already in the process of exiting..."%(current_thread(), inst, task),
 #                  file=sys.__stderr__)
 
+            exception = WorkerExiting("Worker.do(): Could not execute task %s "
+                                      "because I am already in the process of "
+                                      "shutting down.  Task failed." % task)
+
             if isinstance(task, WorkItem): # If task is already in a WorkItem wrapper,
-                task.failed.rise()  # Declare that this work item has failed.
-                task.stopped.rise() # And that it has stopped.
+                task._drop(exception)   # Declare that this work item has failed & stopped.
 
-            raise WorkerExiting("Worker.do(): Could not execute task %s "
-                                "because I am already in the process of "
-                                "shutting down.  Task failed." % task)
+            raise exception
                 #-> This tells caller that the "do" could not be 
                 #   completed, b/c worker is in the process of shutting down.
 
         inst.ensure_worklist()      # First make sure we have a worklist.
 
-        if not isinstance(task, WorkItem):      # Is the task just a plain callable (e.g. lambda)?
-            task = WorkItem(task, owner=inst)   # If so, then make a real WorkItem out of it.
+        task = inst._workItem(task, priority, deadline)     # Make sure it's a WorkItem.
 
         inst.todo.addItem(task, block, timeout, front, override)  # Add it to the worker's queue.
 
+        return task
+
+            #----------------------------------------------------------------------------------
+            #   _workItem()                                     [instance private method]
+            #
+            #       Wraps <task> in a WorkItem owned by us, unless it's one already, and
+            #       applies the given priority and/or deadline to it.
+
+    def _workItem(inst, task, priority:int=None, deadline:Number=None):
+        if not isinstance(task, WorkItem):      # Is the task just a plain callable (e.g. lambda)?
+            task = WorkItem(task, owner=inst)   # If so, then make a real WorkItem out of it.
+        if priority is not None:
+            task.priority = priority
+        if deadline is not None:
+            task.deadline = deadline
+        return task
+
 
             #----------------------------------------------------------------------------------
             #   getResult()                                     [instance external method]
@@ -1134,7 +1408,8 @@ class Worker(ThreadActor):
             #
             #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
 
-    def getResult(inst, task, block:bool=True, timeout:Number=None, front:bool=False):
+    def getResult(inst, task, block:bool=True, timeout:Number=None, front:bool=False,
+                  priority:int=None, deadline:Number=None):
 
             # Ignore tasks being sent to workers that are in the process of exiting.
         
@@ -1161,8 +1436,7 @@ class Worker(ThreadActor):
 
         inst.ensure_worklist()      # First make sure we have a worklist.
 
-        if not isinstance(task, WorkItem):      # Is the task just a plain callable (e.g. function, lambda)?
-            task = WorkItem(task, owner=inst)   # If so, then make a real WorkItem out of it.
+        task = inst._workItem(task, priority, deadline)     # Make sure it's a WorkItem.
 
         # Now we actually send the task, and then wait for & then reproduce the result.
 
@@ -1288,21 +1562,14 @@ class Worker(ThreadActor):
 
     def do1job(self, block:bool=True, timeout:Number=None):
 
-            # If we have not been assigned a primary worklist yet,
-            # then go ahead and create a generic one for ourselves.
+            # Get a work item, and the worklist it came from.  If block=False or a timeout
+            # is provided, this may throw an Empty exception if no work items are available
+            # soon enough.
 
-        self.ensure_worklist()
-
-            # Get a work item from the work list.  If block=False or a timeout is provided,
-            # this may throw an Empty exception if no work items are available soon enough.
+        task, source = self.next_task(block, timeout)
 
-        with self.todo.lock:            # Keep worklist state consistent in here, except while waiting.
-            if self.todo.empty():           # If worklist is empty, we'll need to wait,
-                self.waiting.rise()             # so raise our waiting flag,
-                task = self.todo.getItem(block, timeout) # get next task from worklist (blocks till it arrives, unless block is false).
-                self.waiting.fall()             # and lower our waiting flag.
-            else:                           # else getItem shouldn't block, so don't bother with the waiting flag.
-                task = self.todo.getItem(block=False)  # Get next task from worklist.
+        begun = monotonic()     # For the worklist's wait- and run-time stats.
+        outcome = 'failed'      # Unless we find out otherwise.
 
             # If we get here, then <task> definitely contains an item that was
             # extracted from our todo queue.  The following code is wrapped
@@ -1314,14 +1581,25 @@ class Worker(ThreadActor):
             assert task     # The task at this point should never be None,
                 # since addItem won't allow adding None to the queue.
 
+            if task.expired():      # If it's too late for this task to be any use,
+                outcome = 'dropped'
+                task._drop(DeadlineExpired("Worker.do1job(): Dropping stale task %s." % task))
+                return None             # just drop it and move on.
+
             try:
-                return task()    # Do the task. (Must be callable, as a WorkItem is.)
-                    # Return any result to our caller.
+                result = task()  # Do the task. (Must be callable, as a WorkItem is.)
+                outcome = 'done' if task.started() else 'dropped'
+                    # (It's dropped, not done, if its future was cancelled.)
+                return result    # Return any result to our caller.
                     
-            except (WorkAborted, EarlyCompletion):      # Early-termination workitem exception?
-                pass                                        # Just ignore it. (Don't re-raise.)
+            except WorkAborted:                 # Early-termination workitem exceptions?
+                outcome = 'aborted'                 # Just ignore them. (Don't re-raise.)
+
+            except EarlyCompletion:
+                outcome = 'earlyExit'
 
             except ExitingByRequest:
+                outcome = 'earlyExit'
                 logger.debug("%s: Worker.do1job(): Task exited by request..." % current_thread())
                 raise
                 # No need to print the full traceback in this case.
@@ -1342,13 +1620,37 @@ class Worker(ThreadActor):
                 logger.exception("%s: Worker.do1job(): Task threw an exception; reraising..." % current_thread())
                 raise   # Within guibot, I think TkInter just swallows this up silently.
         finally:
-            self.todo.task_done()   # Tell the queue that we are done with this particular
+            source.stats.record(task, begun, monotonic(), outcome)
+            source.task_done()      # Tell the queue that we are done with this particular
                 # work item.  This is essential in case any other threads try to do join()
                 # on the queue (that is, wait for all items on the queue to be processed).
 
     # End Worker.do1job().
     #-------------------------
 
+            #-------------------------------------------------------------------------------
+            #   next_task() [instance internal method] - Get the next work item to do, and
+            #       return it together with the worklist it was taken from.  For a plain
+            #       Worker, that's always our own worklist; subclasses (such as the pool
+            #       workers in the workerPool module) may look for work elsewhere too.
+
+    def next_task(self, block:bool=True, timeout:Number=None):
+
+            # If we have not been assigned a primary worklist yet,
+            # then go ahead and create a generic one for ourselves.
+
+        self.ensure_worklist()
+
+        with self.todo.lock:            # Keep worklist state consistent in here, except while waiting.
+            if self.todo.empty():           # If worklist is empty, we'll need to wait,
+                self.waiting.rise()             # so raise our waiting flag,
+                task = self.todo.getItem(block, timeout) # get next task from worklist (blocks till it arrives, unless block is false).
+                self.waiting.fall()             # and lower our waiting flag.
+            else:                           # else getItem shouldn't block, so don't bother with the waiting flag.
+                task = self.todo.getItem(block=False)  # Get next task from worklist.
+
+        return (task, self.todo)
+
 
     #   check_exitflag()                                        [instance internal method]
 
@@ -1503,6 +1805,8 @@ def HireThread(thread:Thread()):
     thread.ensure_worklist  = bind(thread, Worker.ensure_worklist   )
     thread.exitByRequest    = bind(thread, Worker.exitByRequest     )
     thread.do1job           = bind(thread, Worker.do1job            )
+    thread._workItem        = bind(thread, Worker._workItem         )
+    thread.next_task        = bind(thread, Worker.next_task         )
     thread.check_exitflag   = bind(thread, Worker.check_exitflag    )
     thread.run              = bind(thread, Worker.run               )
     thread.work             = bind(thread, Worker.work              )
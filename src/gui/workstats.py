@@ -0,0 +1,336 @@
+#============================================================
+#   workstats.py - Accounting for worklists and workers.
+#
+#       When the GUI or a simulation thread feels sluggish, we
+#       want to be able to see why:  Is work piling up on some
+#       worklist?  Are items waiting a long time before anyone
+#       starts them?  Is some particular kind of task slow, or
+#       failing a lot?
+#
+#       So every Worklist keeps a WorklistStats, which tracks:
+#
+#           - The worklist's current and peak depth.
+#
+#           - How many items were added, and how many of those
+#             were done, aborted, failed, exited early, or were
+#             dropped (because they went stale, their futures
+#             were cancelled, or their worklist was flushed).
+#
+#           - A histogram of how long items waited between being
+#             added to the worklist and some worker starting them.
+#
+#           - For each kind of task (by default, the name of the
+#             task's callable), a histogram of how long they ran.
+#
+#       Workers record what they do into the stats of the worklist
+#       they took the item from (which, for a pool worker that
+#       stole the item, is the victim's worklist, not its own).
+#
+#       Histograms just count into power-of-two buckets of
+#       microseconds, so recording a sample costs a couple of
+#       additions and an int.bit_length(); that, plus a couple of
+#       calls to time.monotonic() per item, is cheap enough to
+#       leave on all the time.
+#
+#       To look at the numbers, call worklistStats() for a dict
+#       of snapshots of all live worklists' stats, or a particular
+#       worklist's .stats.snapshot(); or call startStatsDump() to
+#       have them written to the log every so often.
+#
+#   Classes provided:
+#
+#       Histogram - Counts of durations in log-scale buckets.
+#
+#       WorklistStats - The accounting for one worklist.
+#
+#       StatsDumper - A thread that periodically logs all of the
+#           worklists' stats.
+#
+#   Functions provided:
+#
+#       worklistStats() - Snapshots of all worklists' stats.
+#
+#       formatStats() - Turn those snapshots into a text table.
+#
+#       startStatsDump(), stopStatsDump() - Start/stop logging
+#           them periodically.
+#
+#============================================================
+
+    #---------------------------------------
+    # Import some standard python modules.
+
+import weakref                  # We keep track of stats without keeping worklists alive.
+
+from threading import Lock, Event
+
+    #-----------------------------------------
+    # Import some of our own custom modules.
+
+from logmaster import *     # Our customized logging facility.
+
+logger = getLogger(appName + ".work")
+
+    #--------------------------------------------------------------------
+    # Our public (exported) names.
+
+__all__ = ['Histogram', 'WorklistStats', 'StatsDumper',
+           'worklistStats', 'formatStats',
+           'startStatsDump', 'stopStatsDump']
+
+    # The possible outcomes of taking an item off a worklist.
+
+OUTCOMES = ('done', 'aborted', 'failed', 'earlyExit', 'dropped')
+
+    # All the WorklistStats there are (while their worklists live).
+
+_allStats = weakref.WeakSet()
+_allStatsLock = Lock()
+
+
+    #------------------------------------------------------------------
+    # Histogram [module class] - Counts of durations (in seconds), in
+    #   buckets whose upper bounds are 1, 2, 4, 8, ... microseconds.
+    #   Bucket i holds durations of at least 2**(i-1) but less than
+    #   2**i microseconds (bucket 0 holds those under 1 us), and the
+    #   last bucket (about 36 minutes and up) holds everything longer.
+    #   Not thread-safe by itself; WorklistStats locks around it.
+
+class Histogram:
+
+    NBUCKETS = 32
+
+    def __init__(inst):
+        inst.counts = [0]*Histogram.NBUCKETS
+        inst.n = 0              # Number of samples.
+        inst.total = 0.0        # Their sum, in seconds.
+        inst.max = 0.0          # The longest one.
+
+    def add(inst, seconds:float):
+        i = int(seconds*1e6).bit_length() if seconds > 0 else 0
+        if i >= Histogram.NBUCKETS:
+            i = Histogram.NBUCKETS - 1
+        inst.counts[i] += 1
+        inst.n += 1
+        inst.total += seconds
+        if seconds > inst.max:
+            inst.max = seconds
+
+        # An upper bound on the given fraction (0-1) of the samples, in
+        # seconds; that is, the top of the bucket it falls in (or the max,
+        # if that's less, or if it's the last bucket, which has no top).
+
+    def percentile(inst, fraction:float) -> float:
+        if not inst.n:
+            return 0.0
+        rank = fraction*inst.n
+        seen = 0
+        for i, count in enumerate(inst.counts):
+            seen += count
+            if seen >= rank and count:
+                if i == Histogram.NBUCKETS - 1:
+                    return inst.max
+                return min(2**i/1e6, inst.max)
+        return inst.max
+
+    def snapshot(inst) -> dict:
+        return {'n':       inst.n,
+                'mean':    inst.total/inst.n if inst.n else 0.0,
+                'max':     inst.max,
+                'p50':     inst.percentile(0.5),
+                'p90':     inst.percentile(0.9),
+                'p99':     inst.percentile(0.99),
+                'buckets': list(inst.counts)}
+
+# End class Histogram.
+
+
+    #------------------------------------------------------------------
+    # WorklistStats [module class] - The accounting for one worklist.
+    #
+    #   The worklist updates .peak and .added itself, while holding its
+    #   own lock; workers call record() (which takes our lock) when they
+    #   finish with an item they took from the worklist.
+    #
+    #   Instance data members:
+    #
+    #       peak:int - The most items the worklist has ever held at once.
+    #
+    #       added:int - How many items have been added to it.
+    #
+    #       outcomes:dict - How many items taken from it came to each of
+    #           the OUTCOMES.
+    #
+    #       wait:Histogram - Time from being added to being started.
+    #
+    #       run:dict - Map from task kind to Histogram of run times.
+    #
+    #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class WorklistStats:
+
+    def __init__(inst, worklist):
+        inst._worklist = weakref.ref(worklist)
+        inst.lock = Lock()
+        inst.reset()
+        with _allStatsLock:
+            _allStats.add(inst)
+
+    def reset(inst):
+        with inst.lock:
+            worklist = inst._worklist()
+            inst.peak = worklist.count if worklist is not None else 0
+            inst.added = 0
+            inst.outcomes = dict.fromkeys(OUTCOMES, 0)
+            inst.wait = Histogram()
+            inst.run = {}
+
+        # A name for our worklist in reports:  the role (or else the name)
+        # of its main worker, if it has one.
+
+    @property
+    def name(inst) -> str:
+        worklist = inst._worklist()
+        if worklist is None:
+            return '(gone)'
+        worker = worklist.mainWorker
+        if worker is not None:
+            return getattr(worker, 'role', None) or worker.name
+        return 'worklist@%x' % id(worklist)
+
+        # Called by a worker when it's through with <item>, which it took
+        # from our worklist at time <begun> (and finished at time <ended>),
+        # with the given outcome.  Dropped items were never run, so they
+        # don't count towards run times.
+
+    def record(inst, item, begun:float, ended:float, outcome:str):
+        with inst.lock:
+            inst.outcomes[outcome] += 1
+            if item.enqueued is not None:
+                inst.wait.add(begun - item.enqueued)
+            if outcome != 'dropped':
+                kind = item.kind
+                hist = inst.run.get(kind)
+                if hist is None:
+                    hist = inst.run[kind] = Histogram()
+                hist.add(ended - begun)
+
+    def snapshot(inst) -> dict:
+        worklist = inst._worklist()
+        with inst.lock:
+            return {'name':     inst.name,
+                    'depth':    worklist.count if worklist is not None else 0,
+                    'peak':     inst.peak,
+                    'added':    inst.added,
+                    'outcomes': dict(inst.outcomes),
+                    'wait':     inst.wait.snapshot(),
+                    'run':      {kind: hist.snapshot()
+                                 for kind, hist in inst.run.items()}}
+
+# End class WorklistStats.
+
+
+    #------------------------------------------------------------------
+    # worklistStats() [module function] - Returns a dict mapping the
+    #   name of each live worklist to a snapshot of its stats.  (If two
+    #   worklists have the same name, the later ones get "#2" etc.
+    #   appended.)
+
+def worklistStats() -> dict:
+    with _allStatsLock:
+        allStats = list(_allStats)
+    result = {}
+    for stats in allStats:
+        snap = stats.snapshot()
+        name = snap['name']
+        i = 1
+        while name in result:
+            i += 1
+            name = '%s#%d' % (snap['name'], i)
+        result[name] = snap
+    return result
+
+
+    #------------------------------------------------------------------
+    # formatStats() [module function] - Formats a dict of snapshots, as
+    #   returned by worklistStats(), as a text table, with one line per
+    #   worklist and an indented line for each kind of task it's run.
+    #   Times are in milliseconds.  Worklists that have never had any
+    #   items are left out.
+
+def formatStats(snapshots:dict=None) -> str:
+
+    if snapshots is None:
+        snapshots = worklistStats()
+
+    lines = ["%-20s %5s %5s %8s %7s %6s %6s %6s %6s %9s %9s" %
+             ('worklist', 'depth', 'peak', 'added', 'done', 'abort',
+              'fail', 'early', 'drop', 'wait-p50', 'wait-p99')]
+
+    for name in sorted(snapshots):
+        snap = snapshots[name]
+        if not snap['added'] and not snap['peak']:
+            continue
+        out = snap['outcomes'];  wait = snap['wait']
+        lines.append("%-20s %5d %5d %8d %7d %6d %6d %6d %6d %9.3f %9.3f" %
+                     (name[:20], snap['depth'], snap['peak'], snap['added'],
+                      out['done'], out['aborted'], out['failed'],
+                      out['earlyExit'], out['dropped'],
+                      wait['p50']*1e3, wait['p99']*1e3))
+        for kind in sorted(snap['run']):
+            run = snap['run'][kind]
+            lines.append("    %-40s n=%-7d mean=%.3f p90=%.3f max=%.3f" %
+                         (kind[:40], run['n'], run['mean']*1e3,
+                          run['p90']*1e3, run['max']*1e3))
+
+    return '\n'.join(lines)
+
+
+    #------------------------------------------------------------------
+    # StatsDumper [module class] - A daemon thread that logs the stats
+    #   of all worklists (at INFO level) every <interval> seconds, until
+    #   it's stopped.
+
+class StatsDumper(ThreadActor):
+
+    defaultRole      = 'statsDumper'
+    defaultComponent = 'gui'
+
+    def __init__(inst, interval:float=60.0):
+        ThreadActor.__init__(inst, daemon=True)
+        inst.interval = interval
+        inst.stopping = Event()
+
+    def stop(inst, timeout:float=None):
+        inst.stopping.set()
+        if inst.is_alive():
+            inst.join(timeout)
+
+    def run(self):
+        self.starting()
+        while not self.stopping.wait(self.interval):
+            logger.info("Worklist stats:\n" + formatStats())
+
+# End class StatsDumper.
+
+_dumper = None      # The StatsDumper started by startStatsDump(), if any.
+
+    #------------------------------------------------------------------
+    # startStatsDump(), stopStatsDump() [module functions] - Start (or
+    #   restart, with a new interval) and stop logging all worklists'
+    #   stats every <interval> seconds.
+
+def startStatsDump(interval:float=60.0):
+    global _dumper
+    stopStatsDump()
+    _dumper = StatsDumper(interval)
+    _dumper.start()
+
+def stopStatsDump():
+    global _dumper
+    if _dumper is not None:
+        _dumper.stop()
+        _dumper = None
+
+# END MODULE workstats.py
+#================================================================================================================
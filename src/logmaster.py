@@ -221,6 +221,29 @@
                 system console (i.e., standard output).
 
 
+            logmaster.LOG_ASYNC:bool            [public global constant boolean]
+
+                If True (the default), configLogMaster() moves the
+                main log handlers behind a LogQueueHandler, so that
+                the actual writing of log lines is done in the
+                background by a LogDrainer thread.
+
+
+            logmaster.{LOG_QUEUE_SIZE,          [public global constant integers]
+                LOG_BATCH_SIZE}:int
+
+                The capacity of the LogDrainer's record queue, and the
+                maximum number of records it writes per batch.
+
+
+            logmaster.LOG_QUEUE_POLICY:str      [public global constant string]
+
+                What to do when the log queue is full: 'drop' discards
+                records below WARNING level (and reports how many were
+                lost); 'block' makes the logging thread wait for room.
+                Records at WARNING level and above are never dropped.
+
+
         Public objects:
         ---------------
                 
@@ -271,6 +294,13 @@
                 the system, respectively.  
 
 
+            logmaster.logDrainer:LogDrainer             [public global object]
+
+                The background thread that writes out queued log
+                records, if asynchronous logging has been set up by
+                configLogMaster(); otherwise None.
+
+
     EXCEPTION CLASSES:
     ------------------
 
@@ -315,6 +345,10 @@
 
             logmaster.NormalLoggerAdapter                [module public class]
 
+            logmaster.LogQueueHandler                    [module public class]
+
+            logmaster.LogDrainer                         [module public class]
+
                 
     Module revision history:
     ------------------------
@@ -401,6 +435,8 @@ import  io           # For TextIOBase, which we subclass in _NullOut.
 import  logging      # General python logging facility.
     # - Don't import names from within it, b/c we redefine some of them.
 import  threading    # Used for our threading.local LoggingContext.
+import  queue        # Bounded record queue for asynchronous log handling.
+import  atexit       # To drain the log queue when the program exits.
 import  traceback    # Used for printing stack traces.
 
 
@@ -445,12 +481,15 @@ __all__ = [
     'LOG_FILENAME', 'LOG_FORMATSTR',
     'CONS_WARN', 'CONS_INFO', 'CONS_DEBUG',
     'LOG_INFO', 'LOG_DEBUG',
+    'LOG_ASYNC', 'LOG_QUEUE_SIZE',
+    'LOG_QUEUE_POLICY', 'LOG_BATCH_SIZE',
     'systemName', 'sysName', 'appName',
     'log_level', 'console_level', 'minLevel',
     'doDebug', 'doInfo', 'doNorm', 'doWarn', 'doErr',
     'theLoggingContext', 'mainLogger',       # Public global objects.
     'sysLogger', 'appLogger',
     'logFormatter', 'consHandler',
+    'logDrainer',
     'LoggedException', 'InfoException',      # Public exception classes.
     'ExitException', 'WarningException', 
     'WrongThreadWarning', 'ErrorException',
@@ -458,12 +497,13 @@ __all__ = [
     'LoggingContext', 'ThreadActor',         # Public regular classes.
     'AbnormalFilter', 'NormalLogger',
     'NormalLoggerAdapter', 'CleanFormatter',
+    'LogQueueHandler', 'LogDrainer',
     'initLogMaster', 'configLogMaster',      # Public functions.
     'normal', 'debug', 'info', 'error',
     'warning', 'warn', 'error', 'exception',
     'critical', 'lvlname_to_loglevel',
     'byname', 'getLogger', 'getComponentLogger',
-    'testLogging', 'updateStderr',
+    'testLogging', 'updateStderr', 'flushLogs',
     'setThreadRole', 'setComponent',
 ]
 
@@ -693,6 +733,42 @@ LOG_DEBUG = False   # Default value: False.
     #   Overrides CONS_INFO.
 
 
+                #|--------------------------------------------------------------
+                #|
+                #|  LOG_ASYNC:bool,                [public global constants]
+                #|  LOG_QUEUE_SIZE:int,
+                #|  LOG_QUEUE_POLICY:str,
+                #|  LOG_BATCH_SIZE:int
+                #|
+                #|      These control the asynchronous log handling that
+                #|      is set up by configLogMaster().  When LOG_ASYNC
+                #|      is True, logging calls just enqueue their records
+                #|      on a bounded queue (of LOG_QUEUE_SIZE records),
+                #|      and a background LogDrainer thread writes them
+                #|      out to the real handlers, up to LOG_BATCH_SIZE
+                #|      records at a time.  That way, a slow console
+                #|      (such as a TikiTerm window) can't stall the
+                #|      thread that is doing the logging.
+                #|
+                #|      LOG_QUEUE_POLICY says what to do if the queue
+                #|      fills up:  'drop' silently discards records
+                #|      below WARNING level (the number dropped is
+                #|      reported later), while 'block' makes the
+                #|      logging thread wait until there is room.
+                #|      WARNING-and-above records always wait.
+                #|
+                #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+global LOG_ASYNC, LOG_QUEUE_SIZE, LOG_QUEUE_POLICY, LOG_BATCH_SIZE
+
+LOG_ASYNC = True            # Default value: True.
+    # - Change this to False before configLogMaster() to keep writing log lines synchronously.
+
+LOG_QUEUE_SIZE = 10000      # Maximum number of records waiting to be written.
+LOG_QUEUE_POLICY = 'drop'   # Either 'drop' or 'block'; see above.
+LOG_BATCH_SIZE = 256        # Maximum number of records written per batch.
+
+
                 #|--------------------------------------------------------------
                 #|
                 #|  {log,console}_level:int    [public global constant integers]
@@ -862,6 +938,21 @@ global consHandler
 consHandler = None  # Will be properly initialized later, in initLogMaster().
 
 
+                #|--------------------------------------------------------------
+                #|
+                #|  logDrainer:LogDrainer               [public global object]
+                #|
+                #|      The background thread that writes out queued
+                #|      log records, when asynchronous logging is in
+                #|      effect.  Created by configLogMaster().
+                #|
+                #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+global logDrainer
+
+logDrainer = None       # No drainer until configLogMaster() creates one.
+
+
         #|======================================================================
         #|
         #|  2.3.  Private globals.                      [module code subsection]
@@ -893,6 +984,21 @@ consHandler = None  # Will be properly initialized later, in initLogMaster().
 global  _initialized
 
 _initialized = False    # Initially false; this module has not yet been initialized.
+
+
+            #|------------------------------------------------------------------
+            #|
+            #|  _logQueueHandler:LogQueueHandler   [module private global object]
+            #|
+            #|      When asynchronous logging is in effect, this is the
+            #|      handler on the main logger that feeds records to
+            #|      logDrainer, in place of the original handlers.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+global  _logQueueHandler
+
+_logQueueHandler = None     # Created along with logDrainer.
         
        
             #|------------------------------------------------------------------
@@ -2614,6 +2720,238 @@ class NormalLoggerAdapter(logging.LoggerAdapter):
 #__/ End class NormalLoggerAdapter.
 
 
+            #|------------------------------------------------------------------
+            #|
+            #|  LogQueueHandler(logging.Handler)                [public class]
+            #|
+            #|      A log handler that doesn't write anything itself,
+            #|      but just hands each record off to a LogDrainer,
+            #|      which writes it out later from its own thread.
+            #|      The record's message is rendered here, in the
+            #|      logging thread, so that later changes to the
+            #|      argument objects can't affect what gets logged.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class LogQueueHandler(logging.Handler):
+
+    """A log handler that just passes each log record along to a
+       LogDrainer thread, which does the actual (possibly slow) work
+       of writing it out to the real handlers in the background."""
+
+    def __init__(inst, drainer, level=logging.NOTSET):
+        logging.Handler.__init__(inst, level)
+        inst.drainer = drainer      # The LogDrainer we feed records to.
+
+        # We override handle() so as not to take the handler lock; the
+        # drainer's queue is already thread-safe, and holding the lock
+        # while we wait for room in the queue would serialize everyone.
+        
+    def handle(inst, record):
+        rv = inst.filter(record)
+        if rv:
+            inst.emit(record)
+        return rv
+
+    def emit(inst, record):
+        try:
+            record.msg = record.getMessage()    # Render the message now,
+            record.args = None                  # and drop the arguments.
+        except Exception:
+            inst.handleError(record)
+            return
+        inst.drainer.enqueue(record)
+
+#__/ End class LogQueueHandler.
+
+
+            #|------------------------------------------------------------------
+            #|
+            #|  LogDrainer(ThreadActor)                         [public class]
+            #|
+            #|      A background thread which owns a bounded queue of
+            #|      log records, and a list of log handlers.  It
+            #|      repeatedly takes a batch of records off the queue
+            #|      (blocking for the first one, then taking whatever
+            #|      else is ready, up to its batch size), passes each
+            #|      record to each handler whose level admits it, and
+            #|      then flushes the handlers once for the whole batch.
+            #|
+            #|      If the queue is full, records below WARNING level
+            #|      are dropped (under the 'drop' policy) and counted;
+            #|      the count is reported in a warning record the next
+            #|      time the drainer writes a batch.  Otherwise, the
+            #|      logging thread waits for room in the queue.
+            #|
+            #|      Records logged from within the drainer thread
+            #|      itself are written out directly, since it would
+            #|      deadlock if it had to wait for room in its own
+            #|      queue.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class LogDrainer(ThreadActor):
+
+    """A ThreadActor that drains a bounded queue of log records in the
+       background, writing them out in batches to its list of handlers.
+       Use .enqueue() to add a record, .flush() to wait until everything
+       enqueued so far has been written, and .stop() to shut it down."""
+
+    defaultRole      = 'logDrainer'     # Our thread's role.
+    defaultComponent = 'logmaster'      # We work on behalf of this module.
+
+    def __init__(inst, handlers, maxsize:int=None, policy:str=None,
+                 batchSize:int=None):
+
+        if maxsize   is None:   maxsize   = LOG_QUEUE_SIZE
+        if policy    is None:   policy    = LOG_QUEUE_POLICY
+        if batchSize is None:   batchSize = LOG_BATCH_SIZE
+
+        ThreadActor.__init__(inst, daemon=True)
+            # - Daemonic, so we don't hold up the interpreter's exit; the
+            #   atexit hook installed by configLogMaster() drains us first.
+
+        inst.handlers   = list(handlers)        # Where records get written.
+        inst.queue      = queue.Queue(maxsize)  # Records waiting to be written.
+        inst.policy     = policy                # 'drop' or 'block'.
+        inst.batchSize  = batchSize             # Max records per batch.
+        inst.nDropped   = 0                     # Records dropped & not yet reported.
+        inst.dropLock   = threading.Lock()      # Protects .nDropped.
+
+    #__/ End LogDrainer.__init__().
+
+        #------------------------------------------------------------
+        # Add a record to our queue, or write it out directly if we
+        # were called from within our own thread.  May block, or may
+        # drop the record, if the queue is full (see class comments).
+
+    def enqueue(inst, record):
+
+        if threading.current_thread() is inst:
+            inst._write([record])
+            return
+
+        if inst.policy == 'block' or record.levelno >= logging.WARNING:
+            inst.queue.put(record)
+        else:
+            try:
+                inst.queue.put_nowait(record)
+            except queue.Full:
+                with inst.dropLock:
+                    inst.nDropped += 1
+
+    #__/ End LogDrainer.enqueue().
+
+        #------------------------------------------------------------
+        # Wait until every record enqueued before this call has been
+        # written out and the handlers have been flushed.  Returns
+        # True if that happened within <timeout> seconds (or at all,
+        # if the timeout is None).
+
+    def flush(inst, timeout:float=None):
+
+        if threading.current_thread() is inst or not inst.is_alive():
+            return True
+
+        marker = threading.Event()      # Will be set when we get to it.
+        inst.queue.put(marker)
+        return marker.wait(timeout)
+
+    #__/ End LogDrainer.flush().
+
+        #------------------------------------------------------------
+        # Ask the drainer thread to write out everything that's in
+        # the queue and then exit; wait up to <timeout> seconds for
+        # it to finish.
+
+    def stop(inst, timeout:float=None):
+
+        if inst.is_alive():
+            inst.queue.put(None)        # None in the queue means "stop".
+            inst.join(timeout)
+
+    #__/ End LogDrainer.stop().
+
+        #------------------------------------------------------------
+        # Main loop of the drainer thread.
+
+    def run(self):
+
+        self.starting()     # Set up our thread's logging context.
+
+        while True:
+
+            batch = [self.queue.get()]      # Wait for the first item.
+
+            while len(batch) < self.batchSize:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not self._write(batch):      # False means we were told to stop.
+                break
+
+    #__/ End LogDrainer.run().
+
+        #------------------------------------------------------------
+        # Write out one batch of queue items.  Returns False if the
+        # batch included a stop request, else True.
+
+    def _write(self, batch):
+
+        keepGoing = True
+        markers = []
+
+        with self.dropLock:
+            nDropped = self.nDropped
+            self.nDropped = 0
+
+        if nDropped:
+            batch.insert(0, self._dropRecord(nDropped))
+
+        for item in batch:
+
+            if item is None:                            # Stop request.
+                keepGoing = False
+
+            elif isinstance(item, threading.Event):     # Flush marker.
+                markers.append(item)
+
+            else:                                       # Log record.
+                for handler in self.handlers:
+                    if item.levelno >= handler.level:
+                        handler.handle(item)
+
+        for handler in self.handlers:       # Flush once per batch.
+            handler.flush()
+
+        for marker in markers:
+            marker.set()
+
+        return keepGoing
+
+    #__/ End LogDrainer._write().
+
+        #------------------------------------------------------------
+        # Make a warning record announcing how many records we had to
+        # drop because the queue was full.
+
+    def _dropRecord(self, nDropped:int):
+
+        record = logging.LogRecord('logmaster', logging.WARNING, __file__,
+                                   0, "LogDrainer: Log queue was full; "
+                                   "dropped %d log records." % nDropped,
+                                   None, None, 'LogDrainer._write')
+        for key in theLoggingContext:
+            record.__dict__[key] = theLoggingContext[key]
+        return record
+
+    #__/ End LogDrainer._dropRecord().
+
+#__/ End class LogDrainer.
+
+
         #|======================================================================
         #|
         #|   3.3.  Private classes.                     [module code subsection]
@@ -2938,11 +3276,33 @@ def updateStderr():
     # more output to the console handler after we flush it, and
     # before we redirect its stream.  Or from nulling out the
     # consHandler global after we check it and before we use it.
+    flushLogs()     # Anything queued so far goes to the old stream.
     logging._acquireLock()  
     if consHandler:
         consHandler.flush()
         consHandler.stream = sys.stderr
     logging._releaseLock()
+
+
+            #|------------------------------------------------------------------
+            #|
+            #|  flushLogs()                             [module public function]
+            #|
+            #|      If asynchronous logging is in effect, waits (for up
+            #|      to <timeout> seconds, or indefinitely if None)
+            #|      until all log records enqueued so far have been
+            #|      written out.  Returns True if they were.
+            #|
+            #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+def flushLogs(timeout:float=None):
+    """Waits until all log records that have been queued so far for
+       asynchronous output have actually been written out, or until
+       <timeout> seconds have passed.  Returns True on success."""
+    drainer = logDrainer
+    if drainer is None:
+        return True
+    return drainer.flush(timeout)
     
 
             #|------------------------------------------------------------------
@@ -3194,7 +3554,7 @@ def configLogMaster(sysname:str = None, appname:str = None,
                     conswarn:bool = None, consdebug:bool = None,
                     consinfo:bool = None, loginfo:bool = None,
                     logdebug:bool = None, component:str = None,
-                    role:str = None):
+                    role:str = None, asynclog:bool = None):
 
     """Configures the logmaster facility.  Optional keyword arguments
        can be used, if desired, to modify various logmaster parameters
@@ -3206,6 +3566,7 @@ def configLogMaster(sysname:str = None, appname:str = None,
     global NORMAL_LEVEL
     global LOG_FILENAME, LOG_FORMATSTR
     global CONS_WARN, LOG_INFO, LOG_DEBUG, CONS_DEBUG, CONS_INFO
+    global LOG_ASYNC
     global systemName, sysName, appName
     global logFormatter, theLoggingContext, mainLogger, _moduleLogger
     global _initialized, consHandler
@@ -3237,6 +3598,7 @@ def configLogMaster(sysname:str = None, appname:str = None,
     if logdebug  != None:   LOG_DEBUG                       = logdebug
     if component != None:   theLoggingContext.component     = component
     if role      != None:   theLoggingContext.threadrole    = role
+    if asynclog  != None:   LOG_ASYNC                       = asynclog
 
     print("logmaster.configLogMaster(): The top-level log file is %s." % LOG_FILENAME,
           file=sys.stderr)
@@ -3270,6 +3632,14 @@ def configLogMaster(sysname:str = None, appname:str = None,
 
     consHandler.setLevel(console_level)        # Set console to log level we determined earlier.
 
+        # Move the actual writing of log lines into a background
+        # thread, so that slow outputs (such as a console window
+        # that has to be updated via the GUI thread) don't stall
+        # the threads that are doing the logging.
+
+    if LOG_ASYNC:
+        _startLogDrainer()
+
     #testLogging()      # Don't do this normally.
 
 #__/ End configLogMaster().
@@ -3285,6 +3655,79 @@ def configLogMaster(sysname:str = None, appname:str = None,
         #|
         #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
 
+            #|------------------------------------------------------------------
+            #|
+            #|      _startLogDrainer()                 [module private function]
+            #|
+            #|          Moves all of the main logger's current handlers
+            #|          into a new LogDrainer thread, and replaces them
+            #|          with a LogQueueHandler feeding that thread.  Also
+            #|          arranges for the queue to be drained at exit.
+            #|          Does nothing if the drainer is already running.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+def _startLogDrainer():
+
+    global logDrainer, _logQueueHandler
+
+    if logDrainer is not None:  return      # Already set up.
+
+    rootLogger = mainLogger.logger          # Underlying (root) logger.
+
+    logging._acquireLock()      # Nobody logs while we swap handlers.
+    try:
+        handlers = list(rootLogger.handlers)
+        logDrainer = LogDrainer(handlers)
+        _logQueueHandler = LogQueueHandler(logDrainer)
+        logDrainer.start()
+        for handler in handlers:
+            rootLogger.removeHandler(handler)
+        rootLogger.addHandler(_logQueueHandler)
+    finally:
+        logging._releaseLock()
+
+    atexit.register(_stopLogDrainer)
+        # - Since this is registered after logging's own atexit hook,
+        #   it runs before logging.shutdown() closes the handlers.
+
+#__/ End _startLogDrainer().
+
+
+            #|------------------------------------------------------------------
+            #|
+            #|      _stopLogDrainer()                  [module private function]
+            #|
+            #|          Puts the original handlers back on the main
+            #|          logger (so anything logged from here on is
+            #|          written synchronously), then lets the drainer
+            #|          write out whatever is still queued, and stops it.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+def _stopLogDrainer(timeout:float=5.0):
+
+    global logDrainer, _logQueueHandler
+
+    drainer = logDrainer
+    if drainer is None:  return
+
+    rootLogger = mainLogger.logger
+
+    logging._acquireLock()
+    try:
+        rootLogger.removeHandler(_logQueueHandler)
+        for handler in drainer.handlers:
+            rootLogger.addHandler(handler)
+        logDrainer = _logQueueHandler = None
+    finally:
+        logging._releaseLock()
+
+    drainer.stop(timeout)
+
+#__/ End _stopLogDrainer().
+
+
             #|------------------------------------------------------------------
             #|
             #|      _currentframe()                    [module private function]
@@ -25,6 +25,9 @@ __all__ = [
     'dynamicOneTerminalGate',
     'dynamicTwoTerminalGate',
     'dynamicThreeTerminalGate',
+    'compiledNetwork',
+    'stepGenerator',
+    'stiffness',
     'dynamicNetwork'
     ]
 
@@ -0,0 +1,618 @@
+#|==============================================================================
+#|                      TOP OF FILE:    compiledNetwork.py
+#|------------------------------------------------------------------------------
+#|   The below module documentation string will be displayed by pydoc3.
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+"""
+    FILE NAME:          compiledNetwork.py         [Python 3 module source file]
+
+    FILE PATH:          $GIT_ROOT/dynamic/src/network/compiledNetwork.py
+
+    MODULE NAME:        network.compiledNetwork
+
+    IN COMPONENT:       Dynamic.network     (dynamical network model)
+
+
+    MODULE DESCRIPTION:
+    -------------------
+
+        Ordinarily, a network is simulated by its objects:  each
+        node's variables step themselves forwards, asking their
+        time-derivative functions (trees of dynamic functions built
+        from the Hamiltonian) for their values, one term and one
+        partial derivative at a time.  For big networks (say, a
+        multiplier with thousands of gates) that's a lot of Python
+        calls per step.
+
+        A CompiledNetwork is a struct-of-arrays view of a finished
+        network.  When a network is finalized, its Hamiltonian terms
+        are grouped into blocks, one per kind of interaction (the
+        class of the component it came from, and the polynomial or
+        function it uses):  each InteractionBlock holds the shared
+        potential function, plus one array of node indices for each
+        of its arguments (e.g., the A, B and C nodes of all the AND
+        gates).  The kinetic terms are grouped the same way, by mass,
+        into KineticBlocks.  A leapfrog half-step then evaluates each
+        block's partial derivatives with one batch call per argument
+        (see evalArray() in functions.differentiableFunction), and
+        scatters them into the force on each node.
+
+        Many terms are quadratic (the NOT gates' 0.5*k*(x+y-1)^2, the
+        biases, and the kinetic energies), so their forces are affine
+        in position.  Those aren't evaluated by kernels at all:  the
+        compiler merges all of them into one QuadraticForm, a sparse
+        matrix K and vector b in integers (on quanta), so that their
+        forces take just one sparse mat-vec per half-step.  Only the
+        genuinely nonlinear terms (e.g., AND, OR, XOR, double wells)
+        remain InteractionBlocks.  The stepper itself works entirely
+        in quanta.
+
+        The arithmetic on each value is exactly what the objects
+        would have done, and Fixed addition is exact, so when the
+        simulation is stepped a step (two timesteps) at a time, as
+        the simulator does, every position and momentum takes the
+        same values as in the object engine, forwards and backwards.
+        They are not left at the same times, though:  the object
+        engine evolves one node at a time, and evolving a node drags
+        back a neighbor that was evolved just before it, so some of
+        its positions are left a step behind the context's timestep
+        (and that's what gets printed, e.g., in the CSV output),
+        where a CompiledNetwork leaves all of them at the timestep
+        asked for.  And when the object engine is asked to jump many
+        steps at once, the nodes read each other's dragged-back
+        positions at the wrong times, so in nonlinear networks (e.g.,
+        the AND gate and adder examples) its trajectory differs, and
+        depends on the order of the nodes; a CompiledNetwork's
+        trajectory is the same however its steps are taken.  So the
+        compiled engine is opt-in:  set DynamicNetwork.batched.
+
+        Networks that don't fit this mold (e.g., terms whose variables
+        aren't all node positions) raise NotCompilable, and are left
+        to the object engine.
+
+
+    PUBLIC CLASSES:
+    ---------------
+
+        InteractionBlock - The terms of one kind of interaction.
+
+        QuadraticForm - All the quadratic terms, as a sparse matrix.
+
+        KineticBlock - The kinetic terms for nodes of one mass.
+
+        CompiledNetwork - A network as blocks, with a batched stepper.
+
+        NotCompilable - Raised if a network (or its current state)
+            can't be handled by a CompiledNetwork.
+                                                                             """
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#| End of module documentation string.
+#|------------------------------------------------------------------------------
+
+from math                           import gcd
+
+from fixed                          import Fixed
+from logmaster                      import *
+from functions.polynomialFunction   import PolynomialFunction
+
+from . import _logger
+
+__all__ = ['NotCompilable', 'InteractionBlock', 'QuadraticForm', 'KineticBlock',
+           'CompiledNetwork']
+
+class NotCompilable(Exception): pass
+
+
+#-- InteractionBlock - All the Hamiltonian terms of one kind of interaction
+#   in a network, as a struct of arrays.  Terms belong to the same block if
+#   they came from the same class of component and have equal potentials
+#   (so each block needs just one potential function object).
+
+class InteractionBlock:
+
+    #-- Public data members:
+    #
+    #       .kind [type] - The class of component these terms came from.
+    #       .potential [BaseDifferentiableFunction] - Their shared potential.
+    #       .stiffness - The potential's stiffness, if it has one.
+    #       .nodes [tuple] - For each argument of the potential, the list of
+    #           the indices of the nodes supplying it, one per term.
+    #       .terms [list] - The HamiltonianTerms themselves, in order.
+
+    def __init__(inst, kind:type, potential):
+        inst.kind = kind
+        inst.potential = potential
+        inst.stiffness = getattr(potential, 'stiffness', None)
+        inst.nodes = tuple([] for arg in potential.argNames)
+        inst.terms = []
+
+    def __len__(inst):
+        return len(inst.terms)
+
+    def __str__(inst):
+        return '%s[%d]' % (inst.kind.__name__, len(inst.terms))
+
+    def add(inst, term, indices):
+        inst.terms.append(term)
+        for column, index in zip(inst.nodes, indices):
+            column.append(index)
+
+    #-- inst.quadratic - Whether our potential is a polynomial of degree at
+    #       most 2, evaluated exactly (so our forces are affine).
+
+    @property
+    def quadratic(inst):
+        potential = inst.potential
+        return isinstance(potential, PolynomialFunction) and potential.exact \
+               and potential.degree <= 2
+
+    #-- inst.addForces(Q, F) - Given the list <Q> of the nodes' positions (in
+    #       quanta), adds each term's partial derivatives into the list <F>
+    #       of the (negated) forces on the nodes (likewise in quanta).
+
+    def addForces(inst, Q:list, F:list):
+        potential = inst.potential
+        fromQuanta = Fixed.fromQuanta
+        args = [[fromQuanta(Q[i]) for i in column] for column in inst.nodes]
+        for k, column in enumerate(inst.nodes):
+            for i, d in zip(column, potential.partialArray(k, *args)):
+                F[i] += d.quanta
+
+    #-- inst.addHessian(q, H) - Given the list <q> of the nodes' positions,
+    #       adds each term's second partial derivatives into the sparse
+    #       Hessian <H> (a list, for each node, of a dict from node index to
+    #       value).  Entries are added even where they're zero at <q>, so
+    #       that the sparsity pattern is the same at any state.
+
+    def addHessian(inst, q:list, H:list):
+        potential = inst.potential
+        nodes = inst.nodes
+        args = [[q[i] for i in column] for column in nodes]
+        for k in range(len(nodes)):
+            for l in range(k, len(nodes)):
+                column = potential.secondPartialArray(k, l, *args)
+                for i, j, d in zip(nodes[k], nodes[l], column):
+                    H[i][j] = H[i].get(j, 0) + d
+                    if k != l:
+                        H[j][i] = H[j].get(i, 0) + d
+
+    #-- inst.energy(q) - The total potential energy of our terms.
+
+    def energy(inst, q:list):
+        args = [[q[i] for i in column] for column in inst.nodes]
+        return sum(inst.potential.evalArray(*args), Fixed(0))
+
+#__/ End class InteractionBlock.
+
+
+#-- QuadraticForm - All of a network's quadratic terms (see InteractionBlock.
+#   quadratic), merged into one sparse affine map from the nodes' positions
+#   to the forces on them.  Each term's partial derivative with respect to
+#   each of its arguments is a row:  an integer combination of the quanta
+#   of the nodes' positions, plus a constant, over a denominator (as in
+#   PolynomialFunction's exact mode).  Where that denominator reduces to 1,
+#   the row is exact, and all such rows for the same node are summed into
+#   one row of K (and an entry of b).  The others still have to be rounded
+#   one by one, as the terms' own partials would be, and are kept apart;
+#   so either way, the forces are bit-for-bit the same.
+
+class QuadraticForm:
+
+    #-- Public data members:
+    #
+    #       .blocks [list] - The InteractionBlocks we were built from.
+    #
+    #   Private data members:
+    #
+    #       ._rows [list] - The rows of K, as tuples (i, columns, coeffs, b):
+    #           The force on node i gets sum(coeffs[k]*Q[columns[k]]) + b.
+    #       ._rounded [list] - Rows that need rounding, as tuples (i,
+    #           columns, coeffs, b, M):  Likewise, but divided by M.
+
+    def __init__(inst, blocks:list=()):
+
+        inst.blocks = []
+        inst._rows = []
+        inst._rounded = []
+
+        merged = dict()     # Maps node index to its {column: coeff} and b.
+
+        for block in blocks:
+            inst.blocks.append(block)
+            for k, column in enumerate(block.nodes):
+                coeffs, b, M = _affine(block.potential.partialDerivWRT(k))
+                for term, i in enumerate(column):
+                    columns = [block.nodes[j][term] for j in range(len(coeffs))]
+                    if M == 1:
+                        row, const = merged.get(i, ({}, 0))
+                        for j, c in zip(columns, coeffs):
+                            if c:  row[j] = row.get(j, 0) + c
+                        merged[i] = (row, const + b)
+                    else:
+                        inst._rounded.append((i, columns, coeffs, b, M))
+
+        for i, (row, b) in sorted(merged.items()):
+            row = {j: c for j, c in row.items() if c}
+            inst._rows.append((i, list(row), list(row.values()), b))
+
+    def __len__(inst):
+        return sum(len(block) for block in inst.blocks)
+
+    #-- inst.rows - All of our rows, as tuples (i, columns, coeffs, b, M);
+    #       for the rows of K, M is 1.
+
+    @property
+    def rows(inst):
+        return [row + (1,) for row in inst._rows] + inst._rounded
+
+    def __str__(inst):
+        return 'QuadraticForm[%d rows, %d rounded]' % (len(inst._rows), len(inst._rounded))
+
+    #-- inst.addForces(Q, F) - Given the list <Q> of the nodes' positions in
+    #       quanta, adds K*Q + b into the list <F> of the (negated) forces.
+
+    def addForces(inst, Q:list, F:list):
+        for i, columns, coeffs, b in inst._rows:
+            F[i] += sum([c*Q[j] for j, c in zip(columns, coeffs)], b)
+        for i, columns, coeffs, b, M in inst._rounded:
+            F[i] += _divRound(sum([c*Q[j] for j, c in zip(columns, coeffs)], b), M)
+
+#__/ End class QuadraticForm.
+
+
+#-- KineticBlock - The kinetic terms of all the nodes whose coordinates have
+#   the same kinetic energy and velocity functions (i.e., the same mass).  A
+#   node's position moves at dK/dv(v(p)) * dv/dp(p), exactly as its chain of
+#   dynamic functions computes it.  When K is an exact quadratic and v is an
+#   exact linear function of p (as usual), each factor is affine, and the
+#   chain is done directly in integers, rounding at the same points as the
+#   functions would; for unit mass, none of the roundings do anything, and
+#   the velocity is just the momentum.
+
+class KineticBlock:
+
+    #-- Public data members:
+    #
+    #       .kinetic [BaseDifferentiableFunction] - Kinetic energy K(v).
+    #       .velocity [BaseDifferentiableFunction] - Velocity v(p).
+    #       .nodes [list] - Indices of the nodes in this block.
+    #
+    #   Private data members:
+    #
+    #       .affine [tuple] - (a1, b1, M1, a2, b2, M2, g) such that, in
+    #           quanta, v = (a1*p + b1)/M1, dK/dv = (a2*v + b2)/M2, and
+    #           dv/dp = g (each rounded); or None, if not affine.
+
+    def __init__(inst, kinetic, velocity):
+        inst.kinetic = kinetic
+        inst.velocity = velocity
+        inst.nodes = []
+        inst.affine = None
+        if isinstance(kinetic, PolynomialFunction) and kinetic.exact and kinetic.degree <= 2 \
+           and isinstance(velocity, PolynomialFunction) and velocity.exact and velocity.degree <= 1:
+            (a1,), b1, M1 = _affine(velocity)
+            (a2,), b2, M2 = _affine(kinetic.partialDerivWRT(0))
+            (_,), b, M = _affine(velocity.partialDerivWRT(0))
+            inst.affine = (a1, b1, M1, a2, b2, M2, _divRound(b, M))
+
+    def __len__(inst):
+        return len(inst.nodes)
+
+    #-- inst.setVelocities(P, V) - Given the list <P> of the nodes' momenta,
+    #       in quanta, sets the entries of the list <V> for our nodes to dH/dp
+    #       (likewise in quanta).
+
+    def setVelocities(inst, P:list, V:list):
+        nodes = inst.nodes
+        if inst.affine is None:
+            fromQuanta = Fixed.fromQuanta
+            p = [fromQuanta(P[i]) for i in nodes]
+            dKdv = inst.kinetic.partialArray(0, inst.velocity.evalArray(p))
+            dvdp = inst.velocity.partialArray(0, p)
+            for i, a, b in zip(nodes, dKdv, dvdp):
+                V[i] = (a*b).quanta
+            return
+        a1, b1, M1, a2, b2, M2, g = inst.affine
+        if (a1, b1, M1, a2, b2, M2, g) == (1, 0, 1, 1, 0, 1, _D):
+            for i in nodes:
+                V[i] = P[i]
+            return
+        for i in nodes:
+            v = _divRound(a1*P[i] + b1, M1)
+            V[i] = _divRound(_divRound(a2*v + b2, M2)*g, _D)
+
+    #-- inst.setInverseMasses(p, W) - Given the list <p> of the nodes'
+    #       momenta, sets the entries of the list <W> for our nodes to
+    #       d^2K/dp^2 (the inverse of each node's effective mass).
+
+    def setInverseMasses(inst, p:list, W:list):
+        nodes = inst.nodes
+        p = [p[i] for i in nodes]
+        v = inst.velocity.evalArray(p)
+        dvdp = inst.velocity.partialArray(0, p)
+        d2vdp2 = inst.velocity.secondPartialArray(0, 0, p)
+        dKdv = inst.kinetic.partialArray(0, v)
+        d2Kdv2 = inst.kinetic.secondPartialArray(0, 0, v)
+        for i, a, b, c, d in zip(nodes, d2Kdv2, dvdp, dKdv, d2vdp2):
+            W[i] = a*b*b + c*d
+
+#__/ End class KineticBlock.
+
+
+#-- CompiledNetwork - A network's Hamiltonian as InteractionBlocks, a
+#   QuadraticForm, and KineticBlocks, with a batched leapfrog stepper.
+#   The state still lives in the nodes' variables:  evolveTo() reads it
+#   from them, and writes it back when it's done, so everything else
+#   finds it where it would with the object engine.
+
+class CompiledNetwork:
+
+    #-- Public data members:
+    #
+    #       .network [DynamicNetwork] - The network we compiled.
+    #       .nodes [list] - Its nodes; a node's index is its place here.
+    #       .blocks [list] - Our InteractionBlocks (all of them).
+    #       .quadratic [QuadraticForm] - The quadratic ones, merged.
+    #       .nonlinear [list] - The rest of them.
+    #       .kinetic [list] - Our KineticBlocks.
+    #
+    #   Private data members:
+    #
+    #       ._stepper [GeneratedStepper] - Our generated step module (see
+    #           stepGenerator.py), False if we can't have one, or None if
+    #           we haven't tried yet.
+    #
+    #-- Class data members:
+    #
+    #       maxGenerated [int] - Networks with at most this many nodes are
+    #           stepped by generated code.  (Set it to 0 to turn that off.)
+
+    maxGenerated = 100
+
+    def __init__(inst, network):
+
+        inst.network = network
+        inst.nodes = nodes = list(network.nodes.values())
+        hamiltonian = network.hamiltonian
+        if hamiltonian is None:
+            raise NotCompilable("network %s has no Hamiltonian" % network)
+
+        inst._stepper = None
+        inst._qVars = [node.coord.position for node in nodes]
+        inst._pVars = [node.coord.momentum for node in nodes]
+        index = {var: i for i, var in enumerate(inst._qVars)}
+
+            # Group the kinetic terms.  Each momentum variable must appear in
+            # just its own coordinate's kinetic term.
+
+        kineticTerms = set()
+        kineticBlocks = dict()
+        for i, node in enumerate(nodes):
+            coord = node.coord
+            term = coord.kinetic_term
+            if set(hamiltonian.termsContaining(coord.momentum)) != {term}:
+                raise NotCompilable("momentum of node %s is in non-kinetic terms" % node)
+            kineticTerms.add(term)
+            kinetic, velocity = term.function, coord._velVar.function
+            key = (_functionKey(kinetic), _functionKey(velocity))
+            block = kineticBlocks.get(key)
+            if block is None:
+                block = kineticBlocks[key] = KineticBlock(kinetic, velocity)
+            block.nodes.append(i)
+        inst.kinetic = list(kineticBlocks.values())
+
+            # Group the other terms, in the order of the components that own
+            # them (and then any others, by name), so the layout is repeatable.
+
+        owners = dict()
+        for component in network.components:
+            for term in getattr(component, '_hamTerms', {}).values():
+                owners[term] = type(component)
+        terms = [term for term in owners if term in hamiltonian._terms]
+        terms += sorted((term for term in hamiltonian._terms
+                         if term not in owners and term not in kineticTerms),
+                        key=str)
+
+        blocks = dict()
+        for term in terms:
+            potential = term.function
+            varList = term.varList
+            if len(varList) != len(potential.argNames) or len(set(varList)) != len(varList):
+                raise NotCompilable("term %s's variables don't match its arguments" % term)
+            try:
+                indices = [index[var] for var in varList]
+            except KeyError:
+                raise NotCompilable("term %s depends on more than node positions" % term)
+            kind = owners.get(term, type(potential))
+            key = (kind, _functionKey(potential))
+            block = blocks.get(key)
+            if block is None:
+                block = blocks[key] = InteractionBlock(kind, potential)
+            block.add(term, indices)
+        inst.blocks = list(blocks.values())
+
+            # Merge the quadratic ones into a sparse matrix.
+
+        inst.quadratic = QuadraticForm(block for block in inst.blocks if block.quadratic)
+        inst.nonlinear = [block for block in inst.blocks if not block.quadratic]
+
+        if doInfo:
+            _logger.info("Compiled network %s: %d nodes, %d blocks (%s), %s." %
+                         (network, len(nodes), len(inst.blocks),
+                          ', '.join(map(str, inst.nonlinear)), inst.quadratic))
+
+    #-- inst.forces(Q) - The list of dH/dq for each node, at positions <Q>
+    #       (everything in quanta).
+
+    def forces(inst, Q:list) -> list:
+        F = [0]*len(Q)
+        inst.quadratic.addForces(Q, F)
+        for block in inst.nonlinear:
+            block.addForces(Q, F)
+        return F
+
+    #-- inst.velocities(P) - The list of dH/dp for each node, at momenta <P>
+    #       (everything in quanta).
+
+    def velocities(inst, P:list) -> list:
+        V = [0]*len(P)
+        for block in inst.kinetic:
+            block.setVelocities(P, V)
+        return V
+
+    #-- inst.potentialEnergy(q) - Total potential energy at positions <q>
+    #       (by default, the nodes' current positions).
+
+    def potentialEnergy(inst, q:list=None):
+        if q is None:
+            q = [var.value for var in inst._qVars]
+        return sum((block.energy(q) for block in inst.blocks), Fixed(0))
+
+    #-- inst.hessian(q) - The sparse Hessian of the potential energy at
+    #       positions <q> (by default, the nodes' current positions, as
+    #       floats), as a list, for each node, of a dict from node index to
+    #       value.  (See also stiffness.py.)
+
+    def hessian(inst, q:list=None) -> list:
+        if q is None:
+            q = [float(var.value) for var in inst._qVars]
+        H = [dict() for node in inst.nodes]
+        for block in inst.blocks:
+            block.addHessian(q, H)
+        return H
+
+    #-- inst.inverseMasses(p) - The list of d^2K/dp^2 for each node, at
+    #       momenta <p> (by default, the current ones, as floats).
+
+    def inverseMasses(inst, p:list=None) -> list:
+        if p is None:
+            p = [float(var.value) for var in inst._pVars]
+        W = [0]*len(inst.nodes)
+        for block in inst.kinetic:
+            block.setInverseMasses(p, W)
+        return W
+
+    #-- inst.stepper - Our GeneratedStepper, if we're small enough to have
+    #       one (and it can be generated); otherwise None.
+
+    @property
+    def stepper(inst):
+        if inst._stepper is None:
+            inst._stepper = False
+            if 0 < len(inst.nodes) <= inst.maxGenerated:
+                from .stepGenerator import GeneratedStepper     # (Avoids circularity.)
+                try:
+                    inst._stepper = GeneratedStepper(inst)
+                except NotCompilable as e:
+                    if doInfo:
+                        _logger.info("No step module for network %s (%s)." %
+                                     (inst.network, e))
+        return inst._stepper or None
+
+    #-- inst.evolveTo(timestep) - Evolves all of the nodes' positions to
+    #       <timestep> (or the nearest one with the right parity, short of
+    #       it), the same way the nodes would evolve themselves.  Requires
+    #       that all positions be at the same time step, and all momenta one
+    #       step before or after that; raises NotCompilable (before changing
+    #       anything) if they aren't.
+
+    def evolveTo(inst, timestep:int):
+
+        qVars, pVars = inst._qVars, inst._pVars
+        if not qVars:
+            return
+
+        tq = qVars[0].time
+        tp = pVars[0].time
+        if any(var.time != tq for var in qVars) or any(var.time != tp for var in pVars) \
+           or abs(tp - tq) != 1:
+            raise NotCompilable("network %s's variables aren't in lockstep" % inst.network)
+
+        if (timestep - tq) % 2 != 0:        # Wrong parity; stop short, as variables do.
+            timestep += -1 if timestep > tq else 1
+        if timestep == tq:
+            return
+
+        dt = inst.network.context.timedelta
+        if not isinstance(dt, Fixed):
+            raise NotCompilable("time step %s isn't a Fixed" % dt)
+
+            # Work in quanta.  Each update adds (2*derivative)*dt, rounded
+            # half-to-even, the same as the variables do it in Fixed.
+
+        dt = dt.quanta
+        Q = [Fixed(var.value).quanta for var in qVars]
+        P = [Fixed(var.value).quanta for var in pVars]
+
+            # Each step updates the momenta, except maybe on the first step
+            # (if they're already ahead), and then the positions.
+
+        forward = timestep > tq
+        kick = tp < tq if forward else tp > tq
+        steps = abs(timestep - tq)//2
+
+        stepper = inst.stepper
+        if stepper is not None:
+            Q, P = stepper.run(Q, P, dt, steps, forward, kick)
+        else:
+            sign = 1 if forward else -1
+            for step in range(steps):
+                if kick or step:
+                    F = inst.forces(Q)
+                    P = [p + sign*_divRound(-2*f*dt, _D) for p, f in zip(P, F)]
+                V = inst.velocities(P)
+                Q = [q + sign*_divRound(2*v*dt, _D) for q, v in zip(Q, V)]
+
+        tq = timestep
+        tp = tq - 1 if forward else tq + 1
+
+        fromQuanta = Fixed.fromQuanta
+        for var, value in zip(qVars, Q):
+            var.value = fromQuanta(value)
+            var.time = tq
+        for var, value in zip(pVars, P):
+            var.value = fromQuanta(value)
+            var.time = tp
+
+#__/ End class CompiledNetwork.
+
+
+_D = Fixed(1).quanta       # The Fixed denominator.
+
+# <num>/<den> (den > 0), rounded half-to-even, the same as Fixed() does.
+
+def _divRound(num:int, den:int) -> int:
+    q, r = divmod(num, den)
+    if 2*r > den or (2*r == den and q & 1):
+        q += 1
+    return q
+
+# The exact polynomial <poly> of degree at most 1, as a tuple (coeffs, b, M)
+# such that, on the arguments' quanta X, its value in quanta (before the
+# rounding) is (sum(coeffs[k]*X[k]) + b)/M, in lowest terms.  This is the
+# same integer form its exact evaluator uses.
+
+def _affine(poly:PolynomialFunction) -> tuple:
+    terms, M = poly.integerForm()
+    a = [0]*len(poly.argNames)
+    b = 0
+    for exps, c in terms.items():
+        if sum(exps) == 0:
+            b = c
+        else:
+            a[exps.index(1)] = c
+    g = gcd(M, b, *a)
+    return [x//g for x in a], b//g, M//g
+
+# A key such that functions with equal keys compute the same thing:  For
+# polynomials, their terms (and exactness); otherwise, the object itself.
+
+def _functionKey(function):
+    if isinstance(function, PolynomialFunction):
+        return (len(function.argNames), function.exact,
+                frozenset(function.terms.items()))
+    return function
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    compiledNetwork.py
+#|==============================================================================
@@ -31,6 +31,8 @@ from .dynamicPort       import  DynamicPort         as Port
 from .dynamicComponent  import  DynamicComponent    as Component
 
 from simulator.hamiltonian        import HamiltonianTerm,Hamiltonian
+from .compiledNetwork             import CompiledNetwork,NotCompilable
+from .stiffness                   import StiffnessAnalysis
 
 class SimulationContext: pass       # Forward declaration to avoid circularity
 
@@ -62,6 +64,15 @@ class NoSuchNode(ErrorException, NetworkException):
 #       If a gate is added, its input and output nodes are also
 #       automatically added.  If a node is added, all its links are
 #       added; if a link is added, the items it links are added.
+#
+#       The first time a network is evolved after it's been changed,
+#       it's finalized:  all of its Hamiltonian's partial derivatives
+#       are worked out up front (see simulator/dependencyGraph.py).
+#       If DynamicNetwork.batched is set (it's off by default), its
+#       Hamiltonian terms are also compiled into blocks of like
+#       interactions (see compiledNetwork.py), which are then stepped
+#       in batches.  Otherwise, or if that's not possible, the nodes
+#       just evolve themselves, as before.
 
 class DynamicNetwork:
 
@@ -83,7 +94,20 @@ class DynamicNetwork:
     #
     #       inst._context:SimulationContext - The simulation context that
     #           will be used for simulating this network.
-    
+    #
+    #       inst._compiled [CompiledNetwork] - Our compiled form, if we've
+    #           been finalized since we last changed (or False, if we
+    #           couldn't be compiled); None if we haven't been.
+    #
+    #-- Class data members:
+    #
+    #       batched [bool] - Whether to step networks in compiled form
+    #           when possible.  Off by default:  the compiled engine's
+    #           trajectories aren't always the object engine's (see
+    #           compiledNetwork.py).  Set it True to use it.
+
+    batched = False
+
     def __init__(inst, name:str=None, title:str=None, context:SimulationContext=None):
 
         if name != None:    inst.name = name
@@ -103,6 +127,8 @@ class DynamicNetwork:
 
         inst._seqno = 0     # Initial sequence number for node names is 0.
 
+        inst._compiled = None   # Not finalized yet.
+
         inst.context = context      # Also points context at us as a side-effect.
 
     def __str__(self):
@@ -148,6 +174,7 @@ class DynamicNetwork:
                          (str(part), str(self)))
             
         self._components.append(part)
+        self._compiled = None           # We've changed; need to refinalize.
         # Here we need to, like, also make sure that all of the component's connected nodes
         # (if any) are also in the network.
 
@@ -180,6 +207,7 @@ class DynamicNetwork:
             # Now add the given term into the Hamiltonian.
         
         self.hamiltonian.addTerm(term)
+        self._compiled = None
     
     #-- inst.addNode(node:Node) - Adds the given node to the
     #       network (and its connected links).  If no name is provided,
@@ -219,6 +247,7 @@ class DynamicNetwork:
             logger.debug("Adding node '%s' to network '%s'" % (nodeName, str(self)))
 
         self._nodes[nodeName] = node
+        self._compiled = None
 
     # This method registers that a node has changed names from the
     # given <oldName> to its new name.
@@ -240,6 +269,35 @@ class DynamicNetwork:
     def constructHamiltonian(self):
         logger.fatal("DynamicNetwork.constructHamiltonian() not yet implemented!")
 
+    #-- inst.finalize() - Work out our Hamiltonian's partial derivatives, and
+    #       (if .batched is set) compile this network (see compiledNetwork.py),
+    #       if we haven't already since it last changed.  Returns the compiled
+    #       network, or None if it isn't compiled.  Called automatically by
+    #       .evolveTo(), but can be called early to pay the cost up front.
+
+    def finalize(self):
+        if self._hamiltonian is not None:
+            self._hamiltonian.finalize()
+        if not self.batched:
+            return None
+        if self._compiled is None:
+            try:
+                self._compiled = CompiledNetwork(self)
+            except NotCompilable as e:
+                if doInfo:
+                    logger.info("Network %s can't be compiled (%s); its nodes "
+                                "will evolve themselves." % (str(self), e))
+                self._compiled = False
+        return self._compiled or None
+
+    #-- inst.stiffness(q, p) - Analyze this network's stiffness (see
+    #       stiffness.py) with its nodes at positions <q> and momenta <p>
+    #       (by default, their current values).  Returns a StiffnessAnalysis,
+    #       whose .maxTimedelta is the largest stable time step there.
+
+    def stiffness(self, q:list=None, p:list=None) -> StiffnessAnalysis:
+        return StiffnessAnalysis(self, q, p)
+
     #-- inst.evolveTo() - Evolve the state of all generalized position
     #       variables in the network forwards to the given timestep.
 
@@ -252,6 +310,18 @@ class DynamicNetwork:
             if len(self._nodes) == 0:
                 logger.debug("Debug warning: Dynamic network has no nodes!!!")
 
+            # If we can, do it in compiled form.
+
+        compiled = self.finalize()
+        if compiled is not None:
+            try:
+                compiled.evolveTo(timestep)
+                return
+            except NotCompilable as e:
+                if doDebug:
+                    logger.debug("DynamicNetwork.evolveTo(): %s; evolving "
+                                 "node by node instead." % e)
+
         for node in self._nodes.values():
             
             node.evolveTo(timestep)
@@ -276,6 +346,15 @@ class DynamicNetwork:
         else:
             return []
 
+    # Get the list of components in this network.
+
+    @property
+    def components(me):
+        if hasattr(me, '_components'):
+            return me._components
+        else:
+            return []
+
     def node(self, nodeName:str):
         if nodeName in self.nodes:
             return self._nodes[nodeName]
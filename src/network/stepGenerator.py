@@ -0,0 +1,352 @@
+#|==============================================================================
+#|                      TOP OF FILE:    stepGenerator.py
+#|------------------------------------------------------------------------------
+#|   The below module documentation string will be displayed by pydoc3.
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+"""
+    FILE NAME:          stepGenerator.py           [Python 3 module source file]
+
+    FILE PATH:          $GIT_ROOT/dynamic/src/network/stepGenerator.py
+
+    MODULE NAME:        network.stepGenerator
+
+    IN COMPONENT:       Dynamic.network     (dynamical network model)
+
+
+    MODULE DESCRIPTION:
+    -------------------
+
+        For small circuits (say, a full adder, with about ten nodes),
+        even a CompiledNetwork spends most of its time on overhead:
+        building little lists for each block, and calling kernels on
+        them.  The arithmetic itself is just a few dozen integer
+        operations per step.
+
+        So for those, we go one step further, and generate a Python
+        module specialized to the one network, whose functions do a
+        whole run of leapfrog steps on local variables, one for each
+        node's position and momentum (in quanta), with every force
+        written out in straight-line integer arithmetic.  The gates'
+        partial derivatives are inlined, in the same integer form as
+        their exact evaluators (see PolynomialFunction.integerForm()),
+        and rounded at the same points, so the results are bit-for-bit
+        the same as the CompiledNetwork's, however the steps are taken.
+        The products of positions that they use (e.g., A*B for an AND
+        gate) are computed once per step, and shared by all the
+        partials that need them.
+
+        The results aren't always the object engine's, though:
+        stepped a step at a time, they agree, but the objects leave
+        some positions a step behind; and over a long jump, the
+        objects' trajectory through a nonlinear network (e.g., the
+        full adder) is different (see compiledNetwork.py).
+
+        Generated modules are cached on disk, in CACHE_DIR, under a
+        hash of everything the code depends on, so a network that's
+        been seen before (in this run or an earlier one) just has its
+        module imported, skipping the compile.  CACHE_DIR is in the
+        user's own cache directory, and is kept private (mode 0700,
+        where there are such things); and since the source itself is
+        cheap to generate, a cached module is only imported if it's
+        exactly the source we'd have written.  Otherwise, it's
+        written afresh.
+
+        Networks whose nonlinear terms aren't exact polynomials, or
+        whose kinetic terms aren't affine, raise NotCompilable; they
+        are stepped by the CompiledNetwork instead.
+
+
+    PUBLIC CLASSES:
+    ---------------
+
+        GeneratedStepper - A network's generated step module, loaded.
+
+
+    PUBLIC GLOBALS:
+    ---------------
+
+        CACHE_DIR - The directory where generated modules are kept.
+                                                                             """
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#| End of module documentation string.
+#|------------------------------------------------------------------------------
+
+import hashlib
+import importlib.util
+import os
+import stat
+import tempfile
+
+from fixed                          import Fixed
+from logmaster                      import *
+from functions.polynomialFunction   import PolynomialFunction
+
+from . import _logger
+from .compiledNetwork import NotCompilable
+
+__all__ = ['CACHE_DIR', 'GeneratedStepper']
+
+    # The user's cache directory, per platform conventions.
+
+if os.name == 'nt':
+    _CACHE_HOME = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+else:
+    _CACHE_HOME = os.environ.get('XDG_CACHE_HOME') or \
+                  os.path.join(os.path.expanduser('~'), '.cache')
+
+CACHE_DIR = os.path.join(_CACHE_HOME, 'dynamic', 'steppers')
+
+_VERSION = 1            # Bump this whenever the generated code changes.
+
+_D = Fixed(1).quanta
+
+
+#-- GeneratedStepper - Generates (or finds in the cache) the step module for
+#   a CompiledNetwork, and runs it.
+
+class GeneratedStepper:
+
+    #-- Public data members:
+    #
+    #       .key [str] - The hash that the module is cached under.
+    #       .path [str] - The module's file, or None if it couldn't be
+    #           written (then it's just kept in memory).
+
+    def __init__(inst, compiled):
+
+        desc = _describe(compiled)
+        inst.key = hashlib.sha256(repr((_VERSION, desc)).encode()).hexdigest()[:20]
+        name = 'step_' + inst.key
+        inst.path = os.path.join(CACHE_DIR, name + '.py')
+
+        source = _generate(desc)
+        try:
+            _makePrivateDir(CACHE_DIR)
+            if _readCached(inst.path) != source:
+                fd, temp = tempfile.mkstemp(suffix='.tmp', dir=CACHE_DIR)
+                with os.fdopen(fd, 'w') as file:
+                    file.write(source)
+                os.replace(temp, inst.path)     # Atomic, if others race us.
+                if doInfo:
+                    _logger.info("Generated step module %s for network %s." %
+                                 (inst.path, compiled.network))
+        except OSError as e:
+            if doInfo:
+                _logger.info("Couldn't cache step module for network %s (%s); "
+                             "keeping it in memory." % (compiled.network, e))
+            inst.path = None
+            namespace = dict()
+            exec(compile(source, '<%s>' % name, 'exec'), namespace)
+            inst._forward = namespace['forward']
+            inst._backward = namespace['backward']
+            return
+
+        spec = importlib.util.spec_from_file_location(name, inst.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        inst._forward = module.forward
+        inst._backward = module.backward
+
+    #-- inst.run(Q, P, dt, steps, forward, kick) - Does <steps> leapfrog
+    #       steps, forward or backward in time, from positions <Q> and
+    #       momenta <P> (lists of quanta), with time step <dt> (in quanta).
+    #       Each step updates the momenta (if <kick> is set, or it's not the
+    #       first step), then the positions.  Returns the new (Q, P).
+
+    def run(inst, Q:list, P:list, dt:int, steps:int, forward:bool, kick:bool):
+        run = inst._forward if forward else inst._backward
+        return run(Q, P, dt, steps, kick)
+
+#__/ End class GeneratedStepper.
+
+
+#-- _makePrivateDir(path) - Creates directory <path> (if need be), readable
+#       and writable by this user only.  Where there are owners and modes
+#       (i.e., not on Windows), raises OSError if it's there already, but
+#       isn't a directory of ours, and shuts others out of it if it's ours
+#       but they can get in.
+
+def _makePrivateDir(path:str):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, 'getuid'):
+        st = os.lstat(path)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+            raise OSError("%s isn't a directory of ours" % path)
+        if st.st_mode & 0o077:
+            os.chmod(path, 0o700)
+
+
+#-- _readCached(path) - The contents of the cached module <path>, or None
+#       if there isn't one (or it isn't a plain file of ours).
+
+def _readCached(path:str):
+    try:
+        st = os.lstat(path)
+        if not stat.S_ISREG(st.st_mode) or \
+           (hasattr(os, 'getuid') and st.st_uid != os.getuid()):
+            return None
+        with open(path) as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+# Returns a description of everything about <compiled> that its step module
+# depends on, in plain data (so it can be hashed):  the number of nodes, the
+# rows of its quadratic form, the integer forms of its nonlinear partials
+# (with the nodes they're applied to), and its kinetic chains.
+
+def _describe(compiled) -> tuple:
+
+    nonlinear = []
+    for block in compiled.nonlinear:
+        potential = block.potential
+        if not isinstance(potential, PolynomialFunction) or not potential.exact:
+            raise NotCompilable("block %s's potential isn't an exact polynomial" % block)
+        forms = []
+        for k in range(len(potential.argNames)):
+            terms, M = potential.partialDerivWRT(k).integerForm()
+            forms.append((tuple(sorted(terms.items())), M))
+        nonlinear.append((tuple(forms), tuple(map(tuple, block.nodes))))
+
+    kinetic = []
+    for block in compiled.kinetic:
+        if block.affine is None:
+            raise NotCompilable("kinetic block for %s isn't affine" % block.kinetic)
+        kinetic.append((block.affine, tuple(block.nodes)))
+
+    rows = tuple((i, tuple(columns), tuple(coeffs), b, M)
+                 for i, columns, coeffs, b, M in compiled.quadratic.rows)
+
+    return (len(compiled.nodes), rows, tuple(nonlinear), tuple(kinetic))
+
+
+# Generates the source of the step module described by <desc> (see above).
+
+def _generate(desc:tuple) -> str:
+
+    nNodes, rows, nonlinear, kinetic = desc
+    D = _D
+
+        # Lines for the momentum and position updates (where '@=' will be
+        # '+=' going forward, and '-=' going backward).
+
+    kick = []
+    forces = [[] for i in range(nNodes)]    # Expressions to sum, per node.
+    monomials = dict()          # Sorted node-index tuple -> local name.
+    partial = 0                 # Serial number for rounded partials.
+
+    def monomial(nodes:tuple) -> str:
+        name = monomials.get(nodes)
+        if name is None:
+            name = monomials[nodes] = 'm' + '_'.join(map(str, nodes))
+            kick.append('%s = %s*q%d' % (name, monomial(nodes[:-1]), nodes[-1]))
+        return name
+
+    for i in range(nNodes):
+        monomials[(i,)] = 'q%d' % i
+
+        # Quadratic rows.
+
+    for i, columns, coeffs, b, M in rows:
+        expr = _combination([(c, 'q%d' % j) for j, c in zip(columns, coeffs)], b)
+        if M == 1:
+            forces[i].append(expr)
+        else:
+            kick += _rounded('g%d' % partial, expr, M)
+            forces[i].append('g%d' % partial)
+            partial += 1
+
+        # Nonlinear partials.  Each monomial of the arguments becomes a
+        # product of nodes' positions, hoisted so that all uses share it.
+
+    for forms, columns in nonlinear:
+        for term in range(len(columns[0])):
+            nodes = [column[term] for column in columns]
+            for k, (terms, M) in enumerate(forms):
+                combo = []
+                const = 0
+                for exps, c in terms:
+                    factors = tuple(sorted(n for n, e in zip(nodes, exps) for _ in range(e)))
+                    if factors:
+                        combo.append((c, monomial(factors)))
+                    else:
+                        const += c
+                kick += _rounded('g%d' % partial, _combination(combo, const), M)
+                forces[nodes[k]].append('g%d' % partial)
+                partial += 1
+
+        # Then each momentum moves by -2*dt*F, rounded.
+
+    for i in range(nNodes):
+        force = ' + '.join(forces[i]) or '0'
+        kick += _rounded('t', '-k*(%s)' % force, D)
+        kick.append('p%d @= t' % i)
+
+        # The positions move by 2*dt*V, where V is worked out through the
+        # kinetic chain (see KineticBlock), skipping the trivial roundings.
+
+    drift = []
+    for (a1, b1, M1, a2, b2, M2, g), nodes in kinetic:
+        for i in nodes:
+            if (a1, b1, M1, a2, b2, M2, g) == (1, 0, 1, 1, 0, 1, D):
+                v = 'p%d' % i
+            else:
+                drift += _rounded('v', _combination([(a1, 'p%d' % i)], b1), M1)
+                drift += _rounded('v', _combination([(a2, 'v')], b2), M2)
+                if g != D:
+                    drift += _rounded('v', 'v*%d' % g, D)
+                v = 'v'
+            drift += _rounded('t', 'k*%s' % v, D)
+            drift.append('q%d @= t' % i)
+
+    qs = ', '.join('q%d' % i for i in range(nNodes))
+    ps = ', '.join('p%d' % i for i in range(nNodes))
+
+    source = ['# Generated by network.stepGenerator; do not edit.',
+              '# Leapfrog steps for a network of %d nodes, in quanta.' % nNodes, '']
+    for function, sign in (('forward', '+'), ('backward', '-')):
+        source += ['def %s(Q, P, dt, steps, kick):' % function,
+                   '    %s, = Q' % qs,
+                   '    %s, = P' % ps,
+                   '    k = 2*dt',
+                   '    for step in range(steps):',
+                   '        if kick or step:']
+        source += ['            ' + line.replace('@=', sign + '=') for line in kick]
+        source += ['        ' + line.replace('@=', sign + '=') for line in drift]
+        source += ['    return [%s], [%s]' % (qs, ps), '']
+
+    return '\n'.join(source) + '\n'
+
+
+# Lines that set <var> to <expr>/<M>, rounded half-to-even (as Fixed() does).
+
+def _rounded(var:str, expr:str, M:int) -> list:
+    if M == 1:
+        return ['%s = %s' % (var, expr)]
+    return ['u, r = divmod(%s, %d)' % (expr, M),
+            '%s = u + (r + r > %d or r + r == %d and u & 1)' % (var, M, M)]
+
+
+# An expression for sum(c*x for c, x in <combo>) + <const>, in integers.
+
+def _combination(combo:list, const:int=0) -> str:
+    expr = ''
+    for c, x in combo:
+        if c == 0:
+            continue
+        term = x if abs(c) == 1 else '%d*%s' % (abs(c), x)
+        if expr:
+            expr += (' - ' if c < 0 else ' + ') + term
+        else:
+            expr = ('-' if c < 0 else '') + term
+    if const or not expr:
+        if expr:
+            expr += (' - %d' if const < 0 else ' + %d') % abs(const)
+        else:
+            expr = '%d' % const
+    return expr
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    stepGenerator.py
+#|==============================================================================
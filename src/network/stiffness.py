@@ -0,0 +1,317 @@
+#|==============================================================================
+#|                      TOP OF FILE:    stiffness.py
+#|------------------------------------------------------------------------------
+#|   The below module documentation string will be displayed by pydoc3.
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+"""
+    FILE NAME:          stiffness.py               [Python 3 module source file]
+
+    FILE PATH:          $GIT_ROOT/dynamic/src/network/stiffness.py
+
+    MODULE NAME:        network.stiffness
+
+    IN COMPONENT:       Dynamic.network     (dynamical network model)
+
+
+    MODULE DESCRIPTION:
+    -------------------
+
+        How large a time step can a network take?  The leapfrog
+        integrator is stable for a mode of angular frequency omega as
+        long as omega times its step is less than 2.  Each of our steps
+        moves the positions (and the momenta) forward by 2*timedelta,
+        so that means timedelta < 1/omega, for the fastest mode.
+
+        Near a given state, the modes are those of the linearized
+        dynamics:  their squared frequencies are the eigenvalues of
+        W^(1/2) H W^(1/2), where H is the Hessian of the potential
+        energy with respect to the nodes' positions, and W is the
+        diagonal matrix of the nodes' inverse masses (d^2K/dp^2).
+
+        A StiffnessAnalysis assembles H (sparsely, block by block; see
+        CompiledNetwork.hessian()) at a given state, splits the nodes
+        into clusters that H couples together, and estimates each
+        cluster's lowest and highest eigenvalues by the Lanczos method
+        (with full reorthogonalization), finishing with bisection on
+        the resulting tridiagonal matrix.  For clusters of up to
+        .maxSteps nodes, the estimates are exact (up to floating-point
+        error).  For larger ones, they're the extreme eigenvalues of
+        .maxSteps steps of Lanczos, which converge to the true ones
+        quickly, but from inside:  the highest may be a little low.
+
+        A negative lowest eigenvalue means the state is at an unstable
+        point (e.g., near the top of a double well), where the network
+        naturally runs away exponentially; no time step fixes that.
+
+        The potential isn't quadratic in general, so the stiffness
+        changes from state to state:  analyze the states where the
+        network is stiffest (usually, at the bottoms of its wells),
+        and leave some margin.
+
+
+    PUBLIC CLASSES:
+    ---------------
+
+        Cluster - A set of coupled nodes, with its extreme eigenvalues.
+
+        StiffnessAnalysis - The clusters of a network at some state.
+                                                                             """
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#| End of module documentation string.
+#|------------------------------------------------------------------------------
+
+from math import sqrt, inf
+
+from logmaster                      import *
+
+from . import _logger
+from .compiledNetwork import CompiledNetwork
+
+__all__ = ['Cluster', 'StiffnessAnalysis']
+
+
+#-- Cluster - Nodes that the Hessian couples together (directly or not), with
+#   the extreme eigenvalues of their mass-weighted Hessian.
+
+class Cluster:
+
+    #-- Public data members:
+    #
+    #       .nodes [list] - The nodes in this cluster.
+    #       .lowest, .highest [float] - The lowest and highest eigenvalues
+    #           (squared angular frequencies) of the cluster's modes.
+
+    def __init__(inst, nodes:list, lowest:float, highest:float):
+        inst.nodes = nodes
+        inst.lowest = lowest
+        inst.highest = highest
+
+    def __str__(inst):
+        return 'Cluster[%d nodes, omega^2 in [%g, %g]]' % (len(inst.nodes),
+                                                          inst.lowest, inst.highest)
+
+    #-- inst.frequency - The cluster's highest angular frequency.
+
+    @property
+    def frequency(inst) -> float:
+        return sqrt(max(inst.highest, 0))
+
+    #-- inst.maxTimedelta - The largest stable timedelta for the cluster
+    #       (infinite, if it doesn't oscillate at all).
+
+    @property
+    def maxTimedelta(inst) -> float:
+        frequency = inst.frequency
+        return 1/frequency if frequency else inf
+
+#__/ End class Cluster.
+
+
+#-- StiffnessAnalysis - The Hessian of a network's potential energy at some
+#   state, and its clusters (see above).
+
+class StiffnessAnalysis:
+
+    #-- Public data members:
+    #
+    #       .network [DynamicNetwork] - The network analyzed.
+    #       .hessian [list] - The sparse Hessian, as a list, for each node,
+    #           of a dict from node index to value (see CompiledNetwork).
+    #       .inverseMasses [list] - Each node's d^2K/dp^2.
+    #       .clusters [list] - The Clusters, stiffest first.
+    #
+    #-- Class data members:
+    #
+    #       maxSteps [int] - The most Lanczos steps taken per cluster.
+
+    maxSteps = 50
+
+    #-- StiffnessAnalysis(network, q, p) - Analyzes <network> with its nodes
+    #       at positions <q> and momenta <p> (lists, in the order of the
+    #       network's nodes; by default, their current values).  Raises
+    #       NotCompilable if the network can't be put in compiled form.
+
+    def __init__(inst, network, q:list=None, p:list=None):
+
+        inst.network = network
+        compiled = network.finalize() or CompiledNetwork(network)
+        if q is not None:
+            q = [float(x) for x in q]
+        if p is not None:
+            p = [float(x) for x in p]
+        H = inst.hessian = compiled.hessian(q)
+        W = inst.inverseMasses = compiled.inverseMasses(p)
+
+            # Scale H to W^(1/2) H W^(1/2).
+
+        scale = [sqrt(max(w, 0)) for w in W]
+        A = [{j: scale[i]*h*scale[j] for j, h in row.items()} for i, row in enumerate(H)]
+
+        inst.clusters = []
+        for members in _components(A):
+            lowest, highest = _extremes(A, members, inst.maxSteps)
+            nodes = [compiled.nodes[i] for i in members]
+            inst.clusters.append(Cluster(nodes, lowest, highest))
+        inst.clusters.sort(key=lambda cluster: -cluster.highest)
+
+        if doInfo:
+            _logger.info("Stiffness of network %s: %d clusters; highest frequency %g, "
+                         "so timedelta must be less than %g." %
+                         (network, len(inst.clusters), inst.frequency, inst.maxTimedelta))
+
+    #-- inst.frequency - The network's highest angular frequency.
+
+    @property
+    def frequency(inst) -> float:
+        return max((cluster.frequency for cluster in inst.clusters), default=0.0)
+
+    #-- inst.maxTimedelta - The largest stable timedelta for the network.
+
+    @property
+    def maxTimedelta(inst) -> float:
+        return min((cluster.maxTimedelta for cluster in inst.clusters), default=inf)
+
+    #-- inst.unstable - The clusters that are at unstable points (see above).
+
+    @property
+    def unstable(inst) -> list:
+        return [cluster for cluster in inst.clusters if cluster.lowest < 0]
+
+#__/ End class StiffnessAnalysis.
+
+
+# The connected components of the sparse symmetric matrix <A>, as sorted
+# lists of indices.
+
+def _components(A:list) -> list:
+    seen = set()
+    components = []
+    for start in range(len(A)):
+        if start in seen:
+            continue
+        seen.add(start)
+        stack = [start]
+        members = []
+        while stack:
+            i = stack.pop()
+            members.append(i)
+            for j in A[i]:
+                if j not in seen:
+                    seen.add(j)
+                    stack.append(j)
+        components.append(sorted(members))
+    return components
+
+
+# The lowest and highest eigenvalues of <A> restricted to <members>, from at
+# most <maxSteps> steps of Lanczos.
+
+def _extremes(A:list, members:list, maxSteps:int) -> tuple:
+
+    n = len(members)
+    local = {i: k for k, i in enumerate(members)}
+    rows = [[(local[j], a) for j, a in A[i].items() if j in local] for i in members]
+
+    def matvec(v:list) -> list:
+        return [sum(a*v[j] for j, a in row) for row in rows]
+
+    alpha, beta = _lanczos(matvec, n, min(n, maxSteps))
+    return _eigenvalue(alpha, beta, 0), _eigenvalue(alpha, beta, len(alpha) - 1)
+
+
+# Runs <steps> steps of Lanczos on the symmetric n-by-n operator <matvec>,
+# with full reorthogonalization, returning the diagonal <alpha> and the
+# off-diagonal <beta> of the tridiagonal matrix it builds.  If the Krylov
+# space runs out early, it carries on from a fresh vector (with a zero
+# off-diagonal entry), so that n steps find all the eigenvalues.
+
+def _lanczos(matvec, n:int, steps:int) -> tuple:
+
+    v = _normalized([1 + k/n for k in range(n)])    # Deterministic start.
+    basis = []
+    alpha = []
+    beta = []
+    size = 0.0          # Largest entry seen so far, for the breakdown test.
+
+    for step in range(steps):
+
+        basis.append(v)
+        w = matvec(v)
+        alpha.append(_dot(w, v))
+        for twice in range(2):
+            for u in basis:
+                c = _dot(w, u)
+                w = [x - c*y for x, y in zip(w, u)]
+        if step == steps - 1:
+            break
+
+        b = sqrt(_dot(w, w))
+        size = max(size, abs(alpha[-1]), b)
+        if b > 1e-12*size:
+            beta.append(b)
+            v = [x/b for x in w]
+            continue
+
+            # Breakdown:  Start again from a unit vector that's orthogonal
+            # to the basis so far.
+
+        for k in range(n):
+            e = [float(i == k) for i in range(n)]
+            for twice in range(2):
+                for u in basis:
+                    c = _dot(e, u)
+                    e = [x - c*y for x, y in zip(e, u)]
+            if _dot(e, e) > 0.25:
+                break
+        beta.append(0.0)
+        v = _normalized(e)
+
+    return alpha, beta
+
+
+# The <k>th smallest eigenvalue (from 0) of the symmetric tridiagonal matrix
+# with diagonal <alpha> and off-diagonal <beta>, by bisection on Sturm counts.
+
+def _eigenvalue(alpha:list, beta:list, k:int) -> float:
+
+    radii = [(abs(beta[i-1]) if i else 0) + (abs(beta[i]) if i < len(beta) else 0)
+             for i in range(len(alpha))]
+    lo = min(a - r for a, r in zip(alpha, radii))
+    hi = max(a + r for a, r in zip(alpha, radii))
+
+    while True:
+        mid = (lo + hi)/2
+        if not lo < mid < hi:
+            return mid
+        if _countBelow(alpha, beta, mid) > k:
+            hi = mid
+        else:
+            lo = mid
+
+
+# The number of eigenvalues below <x> of the tridiagonal matrix (alpha, beta).
+# (This is the number of negative pivots in the LDL^T factorization of the
+# matrix minus x.)
+
+def _countBelow(alpha:list, beta:list, x:float) -> int:
+    count = 0
+    d = 1.0
+    for i, a in enumerate(alpha):
+        d = a - x - (beta[i-1]**2/d if i else 0)
+        if d == 0:
+            d = -1e-300
+        if d < 0:
+            count += 1
+    return count
+
+
+def _dot(u:list, v:list) -> float:
+    return sum(x*y for x, y in zip(u, v))
+
+def _normalized(v:list) -> list:
+    norm = sqrt(_dot(v, v))
+    return [x/norm for x in v]
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    stiffness.py
+#|==============================================================================
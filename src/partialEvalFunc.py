@@ -1,6 +1,6 @@
 from typing     import Any,Callable,Iterable
 from functools  import partial
-from inspect    import getargspec
+from inspect    import getfullargspec
 
 import logmaster; from logmaster import *
 
@@ -40,7 +40,7 @@ class PartiallyEvaluatableFunction():   # Is callable().
         if argList == None:
 ##            logger.normal("PartiallyEvaluatableFunction.__init__(): About to get the arg spec of function %s..." %
 ##                         str(function))
-            argList = getargspec(function).args
+            argList = getfullargspec(function).args
             
         inst._argList = list(argList)
 
@@ -155,6 +155,20 @@
                 alternately updating the position and momentum
                 coordinates) is implemented here.
 
+            stateSnapshot.py - State snapshot module.
+
+                This module defines classes for capturing the states
+                of a network's nodes at a given time step, and for
+                handing those snapshots over to viewers (such as the
+                GUI's network visualizer) running in other threads.
+
+            simProcess.py - Simulation process module.
+
+                This module defines classes for running a simulation
+                in a child process, controlled through a pipe, which
+                publishes the network's state through a ring buffer
+                in shared memory.
+
             simmor.py - Simulator object module.
 
                 This module (still experimental) defines a top-level
@@ -241,10 +255,14 @@ __all__ = [                     # All public modules exported from this package.
     'dynamicFunction',                  # Functions tied to the simulator state.
     'dynamicVariable',                  # Update themselves using time derivs.
     'derivedDynamicFunction',           # Functions of dynamic variables.
+    'evaluationPlan',                   # Flattened, optimized function trees.
     'differentiableDynamicFunction',    # Ones that are also differentiable.
+    'dependencyGraph',                  # Which terms depend on what, and how.
     'hamiltonian',                      # Single terms and sums-of-terms.
     'hamiltonianVariable',              # Variables that know their Hamiltonian.
     'dynamicCoordinate',                # Canonical position-momentum pairs.
+    'stateSnapshot',                    # Network states handed to viewers.
+    'simProcess',                       # Simulation in a child process.
     'simmor'                            # Object managing a whole simulation.
     ]
 
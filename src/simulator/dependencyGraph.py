@@ -0,0 +1,91 @@
+import logmaster; from logmaster import *
+
+logger = getLogger(logmaster.sysName + '.simulator')
+
+from .derivedDynamicFunction         import DerivedDynamicFunction
+from .differentiableDynamicFunction  import DifferentiableDynamicFunction
+
+__all__ = ['DependencyGraph']
+
+# dependencyGraph.py
+
+# Left to themselves, a Hamiltonian's partial derivatives are worked out
+# lazily:  the first time a variable's time derivative is evaluated, each
+# term containing the variable is asked for its partial with respect to it,
+# and each term has to scan its own variables (in chainRuleSearch()) for an
+# intermediate, such as a VelocityVariable, that the variable reaches it
+# through.  That happens in the middle of the run, and every search scans
+# all of the term's variables.
+#
+# A DependencyGraph works all of that out up front, in one linear pass over
+# a Hamiltonian's terms, when the network is finalized.  For each term, it
+# records which of the term's variables are intermediates for which others
+# (which chainRuleSearch() then just looks up), and for each underlying
+# dynamic variable, the list of terms containing it, the route by which
+# each term depends on it, and the resulting partial derivatives, all
+# constructed there and then.  The Hamiltonian's partial derivatives are
+# then summed over these lists directly.
+#
+# The graph describes the Hamiltonian as it was when the graph was built;
+# the Hamiltonian discards it when a new term is registered.
+
+class DependencyGraph:
+
+    # Public data members:
+    #
+    #   .hamiltonian - The Hamiltonian that this graph describes.
+    #
+    #   .routes:dict - For each dynamic variable, (term, intermediate)
+    #       pairs, one for each term that contains the variable, in the
+    #       order that the Hamiltonian lists them.  The intermediate is the
+    #       variable of the term that it depends on the given variable
+    #       through, or None if it depends on it directly.
+    #
+    #   .partials:dict - For each dynamic variable, the partial
+    #       derivatives with respect to it of the terms in its routes (in
+    #       the same order).
+
+    def __init__(inst, hamiltonian):
+
+        inst.hamiltonian = hamiltonian
+        inst.routes = dict()
+        inst.partials = dict()
+
+            # First, find each term's intermediates.
+
+        for term in hamiltonian._terms:
+            term._chains = _chains(term)
+
+            # Then the routes from each dynamic variable to the terms that
+            # contain it, and the partials along them.  (The intermediates
+            # themselves are registered with the Hamiltonian too, but time
+            # derivatives are never taken with respect to them.)
+
+        nPartials = 0
+        for var, terms in list(hamiltonian._varTerms.items()):
+            if isinstance(var, DerivedDynamicFunction):
+                continue
+            routes = [(term, term._chains.get(var)) for term in terms]
+            inst.routes[var] = routes
+            inst.partials[var] = [term.dynPartialDerivWRT(var) for term, via in routes]
+            nPartials += len(routes)
+
+        if doInfo:
+            logger.info("DependencyGraph.__init__(): Resolved %d partial derivatives "
+                        "of %d terms with respect to %d variables." %
+                        (nPartials, len(hamiltonian._terms), len(inst.routes)))
+
+#__/ End class DependencyGraph.
+
+
+# Maps each variable that the given term depends on through one of its own
+# variables (an intermediate) to the first such intermediate, in the order
+# of the term's variable list, which is the one chainRuleSearch() would find.
+
+def _chains(term:DifferentiableDynamicFunction) -> dict:
+    chains = dict()
+    for var in term._varIndex:
+        if isinstance(var, DifferentiableDynamicFunction):
+            for underlying in var._varIndex:
+                chains.setdefault(underlying, var)
+    return chains
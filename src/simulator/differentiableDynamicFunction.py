@@ -9,6 +9,7 @@ logger = getLogger(logmaster.sysName + '.simulator')
 from functions.differentiableFunction import BaseDifferentiableFunction
 from .dynamicVariable        import DynamicVariable
 from .derivedDynamicFunction import DerivedDynamicFunction
+from .evaluationPlan         import invalidatePlans
 
 # A DifferentiableDynamicFunction is a DerivedDynamicFunction
 # (derived from a set of DynamicVariables) that also sports the
@@ -63,6 +64,11 @@ class DifferentiableDynamicFunction(DerivedDynamicFunction):
 
         inst.initializeVarIndex()
 
+            # Our intermediates (see chainRuleSearch()) aren't known until
+            # a DependencyGraph finds them.
+
+        inst._chains = None
+
             # Add all the given variables to our list of variables we can
             # be differentiated by.  NOTE: If one of those "variables" is iself
             # actually a DifferentiableDynamicFunction of some other varibles,
@@ -145,6 +151,20 @@ class DifferentiableDynamicFunction(DerivedDynamicFunction):
 
             inst._varIndex[var] = index
 
+                # If our intermediates are known, and the new variable is
+                # one, then it's an intermediate for whatever it depends on
+                # that no earlier one is.
+
+            if getattr(inst, '_chains', None) is not None:
+                if isinstance(var, DifferentiableDynamicFunction):
+                    for underlying in var._varIndex:
+                        inst._chains.setdefault(underlying, var)
+
+                # Our partials share our variable list, so any evaluation
+                # plans that use them need to be rebuilt.
+
+            invalidatePlans()
+
             if doDebug:
                 logger.debug(("DifferentiableDynamicFunction.addVariable():  " +
                               "Added variable %s to %s's variable list in the " +
@@ -243,39 +263,43 @@ class DifferentiableDynamicFunction(DerivedDynamicFunction):
     
     def chainRuleSearch(self, v:DynamicVariable) -> DerivedDynamicFunction:
 
-        # Search all possible intermediate variables.
+        # If a DependencyGraph has found our intermediates, just look up
+        # v's.  Otherwise, search all possible intermediate variables.
 
-        for var in self._varIndex:
+        if self._chains is not None:
+            intermediates = [self._chains[v]] if v in self._chains else []
+        else:
+            intermediates = (var for var in self._varIndex
+                             if isinstance(var, DifferentiableDynamicFunction)
+                             and v in var._varIndex)
 
-            if isinstance(var, DifferentiableDynamicFunction):
-                
-                if v in var._varIndex:
+        for var in intermediates:
 
-                    # First, find the partial of self with respect to var.
+            # First, find the partial of self with respect to var.
 
-                    leftPartial = self.dynPartialDerivWRT(var)
+            leftPartial = self.dynPartialDerivWRT(var)
 
-                    if doDebug:
-                        logger.debug("The partial of %s with respect to %s is %s..." %
-                                    (str(self), str(var), str(leftPartial)))
+            if doDebug:
+                logger.debug("The partial of %s with respect to %s is %s..." %
+                            (str(self), str(var), str(leftPartial)))
 
-                    # Next, find the partial of var with respect to v.
+            # Next, find the partial of var with respect to v.
 
-                    rightPartial = var.dynPartialDerivWRT(v)
+            rightPartial = var.dynPartialDerivWRT(v)
 
-                    if doDebug:
-                        logger.debug("The partial of %s with respect to %s is %s..." %
-                                    (str(var), str(v), str(rightPartial)))
+            if doDebug:
+                logger.debug("The partial of %s with respect to %s is %s..." %
+                            (str(var), str(v), str(rightPartial)))
 
-                    # Now multiply them.
+            # Now multiply them.
 
-                    overallPartial = leftPartial * rightPartial
+            overallPartial = leftPartial * rightPartial
 
-                    # Remember that, yes, we are a function of v.
+            # Remember that, yes, we are a function of v.
 
-                    self.addVariable(v)
+            self.addVariable(v)
 
-                    return overallPartial
+            return overallPartial
 
         return None
 
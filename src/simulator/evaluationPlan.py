@@ -0,0 +1,438 @@
+from inspect    import getfullargspec
+from typing     import Callable
+
+from fixed import Fixed
+
+import logmaster; from logmaster import *
+
+logger = getLogger(logmaster.sysName + '.simulator')
+
+from functions.polynomialFunction   import PolynomialFunction
+from .dynamicFunction               import (BaseDynamicFunction,
+                                            NullDynamicFunction,
+                                            NegatorDynamicFunction,
+                                            AdderDynamicFunction,
+                                            MultiplierDynamicFunction,
+                                            SummerDynamicFunction)
+from .dynamicVariable               import DynamicVariable
+from .derivedDynamicFunction        import DerivedDynamicFunction
+
+__all__ = ['EvaluationPlan', 'invalidatePlans']
+
+# evaluationPlan.py
+
+# A variable's time derivative is built up as a tree of dynamic functions:
+# sums (over the Hamiltonian's terms) of the terms' partial derivatives,
+# which may be products from the chain rule (such as dK/dv * dv/dp, where
+# dv/dp is the constant 1/mass), maybe negated.  Walking that tree on every
+# step is most of the time the object engine spends.
+#
+# An EvaluationPlan wraps such a tree, and, the first time it's used, boils
+# it down into two flat lists:  the variables (and any other functions we
+# can't see into) that the tree would evolve, in the same order the tree
+# would evolve them (which matters, since evolving one variable can drag
+# others back and forth); and a straight-line evaluator, one statement per
+# distinct subexpression.  On the way, constants are folded (including
+# constant partials, like dv/dp), double negations and multiplications by 1
+# are dropped, sums of sums are flattened, and equal subexpressions are
+# computed just once.
+#
+# Arithmetic on Fixed values is done directly on their quanta.  Fixed
+# addition is exact, so sums of Fixed values are regrouped freely; products
+# are rounded just where Fixed would round them; and exact polynomials are
+# evaluated with their exact evaluators.  So the results are bit-for-bit
+# those of the tree.  Anything that's not known to be Fixed is done with
+# objects, in the tree's own order.  If, when evaluated, any variable's
+# value turns out not to be a Fixed (e.g., an initial value given as an
+# int), the tree itself is evaluated instead.
+#
+# Plans depend on the structure of the tree, which changes as terms are
+# added to a Hamiltonian, or variables are added to a function; those call
+# invalidatePlans(), and each plan is rebuilt the next time it's used.
+
+class EvaluationPlan:   pass
+
+
+_epoch = 0      # Bumped whenever a plan might have gone stale.
+
+_D = Fixed(1).quanta
+
+# Marks every existing plan as stale, to be rebuilt when it's next used.
+
+def invalidatePlans():
+    global _epoch
+    _epoch += 1
+
+
+class EvaluationPlan(BaseDynamicFunction):
+
+    # Class public data members:
+    #
+    #   EvaluationPlan.optimize:bool - If this is set to False, plans just
+    #       pass calls on to their trees.
+
+    optimize = True
+
+    # Instance private data members:
+    #
+    #   ._tree:BaseDynamicFunction - The tree of dynamic functions.
+    #   ._epoch:int - The value of _epoch when we were last built.
+    #   ._evolvers:list - Bound evolveTo() methods, to call in order.
+    #   ._evaluate:Callable - The straight-line evaluator.
+
+    def __init__(inst, tree:BaseDynamicFunction):
+        inst._tree = tree
+        inst._epoch = None
+
+    @property
+    def tree(inst): return inst._tree
+
+    def __str__(inst):
+        return str(inst._tree)
+
+    def __call__(inst, timestep:int=None, *args, **kwargs):
+
+        if args or kwargs or not inst.optimize:
+            return inst._tree(timestep, *args, **kwargs)
+
+        if inst._epoch != _epoch:
+            inst._build()
+
+        if timestep is not None:
+            for evolve in inst._evolvers:
+                evolve(timestep)
+
+        return inst._evaluate()
+
+    def evolveTo(inst, timestep:int):
+
+        if not inst.optimize:
+            return inst._tree.evolveTo(timestep)
+
+        if inst._epoch != _epoch:
+            inst._build()
+
+        for evolve in inst._evolvers:
+            evolve(timestep)
+
+    def evaluateWith(inst, *args, **kwargs):
+
+        if args or kwargs or not inst.optimize:
+            return inst._tree.evaluateWith(*args, **kwargs)
+
+        if inst._epoch != _epoch:
+            inst._build()
+
+        return inst._evaluate()
+
+    # Boils our tree down (see the top of this file).
+
+    def _build(inst):
+
+        epoch = _epoch      # What we're up to date with, if all goes well.
+
+        builder = _Builder()
+        root = builder.node(inst._tree)
+
+        evolvers = []
+        last = None
+        for function in builder.evolve:
+            if function is not last:     # Twice in a row is a no-op.
+                evolvers.append(function.evolveTo)
+            last = function
+
+        inst._evolvers = evolvers
+        inst._evaluate = builder.generate(root, inst._tree.evaluateWith)
+        inst._epoch = epoch
+
+        if doDebug:
+            logger.debug("EvaluationPlan._build(): Plan for %s evolves %d functions "
+                         "and evaluates %d subexpressions." %
+                         (inst, len(evolvers), builder.size))
+
+#__/ End class EvaluationPlan.
+
+
+# Builds the flat form of a tree.  Each distinct subexpression becomes a node,
+# numbered in the order created (so a node's operands always come before
+# it), whose operation is one of:
+#
+#       ('const', value)
+#       ('var', variable)                   - A plain DynamicVariable's value.
+#       ('opaque', function)                - Anything else's evaluateWith().
+#       ('call', function, args, exact)     - A function of other nodes.
+#       ('neg', a)
+#       ('mul', a, b)
+#       ('sum', terms, const)   - Sum of (sign, node) pairs, plus a constant
+#                                   (in quanta) if Fixed; else in order.
+#
+# A node is marked Fixed if its value is sure to be a Fixed (given that the
+# variables' values are).
+
+class _Builder:
+
+    def __init__(inst):
+        inst.evolve = []        # Functions to evolve, in order.
+        inst.ops = []           # Node number -> operation.
+        inst.fixed = []         # Node number -> whether it's Fixed.
+        inst.index = dict()     # Operation's key -> node number.
+
+    @property
+    def size(inst): return len(inst.ops)
+
+    def _add(inst, key, op:tuple, fixed:bool) -> int:
+        node = inst.index.get(key)
+        if node is None:
+            node = inst.index[key] = len(inst.ops)
+            inst.ops.append(op)
+            inst.fixed.append(fixed)
+        return node
+
+    # Returns the node for the given dynamic function, adding whatever it
+    # evolves to the evolve list, in the order its own evolveTo() would.
+
+    def node(inst, function:BaseDynamicFunction) -> int:
+
+        cls = type(function)
+
+        if cls is EvaluationPlan:
+            return inst.node(function._tree)
+
+        if (isinstance(function, DynamicVariable)
+                and cls.evolveTo is DynamicVariable.evolveTo
+                and cls.evaluateWith is DynamicVariable.evaluateWith
+                and cls.value is DynamicVariable.value
+                and hasattr(function, '_value')):
+            inst.evolve.append(function)
+            return inst._add(('var', id(function)), ('var', function), True)
+
+        if cls is NullDynamicFunction:
+            return inst.const(Fixed(0))
+
+        if cls is NegatorDynamicFunction:
+            return inst.neg(inst.node(function._internalFunction))
+
+        if cls is AdderDynamicFunction:
+            augend = inst.node(function._augend)
+            return inst.sum([augend, inst.node(function._addend)])
+
+        if cls is MultiplierDynamicFunction:
+            multiplier = inst.node(function._multiplier)
+            return inst.mul(multiplier, inst.node(function._multiplicand))
+
+        if cls is SummerDynamicFunction:
+            terms = [inst.node(term) for term in function._terms]
+            if not terms:
+                return inst.const(Fixed(0))
+            return inst.sum(terms)
+
+        if (isinstance(function, DerivedDynamicFunction)
+                and cls.evolveTo is DerivedDynamicFunction.evolveTo
+                and cls.evaluateWith is DerivedDynamicFunction.evaluateWith):
+            nArgs = _arity(function._function)
+            if nArgs is not None and nArgs <= len(function._varList):
+                args = [inst.node(var) for var in function._varList]
+                return inst.call(function._function, args[:nArgs])
+
+        inst.evolve.append(function)
+        return inst._add(('opaque', id(function)), ('opaque', function), False)
+
+    def const(inst, value) -> int:
+        if type(value) is Fixed:
+            return inst._add(('fixed', value.quanta), ('const', value), True)
+        return inst._add(('const', id(value)), ('const', value), False)
+
+    def neg(inst, a:int) -> int:
+        op = inst.ops[a]
+        if op[0] == 'const':
+            return inst.const(-op[1])
+        if inst.fixed[a]:
+            if op[0] == 'neg':
+                return op[1]
+            if op[0] == 'sum':
+                return inst._fixedSum([(-sign, term) for sign, term in op[1]], -op[2])
+        return inst._add(('neg', a), ('neg', a), inst.fixed[a])
+
+    def mul(inst, a:int, b:int) -> int:
+        opA, opB = inst.ops[a], inst.ops[b]
+        if opA[0] == 'const' and opB[0] == 'const':
+            return inst.const(opA[1] * opB[1])
+        if inst.fixed[a] and inst.fixed[b]:
+            if opB[0] == 'const':
+                a, b, opA, opB = b, a, opB, opA     # Constant first.
+            if opA[0] == 'const':
+                if opA[1].quanta == _D:
+                    return b
+                if opA[1].quanta == -_D:
+                    return inst.neg(b)
+                if opA[1].quanta == 0:
+                    return a
+            a, b = min(a, b), max(a, b)
+            return inst._add(('mul', a, b), ('mul', a, b), True)
+        return inst._add(('mul', a, b), ('mul', a, b), False)
+
+    def sum(inst, terms:list) -> int:
+        if all(inst.fixed[term] for term in terms):
+            return inst._fixedSum([(1, term) for term in terms], 0)
+        terms = tuple((1, term) for term in terms)
+        return inst._add(('sum', terms, None), ('sum', terms, None), False)
+
+        # A sum of Fixed values:  flatten, fold the constants, and sort.
+
+    def _fixedSum(inst, terms:list, const:int) -> int:
+        flat = []
+        while terms:
+            sign, term = terms.pop()
+            op = inst.ops[term]
+            if op[0] == 'sum':
+                terms += [(sign*s, t) for s, t in op[1]]
+                const += sign*op[2]
+            elif op[0] == 'neg':
+                terms.append((-sign, op[1]))
+            elif op[0] == 'const':
+                const += sign*op[1].quanta
+            else:
+                flat.append((sign, term))
+        if not flat:
+            return inst.const(Fixed.fromQuanta(const))
+        if len(flat) == 1 and const == 0:
+            sign, term = flat[0]
+            return term if sign > 0 else inst._add(('neg', term), ('neg', term), True)
+        flat = tuple(sorted(flat, key=lambda pair: (pair[1], pair[0])))
+        return inst._add(('sum', flat, const), ('sum', flat, const), True)
+
+    def call(inst, function:Callable, args:list) -> int:
+        exact = (isinstance(function, PolynomialFunction) and function.exact
+                 and any(inst.fixed[arg] for arg in args))
+        if exact:
+            if function.degree <= 0:
+                return inst.const(function.evalFixed(*[Fixed(0)]*len(args)))
+            if all(inst.ops[arg][0] == 'const' for arg in args):
+                return inst.const(function.evalFixed(*[inst.ops[arg][1] for arg in args]))
+        args = tuple(args)
+        return inst._add(('call', id(function), args), ('call', function, args, exact), exact)
+
+    # Generates the evaluator for the given root node.  It calls <fallback>
+    # instead if any variable's value isn't a Fixed.
+
+    def generate(inst, root:int, fallback:Callable) -> Callable:
+
+            # Find the nodes we need.
+
+        needed = {root}
+        for node in range(root, -1, -1):
+            if node in needed:
+                needed.update(_operands(inst.ops[node]))
+
+        namespace = {'Fixed': Fixed, 'fromQuanta': Fixed.fromQuanta,
+                     'fallback': fallback}
+        lines = []
+        quanta = dict()     # Node -> expression for its value in quanta.
+        objects = dict()    # Node -> expression for its value.
+
+        def obj(node:int) -> str:
+            if node not in objects:
+                lines.append('o%d = fromQuanta(%s)' % (node, quanta[node]))
+                objects[node] = 'o%d' % node
+            return objects[node]
+
+        def qua(node:int) -> str:
+            if node not in quanta:
+                lines.append('q%d = %s._numerator' % (node, objects[node]))
+                quanta[node] = 'q%d' % node
+            return quanta[node]
+
+        guard = []
+        for node in sorted(needed):
+            op = inst.ops[node]
+            kind = op[0]
+            if kind == 'const':
+                namespace['c%d' % node] = op[1]
+                objects[node] = 'c%d' % node
+                if inst.fixed[node]:
+                    quanta[node] = '(%d)' % op[1].quanta
+            elif kind == 'var':
+                namespace['v%d' % node] = op[1]
+                lines.append('x%d = v%d._value' % (node, node))
+                guard.append('x%d.__class__ is not Fixed' % node)
+                objects[node] = 'x%d' % node
+            elif kind == 'opaque':
+                namespace['e%d' % node] = op[1].evaluateWith
+                lines.append('o%d = e%d()' % (node, node))
+                objects[node] = 'o%d' % node
+            elif kind == 'call':
+                function, args, exact = op[1:]
+                namespace['f%d' % node] = function.evalFixed if exact else function
+                lines.append('o%d = f%d(%s)' % (node, node, ', '.join(map(obj, args))))
+                objects[node] = 'o%d' % node
+            elif kind == 'neg':
+                if inst.fixed[node]:
+                    lines.append('q%d = -%s' % (node, qua(op[1])))
+                    quanta[node] = 'q%d' % node
+                else:
+                    lines.append('o%d = -%s' % (node, obj(op[1])))
+                    objects[node] = 'o%d' % node
+            elif kind == 'mul':
+                if inst.fixed[node]:
+                    lines.append('u, r = divmod(%s*%s, %d)' % (qua(op[1]), qua(op[2]), _D))
+                    lines.append('q%d = u + (r + r > %d or r + r == %d and u & 1)' %
+                                 (node, _D, _D))
+                    quanta[node] = 'q%d' % node
+                else:
+                    lines.append('o%d = %s*%s' % (node, obj(op[1]), obj(op[2])))
+                    objects[node] = 'o%d' % node
+            else:
+                terms, const = op[1:]
+                if inst.fixed[node]:
+                    expr = ''.join(('+' if sign > 0 else '-') + qua(term)
+                                   for sign, term in terms)
+                    if const:
+                        expr += '%+d' % const
+                    lines.append('q%d = %s' % (node, expr.lstrip('+')))
+                    quanta[node] = 'q%d' % node
+                else:
+                    lines.append('o%d = %s' % (node, ' + '.join(obj(term) for sign, term in terms)))
+                    objects[node] = 'o%d' % node
+
+        result = obj(root)
+
+            # The guard goes right after the variables are read.
+
+        body = [line for line in lines if line.startswith('x')]
+        if guard:
+            body.append('if %s:' % ' or '.join(guard))
+            body.append('    return fallback()')
+        body += [line for line in lines if not line.startswith('x')]
+        body.append('return %s' % result)
+
+        source = 'def evaluate():\n' + ''.join('    %s\n' % line for line in body)
+        exec(compile(source, '<evaluation plan>', 'exec'), namespace)
+        return namespace['evaluate']
+
+#__/ End class _Builder.
+
+
+# The number of leading arguments that a DerivedDynamicFunction passes to its
+# function (see PartiallyEvaluatableFunction), or None if we can't tell.
+
+def _arity(function:Callable):
+    if function is None:
+        return None
+    try:
+        return len(getfullargspec(function).args)
+    except TypeError:
+        return None
+
+# The nodes that the given operation uses.
+
+def _operands(op:tuple) -> list:
+    kind = op[0]
+    if kind == 'neg':
+        return [op[1]]
+    if kind == 'mul':
+        return [op[1], op[2]]
+    if kind == 'sum':
+        return [term for sign, term in op[1]]
+    if kind == 'call':
+        return list(op[2])
+    return []
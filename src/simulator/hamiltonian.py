@@ -43,6 +43,8 @@ from .dynamicFunction                import BaseDynamicFunction,SummerDynamicFun
 from .dynamicVariable                import DynamicVariable
 from .derivedDynamicFunction         import DerivedDynamicFunction
 from .differentiableDynamicFunction  import DifferentiableDynamicFunction
+from .evaluationPlan                 import invalidatePlans
+from .dependencyGraph                import DependencyGraph
 
 # A HamiltonianTerm is a primitive dynamic function (not broken down as
 # a sum of other functions) giving a Hamiltonian energy as a function
@@ -79,6 +81,10 @@ class Hamiltonian(DifferentiableDynamicFunction):
     #   inst._summer:SummerDynamicFunction - A dynamic function that just adds our
     #       terms together; this is used to evaluate the Hamiltonian.
     #
+    #   inst._graph:DependencyGraph - Our terms' partial derivatives, worked out
+    #       up front by .finalize(), or None if they haven't been (or we have
+    #       changed since).
+    #
     #   inst._partials:Dict[DerivedDynamicFunction] - These dynamic functions are the
     #       partial derivatives of this Hamiltonian with respect to its variables.
     #       This is a cache which is incrementally computed.  This differs from
@@ -132,6 +138,7 @@ class Hamiltonian(DifferentiableDynamicFunction):
         inst._terms = set()         # Initially empty set of terms.
         inst._varTerms = dict()     # Initially empty map from variables to sets of terms.
         inst._partials = dict()     # Initially empty map from variables to their partials.
+        inst._graph = None          # No dependency graph yet.
 
         for term in terms:
             inst.addTerm(term)
@@ -172,6 +179,15 @@ class Hamiltonian(DifferentiableDynamicFunction):
             inst._hamiltonian = ham
             inst._variable = var
         def __iter__(inst):
+
+                # If our Hamiltonian has been finalized, its dependency graph
+                # already has the partials, in order.
+
+            graph = inst._hamiltonian._graph
+            if graph is not None and inst._variable in graph.partials:
+                inst._termList = graph.partials[inst._variable]
+                return iter(inst._termList)
+
             inst._termList = inst._hamiltonian.termsContaining(inst._variable)
             
             if doWarn:
@@ -298,6 +314,12 @@ class Hamiltonian(DifferentiableDynamicFunction):
             if var in inst._partials:
                 del inst._partials[var]      # Clear any cached partial derivative info.
 
+                # Any evaluation plans that sum over this variable's terms
+                # are now out of date, too, as is our dependency graph.
+
+            invalidatePlans()
+            inst._graph = None
+
         else:
             if doDebug:
                 logger.debug("Hamiltonian._register():  The new term %s doesn't seem new. Ignoring." % str(term))
@@ -379,6 +401,21 @@ class Hamiltonian(DifferentiableDynamicFunction):
         return dynPartialsSummer
     
 
+    #   .finalize() - Works out all of our terms' partial derivatives up
+    #       front, in a DependencyGraph (see dependencyGraph.py), unless
+    #       that's been done since we last changed.  Returns the graph.
+
+    def finalize(self) -> DependencyGraph:
+
+        if self._graph is None:
+            self._graph = DependencyGraph(self)
+
+                # Our partials' evaluation plans will now need rebuilding.
+
+            invalidatePlans()
+
+        return self._graph
+
     def termsContaining(self, v:DynamicVariable):
 
         if v in self._varTerms:
@@ -12,6 +12,7 @@ from .dynamicFunction                import BaseDynamicFunction
 from .dynamicVariable                import DynamicVariable
 from .hamiltonian                    import Hamiltonian
 from .differentiableDynamicFunction  import DifferentiableDynamicFunction
+from .evaluationPlan                 import EvaluationPlan
 
 class SimulationContext: pass
 
@@ -177,8 +178,9 @@ class PositionVariable(HamiltonianVariable):
                 # This is just the partial derivative of the Hamiltonian with
                 # respect to our conjugate momentum variable, ∂q/∂t = ∂H/∂p.
             dH_over_dp = self.hamiltonian.dynPartialDerivWRT(self.conjugateMomentum)
-                # Store that thang for later reference.
-            self._timeDeriv = dH_over_dp
+                # Store that thang for later reference, wrapped in a plan
+                # that evaluates it efficiently (see evaluationPlan.py).
+            self._timeDeriv = EvaluationPlan(dH_over_dp)
 
     
 #  A (generalized) MomentumVariable is a variable whose time
@@ -256,9 +258,10 @@ class MomentumVariable(HamiltonianVariable):
             dH_over_dq = self.hamiltonian.dynPartialDerivWRT(self.conjugatePosition)
             momTimeDeriv = -dH_over_dq
             
-                # Store that thang for later reference.
+                # Store that thang for later reference, wrapped in a plan
+                # that evaluates it efficiently (see evaluationPlan.py).
 
-            self._timeDeriv = momTimeDeriv            
+            self._timeDeriv = EvaluationPlan(momTimeDeriv)
 
     # When a momentum variable's name changes, so should its derived velocity variable.
     # But really the following should be done in some more general way... Like,
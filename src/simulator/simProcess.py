@@ -0,0 +1,430 @@
+#|==============================================================================
+#|                  TOP OF FILE:    simulator/simProcess.py
+#|------------------------------------------------------------------------------
+#|   The below module documentation string will be displayed by pydoc3.
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+"""
+
+    FILE NAME:          simProcess.py              [Python 3 module source file]
+
+    FILE PATH:          $GIT_ROOT/dynamic/src/simulator/simProcess.py
+
+    MODULE NAME:        simulator.simProcess
+
+    IN COMPONENT:       Dynamic.simulator   (core simulation framework)
+
+
+    MODULE DESCRIPTION:
+    -------------------
+
+        The simProcess module lets a simulation run in a child process
+        of its own, rather than in a thread (simbot) of the process
+        that's running the GUI.  That way the simulator and the GUI
+        don't have to take turns holding the Python interpreter lock,
+        and each of them can keep a whole CPU core busy.
+
+        The child process builds its own simulation context and
+        network (from a network class that's passed to it), and then
+        waits for commands, which it receives through a pipe:  run
+        (for a number of steps, or indefinitely), pause, resume, step,
+        change the time delta, and abort.  One step here means two
+        timesteps of the context, so that both the positions and the
+        momenta are updated, the same as in SimulationContext.test().
+
+        As it runs, the child writes the state of the network into a
+        StateRing, which is a ring buffer of frames held in a block of
+        shared memory.  Each frame holds the timestep, the simulated
+        time, and the position and momentum of each node, as doubles.
+        Frames are guarded seqlock-style:  the writer marks a frame as
+        being written before filling it in, and as complete (with its
+        frame number) afterwards, so a reader can tell if the frame it
+        read was overwritten while it was reading it, and try again.
+        The writer never waits for readers, and readers never lock.
+
+        On the GUI side, the StateRing offers the same .request() and
+        .newerThan() methods as a SnapshotPublisher (see stateSnapshot),
+        returning ordinary StateSnapshots, so it can be handed to the
+        network visualizer in place of the context's publisher.  Readers
+        that would rather not copy can use .view() instead, which gives
+        memoryviews straight into the shared frame.
+
+
+    BASIC MODULE USAGE:
+    -------------------
+
+        from simulator.simProcess import SimProcess
+
+        proc = SimProcess(FullAdderNet)     # Starts the child process.
+        proc.run(1000)                      # Do 1000 steps, then stop.
+        ...
+        seqno, snap = proc.ring.latest      # Latest published state.
+        proc.pause();  proc.resume()
+        proc.close()                        # Stop the child and clean up.
+
+
+    PUBLIC CLASSES:
+    ---------------
+
+            StateRing                                      [module public class]
+
+                A seqlock-guarded ring buffer of state frames kept in
+                shared memory.
+
+            SimProcess                                     [module public class]
+
+                Runs a simulation in a child process, and controls it.
+
+
+    NOTES:
+    ------
+
+        The child is started with the 'spawn' method (not 'fork'),
+        since the parent typically has a bunch of threads running
+        (guibot, simbot, logging) that a forked child would inherit
+        in an unknown state.  So the network class must be importable
+        by the child, i.e., defined at the top level of some module.
+
+        The frame guards rely on the writer's stores becoming visible
+        to other processes in the order they were made, which is true
+        on x86 machines; on more weakly-ordered machines a reader may
+        very occasionally see a slightly inconsistent frame.
+                                                                             """
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#| End of module documentation string.
+#|------------------------------------------------------------------------------
+
+
+    #|==========================================================================
+    #|   1. Module imports.                                [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import atexit, multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+from logmaster import *     # Provides a range of logging capabilities.
+from . import _logger       # Use simulator component logger in this module.
+
+from .stateSnapshot import StateSnapshot    # What readers of the ring get.
+
+
+    #|==========================================================================
+    #|  2.  Global constants, variables, and objects.      [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+global __all__              # List of public symbols exported by this module.
+__all__ = [
+    'StateRing',            # Shared-memory ring buffer of state frames.
+    'SimProcess',           # Simulation running in a child process.
+    ]
+
+    # Sizes of things in the shared memory block, in doubles.
+
+_HEADER = 1                 # Just the count of frames written so far.
+_FRAME_HEADER = 3           # Guard word, timestep, time.
+
+
+    #|==========================================================================
+    #|  3.  Class definitions.                             [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+            #|------------------------------------------------------------------
+            #|
+            #|      StateRing                                     [public class]
+            #|
+            #|          A ring buffer of <slots> frames, each holding the
+            #|          state of a network of <len(names)> nodes, laid
+            #|          out as an array of doubles in a SharedMemory
+            #|          block:
+            #|
+            #|              [count]  [guard, timestep, time, q..., p...] ...
+            #|
+            #|          Frame number k (counting from 0) lives in slot
+            #|          k % slots.  Its guard word is 2k+1 while it's
+            #|          being written and 2k+2 once it's complete, and
+            #|          count is only bumped to k+1 after that.  There
+            #|          must be only one writer; there may be any number
+            #|          of readers, in any processes.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class StateRing:
+
+    #-- Public data members:
+    #
+    #       .shm [SharedMemory] - The shared memory block.
+    #
+    #       .names [tuple] - Names of the nodes, in frame order.
+    #
+    #       .slots [int] - Number of frames the ring holds.
+
+        #-- StateRing.size(nNodes, slots) - How many bytes of shared
+        #       memory a ring of the given dimensions needs.
+
+    @staticmethod
+    def size(nNodes:int, slots:int):
+        return 8*(_HEADER + slots*(_FRAME_HEADER + 2*nNodes))
+
+    def __init__(inst, shm:SharedMemory, names, slots:int):
+        inst.shm   = shm
+        inst.names = tuple(names)
+        inst.slots = slots
+        inst._n    = len(inst.names)
+        inst._frameSize = _FRAME_HEADER + 2*inst._n
+        inst._mem  = shm.buf.cast('d')
+
+        #-- inst.release() - Lets go of the shared memory, so that the
+        #       block can be closed.  (The ring is unusable after this.)
+
+    def release(inst):
+        mem = inst._mem
+        if mem is not None:
+            inst._mem = None
+            mem.release()
+
+        #-- inst.count - Number of frames written so far.
+
+    @property
+    def count(inst):
+        return int(inst._mem[0])
+
+        #-- inst.write(network, timestep, time) - Writes the current
+        #       state of <network> as the next frame.  Called only by
+        #       the (one) writer, between simulation steps.
+
+    def write(inst, network, timestep:int, time:float):
+        mem = inst._mem
+        k = int(mem[0])
+        base = _HEADER + (k % inst.slots)*inst._frameSize
+        mem[base] = 2*k + 1                 # Mark the frame as being written.
+        mem[base + 1] = timestep
+        mem[base + 2] = time
+        q = base + _FRAME_HEADER;  p = q + inst._n
+        nodes = network.nodes
+        for name in inst.names:
+            coord = nodes[name].coord
+            mem[q] = float(coord.position.value);  q += 1
+            mem[p] = float(coord.momentum.value);  p += 1
+        mem[base] = 2*k + 2                 # Mark it as complete...
+        mem[0] = k + 1                      # ...and only then publish it.
+
+        #-- inst.view() - Zero-copy access to the latest frame.  Returns
+        #       (k, timestep, time, positions, momenta), where the last
+        #       two are memoryviews into the shared frame, or None if
+        #       nothing's been written yet.  The values in the views
+        #       may be overwritten at any time, so after using them,
+        #       check .stillValid(k) to make sure they weren't.
+
+    def view(inst):
+        mem = inst._mem
+        while True:
+            k = int(mem[0]) - 1
+            if k < 0: return None
+            base = _HEADER + (k % inst.slots)*inst._frameSize
+            if mem[base] != 2*k + 2: continue       # Already being rewritten.
+            q = base + _FRAME_HEADER;  p = q + inst._n
+            return (k, int(mem[base + 1]), mem[base + 2],
+                    mem[q:p], mem[p:p + inst._n])
+
+        #-- inst.stillValid(k) - True if frame number <k> hasn't been
+        #       overwritten (yet).
+
+    def stillValid(inst, k:int):
+        return inst._mem[_HEADER + (k % inst.slots)*inst._frameSize] == 2*k + 2
+
+        #-- inst.snapshot() - Returns a consistent copy of the latest
+        #       frame, as a (seqno, StateSnapshot) pair, where seqno is
+        #       the number of frames written as of that one; or (0, None)
+        #       if nothing's been written yet.
+
+    def snapshot(inst):
+        while True:
+            frame = inst.view()
+            if frame is None: return (0, None)
+            k, timestep, time, qs, ps = frame
+            snap = StateSnapshot(timestep, time, inst.names, tuple(qs), tuple(ps))
+            if inst.stillValid(k):
+                return (k + 1, snap)
+
+        #-- The rest of these make a StateRing usable in place of a
+        #   SnapshotPublisher, on the reading side.  The writer puts out
+        #   frames at its own pace, so there's nothing to request.
+
+    @property
+    def latest(inst):
+        return inst.snapshot()
+
+    def request(inst):
+        pass
+
+    def newerThan(inst, seqno:int):
+        if inst.count > seqno:
+            return inst.snapshot()
+        return None
+
+#__/ End class StateRing.
+
+
+            #|------------------------------------------------------------------
+            #|
+            #|      SimProcess                                    [public class]
+            #|
+            #|          Starts a child process that simulates a network
+            #|          of class <networkClass> with the given time delta,
+            #|          writing its state into a StateRing of <slots>
+            #|          frames every <interval> steps, and sends it
+            #|          commands.  The methods for sending commands just
+            #|          send them; they don't wait for the child to act
+            #|          on them.  The child starts out idle; call .run()
+            #|          to set it going.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class SimProcess:
+
+    #-- Public data members:
+    #
+    #       .process [multiprocessing.Process] - The child process.
+    #
+    #       .ring [StateRing] - Where the child publishes its state.
+
+    def __init__(inst, networkClass, timedelta:float=0.01, slots:int=64,
+                 interval:int=1):
+
+        mp = multiprocessing.get_context('spawn')
+        inst._conn, childConn = mp.Pipe()
+        inst.process = mp.Process(target=_simMain, name="simProcess", daemon=True,
+                                  args=(childConn, networkClass, timedelta, interval))
+        inst.process.start()
+        childConn.close()
+
+            # The child tells us the names of its network's nodes; then
+            # we know how big the ring needs to be.  We own the shared
+            # memory block, so it's cleaned up even if the child dies.
+
+        tag, names = inst._conn.recv()
+        inst._shm = SharedMemory(create=True, size=StateRing.size(len(names), slots))
+        inst._shm.buf[:8] = bytes(8)        # Count = 0.0.
+        inst.ring = StateRing(inst._shm, names, slots)
+        inst._conn.send(('attach', inst._shm.name, slots))
+        atexit.register(inst.close)         # Don't leave the block lying around.
+
+        if doInfo:
+            _logger.info("SimProcess: Started simulation process %d for a "
+                         "%s with %d nodes." %
+                         (inst.process.pid, networkClass.__name__, len(names)))
+
+        #-- Commands.
+
+    def run(inst, nSteps:int=None):
+        """Runs for <nSteps> more steps (or indefinitely, if None)."""
+        inst._send('run', nSteps)
+
+    def pause(inst):
+        inst._send('pause')
+
+    def resume(inst):
+        inst._send('resume')
+
+    def step(inst, nSteps:int=1):
+        """Does <nSteps> steps right away, even if paused."""
+        inst._send('step', nSteps)
+
+    def setTimedelta(inst, timedelta:float):
+        inst._send('timedelta', timedelta)
+
+    def abort(inst):
+        inst._send('abort')
+
+    def _send(inst, *command):
+        try:
+            inst._conn.send(command)
+        except (BrokenPipeError, OSError):
+            if doWarn:
+                _logger.warn("SimProcess: Simulation process is gone; "
+                             "ignoring %s command." % command[0])
+
+        #-- inst.close() - Aborts the child (if it's still running), waits
+        #       for it to exit, and frees the shared memory.
+
+    def close(inst, timeout:float=5):
+        if inst._shm is None: return
+        inst.abort()
+        inst.process.join(timeout)
+        if inst.process.is_alive():
+            inst.process.terminate()
+        inst._conn.close()
+        inst.ring.release()
+        inst._shm.close()
+        inst._shm.unlink()
+        inst._shm = None
+        atexit.unregister(inst.close)
+
+#__/ End class SimProcess.
+
+
+    #|==========================================================================
+    #|  4.  Private functions.                             [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+        #-- _simMain() - Main routine of the child process.  Builds the
+        #       network, attaches to the ring, and then alternates between
+        #       handling commands and doing steps.  When there's nothing
+        #       to do, it just waits for the next command.
+
+def _simMain(conn, networkClass, timedelta:float, interval:int):
+
+    from fixed import Fixed
+    from .simulationContext import SimulationContext
+
+    sc = SimulationContext(timedelta=Fixed(timedelta))
+    net = networkClass(context=sc)
+
+    conn.send(('names', tuple(net.nodes)))
+    tag, shmName, slots = conn.recv()
+    shm = SharedMemory(name=shmName)
+    ring = StateRing(shm, net.nodes, slots)
+
+    def publish():
+        ring.write(net, sc.timestep, float(sc.time))    # (Not timestep*timedelta.)
+
+    def doSteps(n):
+        for i in range(n):
+            sc.stepForward(2)
+            if sc.timestep % (2*interval) == 0:
+                publish()
+
+    publish()                   # So readers can see the initial state.
+
+    togo = 0                    # Steps left to do; None means no limit.
+    paused = False
+
+    try:
+        while True:
+            busy = (togo is None or togo > 0) and not paused
+            if not busy or conn.poll():
+                command, *args = conn.recv()
+                if command == 'run':
+                    togo = args[0];  paused = False
+                elif command == 'pause':
+                    paused = True
+                elif command == 'resume':
+                    paused = False
+                elif command == 'step':
+                    doSteps(args[0])
+                elif command == 'timedelta':
+                    sc.timedelta = Fixed(args[0])
+                elif command == 'abort':
+                    break
+                continue
+            doSteps(1)
+            if togo is not None: togo -= 1
+    except EOFError:            # Parent went away.
+        pass
+    finally:
+        ring.release()
+        shm.close()
+        conn.close()
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#                   BOTTOM OF FILE:    simulator/simProcess.py
+#===============================================================================
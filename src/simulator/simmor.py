@@ -19,7 +19,11 @@ from    examples.exampleNetworks    import  FullAdderNet
     # the one that we will use here for our demo.
 
 from    gui.worklist                import  *
-from    gui.networkVisualizer       import  NetworkVisualizer
+    # Worklists and workers are plain threading machinery; they don't
+    # need tkinter.  The NetworkVisualizer, on the other hand, pulls in
+    # tkinter and the whole guiapp layer, so we only import it inside
+    # doDemo(), when a visualizer is actually wanted.  This keeps the
+    # simulator importable (and quick to start) on headless machines.
 
 __all__ = ['simbot', 'initSimbot', 'Simmor']
 
@@ -36,7 +40,17 @@ def initSimbot():
 
 class   Simmor:
 
-    def __init__(me):
+        # If <headless> is true, doDemo() won't open a visualizer window
+        # (and so the GUI packages never get loaded at all).  If
+        # <separateProcess> is true, the simulation is run in a child
+        # process (see simProcess), so that it and the GUI don't have
+        # to share one interpreter lock; the network that we create
+        # here is then only used for drawing the visualizer's diagram.
+
+    def __init__(me, headless:bool=False, separateProcess:bool=False):
+        me.headless = headless
+        me.separateProcess = separateProcess
+        me.proc = None
         initSimbot()
 
     def doDemo(me):
@@ -87,8 +101,18 @@ class   Simmor:
 
             # Create a new NetworkVisualizer window to display
             # an animated graphical visualization of the network.
+            # (Unless we're running headless.)
 
-        me.netVis = netVis = NetworkVisualizer(network=net)        
+        if me.separateProcess:
+            from .simProcess import SimProcess
+            me.proc = SimProcess(FullAdderNet, timedelta=float(sc.timedelta))
+
+        if me.headless:
+            me.netVis = None
+        else:
+            from gui.networkVisualizer import NetworkVisualizer
+            me.netVis = netVis = NetworkVisualizer(network=net,
+                snapshots=None if me.proc is None else me.proc.ring)
 
             #---------------------------------------------------------
             # Run the built-in .test() method of the example network.
@@ -100,6 +124,10 @@ class   Simmor:
             # simulation capabilities.  It's time-consuming, so we
             # farm it out to the simbot worker thread.
 
+        if me.proc is not None:         # The child does the work, without
+            me.proc.run(1000)           # the CSV diagnostics that test() prints.
+            return
+
         #simbot(lambda: sc.test(10))    # Default nSteps=1000
         #simbot(lambda: sc.test(100))   # Default nSteps=1000
         simbot(lambda: sc.test())       # Default nSteps=1000
@@ -84,7 +84,10 @@ from . import _logger       # Use simulator component logger in this module.
     #vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
 
 from fixed                  import Fixed            # Fixed-point arithmetic.
+from dataout                import dataChannel      # Buffered CSV data output.
 from network.dynamicNetwork import DynamicNetwork   # A network of dynamic nodes.
+from .stateSnapshot         import StateSnapshot, SnapshotPublisher, PhaseTrails
+    # Used for handing snapshots of the network state to viewers.
 
 
     #|==========================================================================
@@ -175,6 +178,26 @@ class SimulationContext:
     #                    network being simulated may be ahead or behind
     #                    this time by a small amount at any given moment.
     #
+    #               inst.time:Fixed
+    #
+    #                    The simulated time corresponding to .timestep:
+    #                    the running total of .timedelta over the steps
+    #                    taken so far (which isn't just .timestep times
+    #                    .timedelta, if .timedelta has been changed).
+    #
+    #               inst.snapshots:SnapshotPublisher
+    #
+    #                    Publishes snapshots of the network's state, at
+    #                    the end of a time step, whenever a viewer has
+    #                    asked for one, or every so many steps if an
+    #                    interval has been set.  (See stateSnapshot.)
+    #
+    #               inst.trails:PhaseTrails
+    #
+    #                    Recent history of each node's state, recorded
+    #                    each step once .enableTrails() has been called;
+    #                    otherwise None.
+    #
     #---------------------------------------------------------------------------
     
     #---------------------------------------------------------------------------
@@ -194,6 +217,10 @@ class SimulationContext:
     #               network being simulated may be ahead or behind
     #               this by a small amount at any given moment.
     #
+    #           inst._time:Fixed
+    #
+    #               The simulated time at .timestep (see .time).
+    #
     #---------------------------------------------------------------------------
 
     #===========================================================================
@@ -234,6 +261,13 @@ class SimulationContext:
 
         inst.timedelta = timedelta      # Remember it. (Uses setter.)
 
+            #-----------------------------------------------------------
+            # Create the publisher through which viewers (such as the
+            # GUI's network visualizer) can get snapshots of the state.
+
+        inst.snapshots = SnapshotPublisher()
+        inst.trails    = None       # No phase trails until someone asks.
+
             #--------------------------------------------------
             # If the network was provided, remember it as well.
 
@@ -358,6 +392,13 @@ class SimulationContext:
 
     #__/ End .timestep setter.
 
+    @property
+    def time(self) -> Fixed:
+        """The simulated time at the current .timestep:  the total of
+           .timedelta over all the time steps taken to get there."""
+        if not hasattr(self,'_time'):   self._time = Fixed(0)
+        return self._time
+
         #=======================================================================
         #   [In class SimulationContext.]
         #
@@ -380,10 +421,38 @@ class SimulationContext:
         """Evolves the state of the simulation to the specified absolute
            point in time (denoted by an integer timestep index)."""
         if timestep != self.timestep:       # Don't do anything if no change.
+            self._time = self.time + (timestep - self.timestep)*self.timedelta
             self._timestep = timestep       # Set the underlying attribute.
             network = self.network          # Retrieve our network property.
             if network is not None:         # If the network is set (non-None),
                 network.evolveTo(timestep)  # evolve it to the given time-point.
+                snapshots = self.snapshots
+                if snapshots.wanted or timestep >= snapshots.nextDue:
+                        # A viewer wants a snapshot, or one's due; publish it.
+                    snapshots.publish(StateSnapshot.capture(
+                        network, timestep, float(self.time)))
+                if self.trails is not None: # If a viewer wants phase trails, record them.
+                    self.trails.record(network)
+
+            #|------------------------------------------------------------------
+            #|  inst.enableTrails()                     [public instance method]
+            #|
+            #|      Starts recording the last <length> states of each
+            #|      node of the network, for viewers that draw phase
+            #|      trails.  Returns the PhaseTrails object (the same
+            #|      one every time, if called more than once with the
+            #|      same <length>).
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+    def enableTrails(self, length:int=1000):
+        """Starts recording phase trails of the last <length> states
+           of each node, and returns the PhaseTrails object."""
+        trails = self.trails
+        if trails is None or trails.length != length:
+            trails = PhaseTrails(self.network.nodes.keys(), length)
+            self.trails = trails
+        return trails
 
             #|------------------------------------------------------------------
             #|  inst.step{Forward,Backward}()          [public instance methods]
@@ -454,6 +523,11 @@ class SimulationContext:
             sleep(0.02)     # This is a temporary hack to prevent GUI locking.
 
         #__/ End for.
+
+            # The CSV rows are buffered by the data channel; push out any
+            # remaining ones so they precede the statistics in the output.
+
+        dataChannel().flush()
             
         self.network.printStats()   # Output accumulated statistics (averages).
 
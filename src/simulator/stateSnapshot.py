@@ -0,0 +1,329 @@
+#|==============================================================================
+#|                  TOP OF FILE:    simulator/stateSnapshot.py
+#|------------------------------------------------------------------------------
+#|   The below module documentation string will be displayed by pydoc3.
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+"""
+
+    FILE NAME:          stateSnapshot.py           [Python 3 module source file]
+
+    FILE PATH:          $GIT_ROOT/dynamic/src/simulator/stateSnapshot.py
+
+    MODULE NAME:        simulator.stateSnapshot
+
+    IN COMPONENT:       Dynamic.simulator   (core simulation framework)
+
+
+    MODULE DESCRIPTION:
+    -------------------
+
+        The stateSnapshot module lets the simulator publish the state
+        of the network it's simulating (the position and momentum of
+        each node's coordinate) for viewers such as the GUI's network
+        visualizer to pick up, without the viewers having to reach
+        into the simulator's data structures while it's running.
+
+        A snapshot holds immutable copies of the positions and
+        momenta of all the nodes (as tuples of floats, in a fixed
+        node order), along with the timestep and simulated time at
+        which it was taken.  The publisher keeps only the latest one,
+        and hands it over by replacing a single attribute, so readers
+        (the GUI, telemetry, statistics) never take a lock and never
+        hold up the simulator, and a snapshot never changes once it
+        has been published.
+
+        Publishing is either on demand, or periodic, or both.  A
+        viewer calls .request() on the simulation context's
+        SnapshotPublisher when it's ready for a new frame, and the
+        simulator captures a snapshot at the end of the next time
+        step that it completes.  Alternatively, .setInterval(n) has
+        the simulator publish one every n timesteps regardless, for
+        readers that just want to poll .latest every so often.  When
+        neither is in effect, the cost to the simulator is a couple
+        of attribute tests per time step.
+
+        For viewers that want the recent history of each node (such
+        as phase-portrait trails), the simulator can also record
+        every step's states into a PhaseTrails object, which keeps a
+        fixed-size ring buffer of (q, p) samples per node.  Recording
+        is only done once a viewer has asked for it, by calling the
+        simulation context's .enableTrails() method.
+
+
+    BASIC MODULE USAGE:
+    -------------------
+
+        from simulator.stateSnapshot import *
+
+        pub = simContext.snapshots      # The context's SnapshotPublisher.
+
+        pub.request()                   # (In the viewer.)  Ask for a new one.
+        pub.setInterval(100)            # Or:  Publish every 100 timesteps.
+        ...
+        seqno, snap = pub.latest        # Most recently published snapshot.
+        q, p = snap.state('X')          # Phase-space point of node X.
+        for name, q, p in zip(snap.names, snap.positions, snap.momenta):
+            ...
+
+
+    PUBLIC CLASSES:
+    ---------------
+
+            StateSnapshot                                  [module public class]
+
+                An immutable copy of node states at a given timestep.
+
+            SnapshotPublisher                              [module public class]
+
+                Holds the most recently published snapshot, and says
+                when the simulator should publish the next one.
+
+            PhaseTrails                                    [module public class]
+
+                Ring buffers of the last N (q, p) samples of each node.
+                                                                             """
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#| End of module documentation string.
+#|------------------------------------------------------------------------------
+
+
+    #|==========================================================================
+    #|   1. Module imports.                                [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+from logmaster import *     # Provides a range of logging capabilities.
+from . import _logger       # Use simulator component logger in this module.
+
+
+    #|==========================================================================
+    #|  2.  Global constants, variables, and objects.      [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+global __all__              # List of public symbols exported by this module.
+__all__ = [
+    'StateSnapshot',        # Node states of a network at a given timestep.
+    'SnapshotPublisher',    # Hands the latest snapshot over to viewers.
+    'PhaseTrails',          # Recent (q, p) history of each node.
+    ]
+
+
+    #|==========================================================================
+    #|  3.  Class definitions.                             [module code section]
+    #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+            #|------------------------------------------------------------------
+            #|
+            #|      StateSnapshot                                 [public class]
+            #|
+            #|          The states of all the nodes of a network, as of
+            #|          a given timestep.  Node states are stored as
+            #|          tuples of plain floats, parallel to the tuple of
+            #|          node names, so that viewers never need to touch
+            #|          the simulator's own (Fixed) values, and nothing
+            #|          in a snapshot can change after it's published.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class StateSnapshot:
+
+    #-- Public data members:
+    #
+    #       .timestep [int] - The timestep at which the snapshot was taken.
+    #
+    #       .time [float] - The corresponding simulated time.
+    #
+    #       .names [tuple] - Names of the nodes, in snapshot order.
+    #
+    #       .positions, .momenta [tuple] - Position and momentum of
+    #           each node's coordinate, in the same order as .names.
+
+    __slots__ = ('timestep', 'time', 'names', 'positions', 'momenta', '_nodes')
+
+    def __init__(inst, timestep:int, time:float, names:tuple,
+                 positions:tuple, momenta:tuple):
+        inst.timestep  = timestep
+        inst.time      = time
+        inst.names     = names
+        inst.positions = positions
+        inst.momenta   = momenta
+        inst._nodes    = None       # Name -> (q, p) map, made if asked for.
+
+        #-- StateSnapshot.capture(network, timestep, time) - Takes a
+        #       snapshot of the current states of all the nodes in
+        #       <network>.  This should be called from the thread running
+        #       the simulation, between time steps, so that the states
+        #       are consistent.
+
+    @staticmethod
+    def capture(network, timestep:int, time:float=None):
+        nodes = network.nodes
+        coords = [node.coord for node in nodes.values()]
+        return StateSnapshot(timestep, time, tuple(nodes),
+                             tuple([float(c.position.value) for c in coords]),
+                             tuple([float(c.momentum.value) for c in coords]))
+
+        #-- inst.nodes - Map from node name to a (q, p) tuple giving the
+        #       position and momentum of that node's coordinate.  Built
+        #       the first time it's asked for.  (Don't modify it.)
+
+    @property
+    def nodes(inst):
+        nodes = inst._nodes
+        if nodes is None:
+            nodes = inst._nodes = dict(zip(inst.names,
+                                           zip(inst.positions, inst.momenta)))
+        return nodes
+
+        #-- inst.state(name) - The (q, p) of the named node.
+
+    def state(inst, name:str):
+        return inst.nodes[name]
+
+#__/ End class StateSnapshot.
+
+
+            #|------------------------------------------------------------------
+            #|
+            #|      SnapshotPublisher                             [public class]
+            #|
+            #|          Passes snapshots from the simulator thread to
+            #|          viewer threads.  Only the most recent snapshot
+            #|          is kept; viewers that fall behind just skip the
+            #|          ones they missed.  The new snapshot is built
+            #|          completely before it's published, and replacing
+            #|          the .latest tuple is a single attribute
+            #|          assignment, so readers always see a complete,
+            #|          matched (seqno, snapshot) pair without needing
+            #|          a lock.  (In effect, the snapshot being built
+            #|          and the one in .latest are the two buffers of
+            #|          a double buffer; a reader still holding an old
+            #|          one just keeps it alive until it's done.)
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class SnapshotPublisher:
+
+    #-- Public data members:
+    #
+    #       .wanted [bool] - True if a viewer is waiting for a new
+    #           snapshot.  The simulator checks this after each step.
+    #
+    #       .interval [int] - If nonzero, the simulator also publishes
+    #           a snapshot every this many timesteps.
+    #
+    #       .nextDue [int or float] - Timestep at or after which the
+    #           next periodic snapshot is due; infinite if .interval
+    #           is 0.  The simulator checks this after each step.
+    #
+    #       .latest [tuple] - A (seqno, snapshot) pair for the most
+    #           recently published snapshot; (0, None) before the first.
+
+    def __init__(inst):
+        inst.wanted   = False
+        inst.interval = 0
+        inst.nextDue  = float('inf')
+        inst.latest   = (0, None)
+
+        #-- inst.setInterval(steps) - Has the simulator publish a snapshot
+        #       every <steps> timesteps (starting with the next step it
+        #       completes), or only on request if <steps> is 0.
+
+    def setInterval(inst, steps:int):
+        inst.interval = steps
+        inst.nextDue = float('-inf') if steps else float('inf')
+
+        #-- inst.request() - Asks the simulator to publish a new snapshot
+        #       at the end of its next time step.  Called by viewers.
+
+    def request(inst):
+        inst.wanted = True
+
+        #-- inst.publish(snapshot) - Makes <snapshot> the latest one.
+        #       Called by the simulator.
+
+    def publish(inst, snapshot:StateSnapshot):
+        inst.wanted = False
+        if inst.interval:
+            inst.nextDue = snapshot.timestep + inst.interval
+        inst.latest = (inst.latest[0] + 1, snapshot)
+
+        #-- inst.snapshot - The latest snapshot (or None).
+
+    @property
+    def snapshot(inst):
+        return inst.latest[1]
+
+        #-- inst.newerThan(seqno) - Returns the latest (seqno, snapshot)
+        #       pair if it's newer than <seqno>, otherwise None.
+
+    def newerThan(inst, seqno:int):
+        latest = inst.latest
+        if latest[0] > seqno:
+            return latest
+        return None
+
+#__/ End class SnapshotPublisher.
+
+
+            #|------------------------------------------------------------------
+            #|
+            #|      PhaseTrails                                   [public class]
+            #|
+            #|          Keeps the last <length> (q, p) samples of each
+            #|          node of a network, in preallocated ring buffers,
+            #|          so that recording a sample never allocates or
+            #|          copies any history.  The simulator calls
+            #|          .record() once per step; viewers look at .count
+            #|          to see how many samples have been recorded in
+            #|          all, and read the new ones out of .qs and .ps
+            #|          at ring positions (k % length).  Readers should
+            #|          only rely on the most recent (length - 1) or so
+            #|          samples, since the oldest slot may be in the
+            #|          middle of being overwritten.
+            #|
+            #|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+class PhaseTrails:
+
+    #-- Public data members:
+    #
+    #       .length [int] - Number of samples kept per node.
+    #
+    #       .count [int] - Total number of samples recorded so far.
+    #           Sample number k (counting from 0) lives at ring
+    #           position k % length, as long as k >= count - length.
+    #
+    #       .qs, .ps [dict] - Maps from node name to that node's ring
+    #           buffer (a list of floats) of positions or momenta.
+
+    def __init__(inst, names, length:int):
+        inst.length = length
+        inst.count  = 0
+        inst.qs = {name: [0.0]*length for name in names}
+        inst.ps = {name: [0.0]*length for name in names}
+
+        #-- inst.record(network) - Records the current state of each node
+        #       of <network> as the next sample.  Called by the simulator.
+
+    def record(inst, network):
+        i = inst.count % inst.length
+        qs = inst.qs;  ps = inst.ps
+        for name, node in network.nodes.items():
+            if name in qs:
+                coord = node.coord
+                qs[name][i] = float(coord.position.value)
+                ps[name][i] = float(coord.momentum.value)
+        inst.count += 1         # Only now is the new sample visible to readers.
+
+        #-- inst.sample(name, k) - Returns sample number <k> of the named
+        #       node, as a (q, p) pair.
+
+    def sample(inst, name:str, k:int):
+        i = k % inst.length
+        return (inst.qs[name][i], inst.ps[name][i])
+
+#__/ End class PhaseTrails.
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#                   BOTTOM OF FILE:    simulator/stateSnapshot.py
+#===============================================================================
@@ -0,0 +1,42 @@
+#|==============================================================================
+#|                      TOP OF FILE:    conftest.py
+#|------------------------------------------------------------------------------
+#|
+#|      Shared setup for the pytest tests in this directory:  puts the
+#|      Dynamic sources (src/) on the module path, and runs the tests
+#|      from there, since logmaster writes its log to ../log/ relative
+#|      to the current directory.
+#|
+#|      Generated step modules (see network/stepGenerator.py) are cached
+#|      in a temporary directory, rather than the user's own cache.
+#|
+#|      The older scripts here (test.py, test_packages.py and
+#|      test_partialEvalFunc.py) are meant to be run by hand, so
+#|      pytest is told not to collect them.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import os, sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+os.chdir(SRC_DIR)
+
+collect_ignore = ['test.py', 'test_packages.py', 'test_partialEvalFunc.py',
+                  'desquebench.py', 'importtime.py']
+
+
+@pytest.fixture(autouse=True)
+def stepperCache(tmp_path_factory, monkeypatch):
+    from network import stepGenerator
+    path = str(tmp_path_factory.getbasetemp() / 'steppers')
+    monkeypatch.setattr(stepGenerator, 'CACHE_DIR', path)
+    return path
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    conftest.py
+#|==============================================================================
@@ -0,0 +1,127 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test/desquebench.py
+#|------------------------------------------------------------------------------
+"""
+    FILE NAME:      desquebench.py                  [Python application script]
+
+    DESCRIPTION:
+    ------------
+
+        Micro-benchmark of gui.desque.Desque throughput, compared with
+        the standard library's queue.Queue (which is what Desque was
+        originally a thin layer over).  Reports items per second for:
+
+            single      - put() then get() of N items, one at a time,
+                          in a single thread (the uncontended case).
+
+            bulk        - put_many() then get_many() of the same items,
+                          in batches of B (if Desque has them).
+
+            spsc        - One producer thread putting N items one at a
+                          time, one consumer thread getting them.
+
+            spsc-bulk   - The same, but moving batches of B items with
+                          put_many() and get_many().
+
+        Run it before and after changing desque.py to see the effect.
+
+    USAGE:
+    ------
+
+        python desquebench.py [-n <items>] [-b <batch>] [-r <repeats>]
+                                                                             """
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+
+import os, sys, queue, threading
+from time import perf_counter
+
+    # Import from the src directory, since that's where the code lives.
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from gui.desque import Desque
+
+def single(q, n:int, batch:int):
+    put = q.put;  get = q.get
+    for i in range(n):
+        put(i)
+    for i in range(n):
+        get()
+
+def bulk(q, n:int, batch:int):
+    for i in range(0, n, batch):
+        q.put_many(range(i, min(n, i + batch)))
+    got = 0
+    while got < n:
+        got += len(q.get_many(batch))
+
+def spsc(q, n:int, batch:int):
+    def produce():
+        put = q.put
+        for i in range(n):
+            put(i)
+    producer = threading.Thread(target=produce)
+    producer.start()
+    get = q.get
+    for i in range(n):
+        get()
+    producer.join()
+
+def spscBulk(q, n:int, batch:int):
+    def produce():
+        for i in range(0, n, batch):
+            q.put_many(range(i, min(n, i + batch)))
+    producer = threading.Thread(target=produce)
+    producer.start()
+    got = 0
+    while got < n:
+        got += len(q.get_many(batch))
+    producer.join()
+
+    # (name, function, needs bulk operations?)
+
+_cases = [('single',    single,   False),
+          ('bulk',      bulk,     True),
+          ('spsc',      spsc,     False),
+          ('spsc-bulk', spscBulk, True)]
+
+def measure(makeQueue, case, needsBulk:bool, n:int, batch:int, repeats:int):
+
+    """Runs <case> on fresh queues <repeats> times, and returns the
+       best rate seen, in items per second (or None if the queue
+       doesn't support the operations the case needs)."""
+
+    if needsBulk and not hasattr(makeQueue(), 'put_many'):
+        return None
+    best = None
+    for r in range(repeats):
+        q = makeQueue()
+        start = perf_counter()
+        case(q, n, batch)
+        rate = n/(perf_counter() - start)
+        if best is None or rate > best:
+            best = rate
+    return best
+
+def _main(argv):
+    n = 200000;  batch = 64;  repeats = 3
+    while len(argv) >= 2:
+        if argv[0] == '-n': n = int(argv[1])
+        elif argv[0] == '-b': batch = int(argv[1])
+        elif argv[0] == '-r': repeats = int(argv[1])
+        argv = argv[2:]
+
+    print("%d items, batches of %d, best of %d:" % (n, batch, repeats))
+    print("  %-10s %14s %14s" % ("case", "queue.Queue", "Desque"))
+    for name, case, needsBulk in _cases:
+        rates = [measure(make, case, needsBulk, n, batch, repeats)
+                 for make in (queue.Queue, Desque)]
+        print("  %-10s %14s %14s" % (name, *["%12.0f/s" % rate if rate else "n/a"
+                                             for rate in rates]))
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#                   BOTTOM OF FILE:    test/desquebench.py
+#===============================================================================
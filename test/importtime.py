@@ -0,0 +1,109 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test/importtime.py
+#|------------------------------------------------------------------------------
+"""
+    FILE NAME:      importtime.py                   [Python application script]
+
+    DESCRIPTION:
+    ------------
+
+        Reports the import-time startup cost of Dynamic modules, using
+        the interpreter's built-in "-X importtime" facility.  Each
+        module named on the command line (by default, 'simulator' and
+        'simulator.simmor') is imported in a fresh interpreter, run
+        with ../src as its working directory (as the demo is), and
+        the cumulative import times are summarized, slowest first.
+
+        It also reports whether tkinter or any of the gui modules
+        that need it got loaded along the way, since the simulator
+        core is supposed to be importable without them.  The exit
+        status is nonzero if any of the named modules failed to
+        import, or dragged in tkinter.
+
+    USAGE:
+    ------
+
+        python importtime.py [-n <top-N>] [<module> ...]
+                                                                             """
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+
+import os, sys, subprocess
+
+    # Run from the src directory, since that's where the code expects to be.
+
+_srcdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+    # Modules that should never be loaded by a headless import.
+
+_guiModules = ('tkinter', 'gui.guiapp', 'gui.tikiterm',
+               'gui.networkVisualizer', 'gui.dyngui')
+
+def importTimes(module:str):
+
+    """Imports <module> in a fresh interpreter with -X importtime, and
+       returns a tuple (ok, times, errtext), where <times> is a list
+       of (cumulative_usec, self_usec, name) tuples, one per module
+       loaded, and <errtext> is any other stderr output."""
+
+    proc = subprocess.run([sys.executable, '-X', 'importtime',
+                           '-c', 'import %s' % module],
+                          cwd=_srcdir, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, universal_newlines=True)
+
+    times = [];  other = []
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:'):
+            fields = line[len('import time:'):].split('|')
+            try:
+                selfus = int(fields[0]);  cumus = int(fields[1])
+            except ValueError:
+                continue                # The column-header line.
+            times.append((cumus, selfus, fields[2].strip()))
+        else:
+            other.append(line)
+
+    return (proc.returncode == 0, times, "\n".join(other))
+
+def report(module:str, topN:int=15) -> bool:
+
+    """Prints an import-time report for <module>.  Returns True if
+       it imported successfully without loading any GUI modules."""
+
+    ok, times, errtext = importTimes(module)
+
+    print("=== import %s ===" % module)
+
+    if not ok:
+        print("  IMPORT FAILED:")
+        print("    " + errtext.strip().replace("\n", "\n    "))
+        return False
+
+    total = max((t[0] for t in times), default=0)
+    print("  %d modules loaded, %.1f ms total." % (len(times), total/1000))
+
+    print("  %10s %10s  %s" % ("cum (ms)", "self (ms)", "module"))
+    for cumus, selfus, name in sorted(times, reverse=True)[:topN]:
+        print("  %10.1f %10.1f  %s" % (cumus/1000, selfus/1000, name))
+
+    loaded = set(t[2] for t in times)
+    gui = [m for m in _guiModules if m in loaded]
+    if gui:
+        print("  WARNING: GUI modules were loaded: %s" % ", ".join(gui))
+    print()
+
+    return not gui
+
+def _main(argv):
+    topN = 15
+    if len(argv) >= 2 and argv[0] == '-n':
+        topN = int(argv[1]);  argv = argv[2:]
+    modules = argv or ['simulator', 'simulator.simmor']
+    results = [report(module, topN) for module in modules]
+    return 0 if all(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
+
+#^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#                   BOTTOM OF FILE:    test/importtime.py
+#===============================================================================
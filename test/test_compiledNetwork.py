@@ -0,0 +1,118 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_compiledNetwork.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of network.compiledNetwork:  seeded runs of the example
+#|      networks in the compiled engine against the object engine,
+#|      and the compiled engine's reversibility.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import contextlib, io, random
+
+import pytest
+
+from fixed                          import Fixed
+from network.dynamicNetwork         import DynamicNetwork
+from network.compiledNetwork        import CompiledNetwork
+from simulator.simulationContext    import SimulationContext
+from examples                       import exampleNetworks
+
+EXAMPLES = ['MemCellNet', 'InverterNet', 'AndGateNet', 'HalfAdderNet', 'FullAdderNet']
+
+
+#-- build(name, batched, seed) - Builds the example network <name>, with
+#       the random initial momenta that <seed> gives, set to run in the
+#       compiled engine if <batched>, else in the object engine.
+
+def build(name:str, batched:bool, seed:int):
+    random.seed(seed)
+    sc = SimulationContext(timedelta=Fixed(0.01))
+    with contextlib.redirect_stdout(io.StringIO()):     # Quiet construction.
+        net = getattr(exampleNetworks, name)(sc)
+    net.batched = batched                               # Just this network.
+    return sc, net
+
+
+#-- state(net) - The quanta and times of all of <net>'s positions and
+#       momenta, by node name.  (Initial values may be floats.)
+
+def state(net):
+    return {name: (Fixed(node.coord.position.value).quanta, node.coord.position.time,
+                   Fixed(node.coord.momentum.value).quanta, node.coord.momentum.time)
+            for name, node in net.nodes.items()}
+
+
+#-- align(sc, net) - Brings any positions that the object engine left
+#       behind up to the context's timestep.
+
+def align(sc, net):
+    for node in net.nodes.values():
+        node.coord.position.evolveTo(sc.timestep)
+
+
+def test_object_engine_is_default():
+    assert DynamicNetwork.batched is False
+    sc, net = build('InverterNet', DynamicNetwork.batched, 1)
+    sc.stepForward(2)
+    assert net._compiled is None
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_stepwise_runs_agree(name, seed):
+
+        # Step both engines a step at a time, forwards and then partway
+        # back, as the simulator does.
+
+    runs = []
+    for batched in (False, True):
+        sc, net = build(name, batched, seed)
+        for i in range(200):
+            sc.stepForward(2)
+        for i in range(50):
+            sc.stepBackward(2)
+        runs.append((sc, net))
+
+    (osc, onet), (csc, cnet) = runs
+    assert isinstance(cnet._compiled, CompiledNetwork)
+    assert onet._compiled is None
+
+        # The compiled engine leaves every position at the timestep.
+
+    assert all(node.coord.position.time == csc.timestep
+               for node in cnet.nodes.values())
+
+        # Once the object engine's are brought up to it too, every value
+        # is the same.
+
+    align(osc, onet)
+    assert state(onet) == state(cnet)
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_compiled_engine_retraces_itself(name):
+    sc, net = build(name, True, 1)
+    start = state(net)
+    sc.stepForward(400)
+    assert state(net) != start
+    sc.stepBackward(400)
+    assert state(net) == start
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_compiled_engine_ignores_stride(name):
+
+        # However the steps are taken, the compiled trajectory is the same.
+
+    states = []
+    for stride in (2, 10, 200):
+        sc, net = build(name, True, 2)
+        for i in range(200//stride):
+            sc.stepForward(stride)
+        states.append(state(net))
+    assert states[0] == states[1] == states[2]
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_compiledNetwork.py
+#|==============================================================================
@@ -0,0 +1,111 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_dependencyGraph.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of simulator.dependencyGraph:  the routes and partials it
+#|      works out up front are the ones the Hamiltonian would otherwise
+#|      have found lazily.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import contextlib, io, random
+
+import pytest
+
+from fixed                                  import Fixed
+from simulator.dependencyGraph              import DependencyGraph
+from simulator.differentiableDynamicFunction import DifferentiableDynamicFunction
+from simulator.simulationContext            import SimulationContext
+from boolean.dynamicNOTGate                 import DynamicNOTGate
+from examples                               import exampleNetworks
+
+EXAMPLES = ['MemCellNet', 'InverterNet', 'AndGateNet', 'HalfAdderNet', 'FullAdderNet']
+
+
+def build(name:str, seed:int=1):
+    random.seed(seed)
+    sc = SimulationContext(timedelta=Fixed(0.01))
+    with contextlib.redirect_stdout(io.StringIO()):     # Quiet construction.
+        net = getattr(exampleNetworks, name)(sc)
+    return net
+
+
+#-- firstIntermediate(term, var) - The intermediate that chainRuleSearch()
+#       would find for <var> in <term>, by scanning, or None.
+
+def firstIntermediate(term, var):
+    for inter in term._varIndex:
+        if isinstance(inter, DifferentiableDynamicFunction) and var in inter._varIndex:
+            return inter
+    return None
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_routes(name):
+    hamiltonian = build(name).hamiltonian
+    assert hamiltonian._graph is None
+    graph = hamiltonian.finalize()
+    assert isinstance(graph, DependencyGraph)
+    assert hamiltonian.finalize() is graph          # Until something changes.
+
+    for var, routes in graph.routes.items():
+        terms = [term for term, via in routes]
+        assert terms == list(hamiltonian.termsContaining(var))
+        for term, via in routes:
+            assert via is firstIntermediate(term, var)
+        assert len(graph.partials[var]) == len(routes)
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_momenta_go_through_velocities(name):
+    net = build(name)
+    graph = net.hamiltonian.finalize()
+    for node in net.nodes.values():
+        coord = node.coord
+        [(term, via)] = graph.routes[coord.momentum]
+        assert term is coord.kinetic_term
+        assert via is coord._velVar
+        assert all(via is None for term, via in graph.routes[coord.position])
+
+
+#-- partial(net, var) - The value of <net>'s dH/d<var>, in the current state.
+#       (Its summer has to be evolved, to its variable's own time, before
+#       it can be evaluated.)
+
+def partial(net, var):
+    dH = net.hamiltonian.dynPartialDerivWRT(var)
+    dH.evolveTo(var.time)
+    return dH.evaluateWith()
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_partials_match_lazy_ones(name):
+
+        # The same network, with and without a graph, at the same state:
+        # every variable's partial of H has the same value.
+
+    lazy, eager = build(name), build(name)
+    eager.hamiltonian.finalize()
+    assert lazy.hamiltonian._graph is None
+    for node in eager.nodes:
+        for attr in ('position', 'momentum'):
+            var1 = getattr(lazy.nodes[node].coord, attr)
+            var2 = getattr(eager.nodes[node].coord, attr)
+            assert Fixed(var1.value) == Fixed(var2.value)
+            assert partial(lazy, var1) == partial(eager, var2)
+
+
+def test_new_terms_discard_the_graph():
+    net = build('InverterNet')
+    graph = net.hamiltonian.finalize()
+    with contextlib.redirect_stdout(io.StringIO()):
+        DynamicNOTGate(net.nodes['Y'], 'notgate2', network=net, outNodeName='Z')
+    assert net.hamiltonian._graph is None
+    graph2 = net.hamiltonian.finalize()
+    assert graph2 is not graph
+    assert len(graph2.routes[net.nodes['Y'].coord.position]) == \
+           len(graph.routes[net.nodes['Y'].coord.position]) + 1
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_dependencyGraph.py
+#|==============================================================================
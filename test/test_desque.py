@@ -0,0 +1,110 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_desque.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of gui.desque:  putting at either end, taking from either
+#|      end, and the bulk operations, on their own and between threads.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import threading
+
+import pytest
+
+from gui.desque import Desque, Empty, Full
+
+
+def test_ends():
+    q = Desque()
+    q.put(2);  q.put(3);  q.put(1, front=True);  q.putfront(0)
+    assert q.get(back=True) == 3
+    assert [q.get(), q.get(), q.get()] == [0, 1, 2]
+    with pytest.raises(Empty):
+        q.get(block=False)
+    with pytest.raises(Empty):
+        q.get(timeout=0.01)
+
+
+def test_bulk_order():
+    q = Desque()
+    q.put_many([3, 4])
+    q.put_many([1, 2], front=True)
+    q.put_many([])
+    assert q.qsize() == 4 and q.unfinished_tasks == 4
+    assert q.get_many(3) == [1, 2, 3]
+    q.put_many(range(5, 8))
+    assert q.drain() == [4, 5, 6, 7]
+    assert q.drain() == []
+    with pytest.raises(Empty):
+        q.get_many(block=False)
+    with pytest.raises(Empty):
+        q.get_many(timeout=0.01)
+    q.put_many('ab')
+    q.flush()
+    assert q.empty()
+
+
+def test_bounded_put_many():
+    q = Desque(maxsize=3)
+    with pytest.raises(Full):
+        q.put_many(range(5), block=False)
+    assert q.drain() == [0, 1, 2]       # As many as fit went in.
+    with pytest.raises(Full):
+        q.put_many(range(5), timeout=0.01)
+    q.drain()
+
+        # With a consumer taking them out, they all get through, in order.
+
+    got = []
+    def consume():
+        while len(got) < 100:
+            got.extend(q.get_many(2))
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    q.put_many(range(100))
+    consumer.join(5)
+    assert got == list(range(100))
+
+
+def test_get_many_wakes_for_put():
+    q = Desque()
+    got = []
+    waiter = threading.Thread(target=lambda: got.extend(q.get_many()))
+    waiter.start()
+    q.put('x')
+    waiter.join(5)
+    assert got == ['x']
+
+
+def test_many_producers_and_consumers():
+    q = Desque()
+    got = []
+    lock = threading.Lock()
+    def produce(k):
+        for i in range(0, 200, 10):
+            q.put_many(range(1000*k + i, 1000*k + i + 10), front=(i % 20 == 0))
+    def consume():
+        while True:
+            items = q.get_many(7)
+            done = None in items
+            if done:
+                items.remove(None)
+                q.put(None)         # Let the other consumers see it too.
+            with lock:
+                got.extend(items)
+            if done:
+                return
+    producers = [threading.Thread(target=produce, args=(k,)) for k in range(4)]
+    consumers = [threading.Thread(target=consume) for k in range(3)]
+    for t in producers + consumers:
+        t.start()
+    for t in producers:
+        t.join(5)
+    q.put(None)
+    for t in consumers:
+        t.join(5)
+    assert sorted(got) == [1000*k + i for k in range(4) for i in range(200)]
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_desque.py
+#|==============================================================================
@@ -0,0 +1,115 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_differentiableFunction.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of automatic differentiation in functions.differentiable-
+#|      Function:  derived partials against finite differences, for both
+#|      traced functions and ones that fall back to dual numbers.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import random
+
+import pytest
+
+from functions.differentiableFunction import BaseDifferentiableFunction, Dual
+
+H = 1e-6        # Step for central differences.
+
+
+def finiteDiff(f, args, i):
+    up = list(args);    up[i] += H
+    down = list(args);  down[i] -= H
+    return (f(*up) - f(*down))/(2*H)
+
+
+def points(n, count=20, seed=2):
+    rng = random.Random(seed)
+    return [[rng.uniform(0.2, 1.5) for i in range(n)] for j in range(count)]
+
+
+def rational(x, y, z):
+    return 0.5*(z - x*y)**2 + x/(1 + y*y) - 3/z
+
+def branching(x, y):            # Can't be traced; uses dual numbers.
+    return x*x*y if x > 0.5 else -x*y**3
+
+FUNCTIONS = {
+    'traced':       rational,
+    'dual':         branching,
+    'one argument': lambda x: 2*x**3 - x,
+}
+
+
+@pytest.mark.parametrize('name', FUNCTIONS)
+def test_partials_match_finite_differences(name):
+    function = FUNCTIONS[name]
+    f = BaseDifferentiableFunction(function=function)
+    n = len(f.argNames)
+    for args in points(n):
+        gradient = f.gradient(*args)
+        assert type(gradient) is tuple and len(gradient) == n
+        for i in range(n):
+            expected = pytest.approx(finiteDiff(function, args, i), rel=1e-6, abs=1e-6)
+            assert f.partialDerivWRT(i)(*args) == expected
+            assert gradient[i] == expected
+
+
+@pytest.mark.parametrize('function, traced', [(rational, True), (branching, False)],
+                         ids=['traced', 'dual'])
+def test_partial_arrays(function, traced):
+    f = BaseDifferentiableFunction(function=function)
+    assert (f._partialArrays is not None) == traced     # Batch kernels if traced.
+    n = len(f.argNames)
+    args = points(n)
+    arrays = [list(column) for column in zip(*args)]
+    for i in range(n):
+        assert f.partialArray(i, *arrays) == \
+               pytest.approx([f.partialDerivWRT(i)(*a) for a in args])
+
+
+def test_one_argument_gradient_is_a_tuple():
+    f = BaseDifferentiableFunction(function=lambda x: 2*x**3 - x)
+    assert f.gradient(2) == (23,)
+
+
+def test_zeroth_and_first_powers_at_zero():
+    f = BaseDifferentiableFunction(function=lambda x: x**0 + x)
+    assert f.gradient(0.0) == (1.0,)
+    g = BaseDifferentiableFunction(function=lambda x, y: x**1*y**0 + y**3)
+    assert g._partialArrays is not None
+    assert g.gradient(0.0, 0.0) == (1.0, 0.0)
+    assert g.gradient(2.0, 1.0) == (1.0, 3.0)
+
+
+def test_given_partials_are_kept():
+    dx = lambda x, y: y
+    dy = lambda x, y: x
+    f = BaseDifferentiableFunction(function=lambda x, y: x*y, partials=[dx, dy])
+    assert f.partials == [dx, dy]
+    assert f.gradient(2, 3) == (3, 2)
+
+
+def test_second_partials():
+    f = BaseDifferentiableFunction(function=rational)
+    for args in points(3, 5):
+        H2 = f.hessian(*args)
+        for i in range(3):
+            for j in range(3):
+                dfi = f.partialDerivWRT(i)
+                assert H2[i][j] == pytest.approx(finiteDiff(dfi, args, j),
+                                                 rel=1e-5, abs=1e-5)
+
+
+def test_dual_arithmetic():
+    x = Dual(3.0, (1, 0))
+    y = Dual(2.0, (0, 1))
+    z = (x*y - 1/x)**2 / y
+    value = (6 - 1/3)**2/2
+    assert z.value == pytest.approx(value)
+    assert z.grad[0] == pytest.approx(2*(6 - 1/3)*(2 + 1/9)/2)
+    assert z.grad[1] == pytest.approx(2*(6 - 1/3)*3/2 - value/2)
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_differentiableFunction.py
+#|==============================================================================
@@ -0,0 +1,64 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_evalArray.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of array-valued evaluation of differentiable functions:
+#|      every batch kernel gives the same results as evaluating each
+#|      point separately.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+from array import array
+import random
+
+import pytest
+
+from fixed                              import Fixed
+from functions.differentiableFunction   import BaseDifferentiableFunction
+from functions.doubleWellFunction       import DoubleWellFunction
+from functions.polynomialFunction       import PolynomialFunction
+from functions.tabulatedUnaryFunction   import TabulatedUnaryFunction
+from boolean.dynamicANDGate             import DynamicANDFunction
+
+
+def columns(n, fixed:bool, count=30, seed=4):
+    rng = random.Random(seed)
+    make = Fixed if fixed else float
+    return [[make(rng.uniform(-1, 1.5)) for j in range(count)] for i in range(n)]
+
+
+FUNCTIONS = {
+    'AND':          lambda: DynamicANDFunction(1.3),
+    'inexact AND':  lambda: PolynomialFunction(argNames=['x', 'y', 'z'], exact=False,
+                                               terms=DynamicANDFunction(1.3).terms),
+    'derived':      lambda: BaseDifferentiableFunction(
+                                function=lambda x, y: 0.5*(x - y)**2 + x*y*y/3),
+    'tabulated':    lambda: TabulatedUnaryFunction(DoubleWellFunction(0, 1, 2),
+                                                   lo=-1, hi=2, step=Fixed(1/32)),
+}
+
+
+@pytest.mark.parametrize('name', FUNCTIONS)
+@pytest.mark.parametrize('fixed', [False, True], ids=['float', 'Fixed'])
+def test_arrays_match_pointwise(name, fixed):
+    f = FUNCTIONS[name]()
+    n = len(f.argNames)
+    args = columns(n, fixed)
+    points = list(zip(*args))
+    assert f(*args) == [f(*p) for p in points]
+    assert f.evalArray(*args) == [f(*p) for p in points]
+    for i in range(n):
+        assert f.partialArray(i, *args) == [f.partialDerivWRT(i)(*p) for p in points]
+    assert f.gradientArray(*args) == tuple(f.partialArray(i, *args) for i in range(n))
+
+
+def test_array_types():
+    f = DynamicANDFunction(1.3)
+    args = columns(3, False)
+    expected = f.evalArray(*args)
+    assert f(*map(tuple, args)) == expected
+    assert f(*[array('d', a) for a in args]) == expected
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_evalArray.py
+#|==============================================================================
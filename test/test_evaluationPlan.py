@@ -0,0 +1,86 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_evaluationPlan.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of simulator.evaluationPlan:  plans give exactly the values
+#|      their trees do, so that the object engine steps the same with or
+#|      without them.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import contextlib, io, random
+
+import pytest
+
+from fixed                          import Fixed
+from simulator.evaluationPlan       import EvaluationPlan
+from simulator.simulationContext    import SimulationContext
+from examples                       import exampleNetworks
+
+EXAMPLES = ['MemCellNet', 'InverterNet', 'AndGateNet', 'HalfAdderNet', 'FullAdderNet']
+
+
+def build(name:str, seed:int):
+    random.seed(seed)
+    sc = SimulationContext(timedelta=Fixed(0.01))
+    with contextlib.redirect_stdout(io.StringIO()):     # Quiet construction.
+        net = getattr(exampleNetworks, name)(sc)
+    return sc, net                                      # (Object engine.)
+
+
+def variables(net):
+    for node in net.nodes.values():
+        yield node.coord.position
+        yield node.coord.momentum
+
+
+def state(net):
+    return [(Fixed(var.value).quanta, var.time) for var in variables(net)]
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_plans_evaluate_like_trees(name):
+    sc, net = build(name, 1)
+    for step in range(40):
+        sc.stepForward(2)
+        if step % 10 == 9:
+            for var in variables(net):
+                plan = var.timeDeriv
+                assert isinstance(plan, EvaluationPlan)
+                value = plan.evaluateWith()
+                assert isinstance(value, Fixed)
+                assert value == plan.tree.evaluateWith()
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_plans_step_like_trees(name, monkeypatch):
+
+        # (A step at a time.  Over longer jumps, the order things are
+        # evolved in matters, and the Hamiltonian keeps each variable's
+        # terms in a set, so that order differs between two copies of a
+        # network, plans or no plans.)
+
+    states = []
+    for optimize in (True, False):
+        monkeypatch.setattr(EvaluationPlan, 'optimize', optimize)
+        sc, net = build(name, 2)
+        for i in range(100):
+            sc.stepForward(2)
+        for i in range(30):
+            sc.stepBackward(2)
+        states.append(state(net))
+    assert states[0] == states[1]
+
+
+def test_plans_fall_back_on_non_fixed_values():
+    sc, net = build('InverterNet', 1)
+    coord = next(iter(net.nodes.values())).coord
+    coord.momentum.value = 1            # An int, not a Fixed.
+    plan = coord.position.timeDeriv
+    value = plan.evaluateWith()
+    assert not isinstance(value, Fixed)
+    assert value == plan.tree.evaluateWith()
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_evaluationPlan.py
+#|==============================================================================
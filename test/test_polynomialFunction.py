@@ -0,0 +1,128 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_polynomialFunction.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of functions.polynomialFunction:  evaluation, derivatives
+#|      (against finite differences), and exact mode.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+from fractions import Fraction
+import random
+
+import pytest
+
+from fixed                          import Fixed
+from functions.polynomialFunction   import PolynomialFunction
+from functions.doubleWellFunction   import DoubleWellFunction
+from boolean.dynamicANDGate         import DynamicANDFunction
+
+H = 1e-6        # Step for central differences.
+
+
+#-- finiteDiff(f, args, i) - The central-difference estimate of <f>'s
+#       partial with respect to its <i>th argument, at <args>.
+
+def finiteDiff(f, args, i):
+    up = list(args);    up[i] += H
+    down = list(args);  down[i] -= H
+    return (f(*up) - f(*down))/(2*H)
+
+
+def points(n, count=20, seed=1):
+    rng = random.Random(seed)
+    return [[rng.uniform(-1.5, 1.5) for i in range(n)] for j in range(count)]
+
+
+def test_horner_matches_expansion():
+    x, y = PolynomialFunction.variables('x', 'y')
+    f = 3*x**3*y - 2*x*y**2 + 0.5*y - 7
+    assert f.degree == 4
+    for a, b in points(2):
+        assert f(a, b) == pytest.approx(3*a**3*b - 2*a*b**2 + 0.5*b - 7)
+
+
+def test_arithmetic_cancels_terms():
+    x, y = PolynomialFunction.variables('x', 'y')
+    assert ((x + y)**2 - x**2 - 2*x*y - y**2).terms == {}
+    with pytest.raises(ValueError):
+        x**-1
+
+
+@pytest.mark.parametrize('f', [DynamicANDFunction(2.0),
+                               DoubleWellFunction(0.0, 1.0, 3.0),
+                               (lambda x, y, z: 0.25*(x*y + z)**3 - x*z
+                                )(*PolynomialFunction.variables('x', 'y', 'z'))],
+                         ids=['AND', 'double well', 'cubic'])
+def test_partials_match_finite_differences(f):
+    n = len(f.argNames)
+    for args in points(n):
+        for i in range(n):
+            assert f.partialDerivWRT(i)(*args) == \
+                   pytest.approx(finiteDiff(f, args, i), rel=1e-6, abs=1e-6)
+
+
+def test_partials_are_polynomials():
+    f = DynamicANDFunction(2.0)
+    d = f.partialDerivWRT(2)
+    assert isinstance(d, PolynomialFunction)
+    assert d.terms == {(0, 0, 1): 2.0, (1, 1, 0): -2.0}
+    assert f.partialDerivWRT(2) is d        # Cached.
+
+
+def test_double_well_bottoms():
+    for b1, b2, k in ((0.0, 1.0, 3.0), (-0.5, 2.0, 1.0)):
+        D = DoubleWellFunction(b1, b2, k)
+        dD = D.partialDerivWRT(0)
+        assert dD(b1) == pytest.approx(0.0, abs=1e-12)
+        assert dD(b2) == pytest.approx(0.0, abs=1e-12)
+        assert D(b1) == pytest.approx(D(b2))
+        assert D((b1 + b2)/2) > D(b1)
+
+
+#-- exactly(f, args) - The correctly rounded Fixed value of polynomial <f>
+#       at Fixed <args>, worked out in fractions.
+
+def exactly(f, args):
+    total = Fraction(0)
+    for exps, coeff in f.terms.items():
+        term = Fraction(coeff)
+        for a, e in zip(args, exps):
+            term *= Fraction(a.quanta, Fixed(1).quanta)**e
+        total += term
+    return Fixed(total)
+
+
+def test_exact_mode_rounds_once():
+    f = DynamicANDFunction(1.7)
+    assert f.exact
+    for args in points(3, 50):
+        args = [Fixed(a) for a in args]
+        value = f(*args)
+        assert isinstance(value, Fixed)
+        assert value.quanta == exactly(f, args).quanta
+        for i in range(3):
+            d = f.partialDerivWRT(i)
+            assert d(*args).quanta == exactly(d, args).quanta
+
+
+def test_exact_mode_ignores_how_terms_are_written():
+    x, y = PolynomialFunction.variables('x', 'y')
+    f = 0.3*(x + y)**2
+    g = 0.3*x**2 + 0.6*x*y + 0.3*y**2
+    for a, b in points(2, 50):
+        a, b = Fixed(a), Fixed(b)
+        assert f(a, b) == g(a, b) == f.evalFixed(a, b)
+
+
+def test_inexact_mode():
+    f = DynamicANDFunction(1.7)
+    f.exact = False
+    args = [Fixed(0.3), Fixed(0.6), Fixed(0.1)]
+    assert float(f(*args)) == pytest.approx(float(exactly(f, args)), abs=1e-8)
+    assert f.evalFixed(*args) == exactly(f, args)
+    assert f(0.3, 0.6, 0.1) == pytest.approx(0.5*1.7*(0.1 - 0.18)**2)
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_polynomialFunction.py
+#|==============================================================================
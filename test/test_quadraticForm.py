@@ -0,0 +1,93 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_quadraticForm.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of network.compiledNetwork.QuadraticForm:  the merged
+#|      sparse forces are the same, to the quantum, as evaluating each
+#|      term's partial derivatives.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import contextlib, io, random
+
+import pytest
+
+from fixed                          import Fixed
+from functions.polynomialFunction   import PolynomialFunction
+from network.compiledNetwork        import InteractionBlock, QuadraticForm
+from simulator.simulationContext    import SimulationContext
+from examples                       import exampleNetworks
+
+EXAMPLES = ['MemCellNet', 'InverterNet', 'AndGateNet', 'HalfAdderNet', 'FullAdderNet']
+
+
+def positions(n, seed=5):
+    rng = random.Random(seed)
+    return [Fixed(rng.uniform(-1.5, 1.5)).quanta for i in range(n)]
+
+
+#-- termForces(blocks, Q) - The forces (in quanta) from evaluating each
+#       term's partials one by one, at positions <Q>.
+
+def termForces(blocks, Q):
+    F = [0]*len(Q)
+    for block in blocks:
+        for term in range(len(block)):
+            args = [Fixed.fromQuanta(Q[column[term]]) for column in block.nodes]
+            for k, column in enumerate(block.nodes):
+                F[column[term]] += block.potential.partialDerivWRT(k)(*args).quanta
+    return F
+
+
+def notGate(stiffness):
+    x, y = PolynomialFunction.variables('x', 'y')
+    return 0.5*stiffness*(x + y - 1)**2
+
+
+def test_exact_rows_are_merged():
+    block = InteractionBlock(object, notGate(1))
+    block.add('a-b', [0, 1])
+    block.add('b-c', [1, 2])
+    form = QuadraticForm([block])
+    assert len(form) == 2
+    assert [row[0] for row in form.rows] == [0, 1, 2]    # One row per node.
+    assert all(row[-1] == 1 for row in form.rows)
+    Q = positions(3)
+    F = [0]*3
+    form.addForces(Q, F)
+    assert F == termForces([block], Q)
+
+
+def test_inexact_rows_are_rounded():
+    block = InteractionBlock(object, notGate(1/3))
+    block.add('a-b', [0, 1])
+    block.add('b-c', [1, 2])
+    form = QuadraticForm([block])
+    assert len(form.rows) == 4 and all(row[-1] > 1 for row in form.rows)
+    for seed in range(20):
+        Q = positions(3, seed)
+        F = [0]*3
+        form.addForces(Q, F)
+        assert F == termForces([block], Q)
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_example_forces(name):
+    random.seed(1)
+    sc = SimulationContext(timedelta=Fixed(0.01))
+    with contextlib.redirect_stdout(io.StringIO()):
+        net = getattr(exampleNetworks, name)(sc)
+    net.batched = True
+    compiled = net.finalize()
+    quadratic = [block for block in compiled.blocks if block.quadratic]
+    assert compiled.quadratic.blocks == quadratic
+    for seed in range(5):
+        Q = positions(len(compiled.nodes), seed)
+        F = [0]*len(Q)
+        compiled.quadratic.addForces(Q, F)
+        assert F == termForces(quadratic, Q)
+        assert compiled.forces(Q) == termForces(compiled.blocks, Q)
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_quadraticForm.py
+#|==============================================================================
@@ -0,0 +1,131 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_stiffness.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of network.stiffness and CompiledNetwork.hessian():  the
+#|      Hessian against finite differences of the compiled forces, and
+#|      the clusters' eigenvalues against a dense solver.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import contextlib, io, math, random
+
+import pytest
+
+from fixed                          import Fixed
+from network.compiledNetwork        import CompiledNetwork
+from simulator.simulationContext    import SimulationContext
+from examples                       import exampleNetworks
+
+EXAMPLES = ['MemCellNet', 'InverterNet', 'AndGateNet', 'HalfAdderNet', 'FullAdderNet']
+
+_D = Fixed(1).quanta
+
+
+def build(name:str, seed:int=1):
+    random.seed(seed)
+    sc = SimulationContext(timedelta=Fixed(0.01))
+    with contextlib.redirect_stdout(io.StringIO()):     # Quiet construction.
+        net = getattr(exampleNetworks, name)(sc)
+    return net
+
+
+def positions(n, seed):
+    rng = random.Random(seed)
+    return [rng.uniform(-0.25, 1.25) for i in range(n)]
+
+
+#-- eigenvalues(A) - All the eigenvalues of the small dense symmetric
+#       matrix <A> (a list of rows), by cyclic Jacobi rotations.
+
+def eigenvalues(A:list) -> list:
+    A = [list(row) for row in A]
+    n = len(A)
+    for sweep in range(100):
+        off = sum(A[i][j]**2 for i in range(n) for j in range(n) if i != j)
+        if off < 1e-24:
+            break
+        for p in range(n):
+            for q in range(p + 1, n):
+                if abs(A[p][q]) < 1e-300:
+                    continue
+                theta = (A[q][q] - A[p][p])/(2*A[p][q])
+                t = math.copysign(1, theta)/(abs(theta) + math.sqrt(theta*theta + 1))
+                c = 1/math.sqrt(t*t + 1);  s = t*c
+                for k in range(n):
+                    akp, akq = A[k][p], A[k][q]
+                    A[k][p], A[k][q] = c*akp - s*akq, s*akp + c*akq
+                for k in range(n):
+                    apk, aqk = A[p][k], A[q][k]
+                    A[p][k], A[q][k] = c*apk - s*aqk, s*apk + c*aqk
+    return sorted(A[i][i] for i in range(n))
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_hessian_matches_finite_differences_of_forces(name):
+    compiled = CompiledNetwork(build(name))
+    n = len(compiled.nodes)
+    h = 10**5                                   # 1e-4, in quanta.
+    for seed in range(3):
+        q = positions(n, seed)
+        Q = [Fixed(x).quanta for x in q]
+        H = compiled.hessian(q)
+        for j in range(n):
+            up = list(Q);    up[j] += h
+            down = list(Q);  down[j] -= h
+            Fup, Fdown = compiled.forces(up), compiled.forces(down)
+            for i in range(n):
+                estimate = (Fup[i] - Fdown[i])/(2*h)
+                assert H[i].get(j, 0) == pytest.approx(estimate, rel=1e-4, abs=1e-4)
+                assert H[i].get(j, 0) == pytest.approx(H[j].get(i, 0))
+
+
+@pytest.mark.parametrize('name', EXAMPLES)
+def test_cluster_extremes_are_the_eigenvalues(name):
+    net = build(name)
+    compiled = CompiledNetwork(net)
+    n = len(compiled.nodes)
+    for seed in range(3):
+        q = positions(n, seed)
+        analysis = net.stiffness(q=q)
+        clustered = [node for cluster in analysis.clusters for node in cluster.nodes]
+        assert len(clustered) == n and set(clustered) == set(compiled.nodes)
+        W = analysis.inverseMasses
+        index = {node: i for i, node in enumerate(compiled.nodes)}
+        for cluster in analysis.clusters:
+            members = [index[node] for node in cluster.nodes]
+            A = [[math.sqrt(W[i]*W[j])*analysis.hessian[i].get(j, 0) for j in members]
+                 for i in members]
+            values = eigenvalues(A)
+            assert cluster.lowest == pytest.approx(values[0], abs=1e-9)
+            assert cluster.highest == pytest.approx(values[-1], abs=1e-9)
+        highest = max(cluster.highest for cluster in analysis.clusters)
+        assert analysis.maxTimedelta == pytest.approx(1/math.sqrt(highest))
+
+
+def test_unstable_points():
+
+        # An AND gate whose output is far from A*B:  0.5*(z - x*y)^2 has
+        # d^2/dxdy = x*y - (z - x*y) = -3 at (0, 0, 3), and d^2/dz^2 = 1;
+        # the biases on the inputs make their diagonal entries 1 too.  So
+        # the eigenvalues are -2, 1 and 4.
+
+    net = build('AndGateNet')
+    analysis = net.stiffness(q=[0, 0, 3])
+    [cluster] = analysis.unstable
+    assert (cluster.lowest, cluster.highest) == pytest.approx((-2.0, 4.0))
+    assert analysis.maxTimedelta == pytest.approx(0.5)
+    assert not net.stiffness(q=[1, 1, 1]).unstable
+
+
+def test_uses_the_compiled_form_if_there_is_one():
+    net = build('InverterNet')
+    assert net.finalize() is None                   # The object engine's.
+    analysis = net.stiffness()
+    net.batched = True
+    assert net.finalize() is not None
+    assert net.stiffness().maxTimedelta == analysis.maxTimedelta
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_stiffness.py
+#|==============================================================================
@@ -0,0 +1,87 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_tabulatedUnaryFunction.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of functions.tabulatedUnaryFunction:  accuracy of the
+#|      interpolated values and derivatives, and their consistency.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import random
+
+import pytest
+
+from fixed                              import Fixed
+from functions.doubleWellFunction       import DoubleWellFunction
+from functions.tabulatedUnaryFunction   import TabulatedUnaryFunction
+
+
+def well():
+    return DoubleWellFunction(0.0, 1.0, 3.0)
+
+def table(step=Fixed(1/64)):
+    return TabulatedUnaryFunction(well(), lo=-0.5, hi=1.5, step=step)
+
+
+def test_grid():
+    T = table()
+    assert (T.lo, T.hi, T.step) == (Fixed(-0.5), Fixed(1.5), Fixed(1/64))
+    assert T.size == 129
+    with pytest.raises(ValueError):
+        TabulatedUnaryFunction(well(), step=0)
+    with pytest.raises(ValueError):
+        TabulatedUnaryFunction(well(), lo=0, hi=0.001, step=0.01)
+
+
+def test_exact_at_grid_points_and_outside():
+    T, D = table(), well()
+    for i in range(T.size):
+        x = Fixed.fromQuanta(T.lo.quanta + i*T.step.quanta)
+        assert T(x) == Fixed(D(x))
+    for x in (Fixed(-2), Fixed(1.75), Fixed(3)):
+        assert T(x) == Fixed(D(x))
+
+
+def test_types():
+    T = table()
+    assert isinstance(T(Fixed(0.3)), Fixed)
+    assert isinstance(T(0.3), float)
+    assert T(0.3) == float(T(Fixed(0.3)))
+
+
+def test_error_shrinks_as_fourth_power_of_step():
+    coarse = table(Fixed(1/8)).maxError()
+    fine = table(Fixed(1/16)).maxError()
+    assert coarse < (1/8)**4/384*36       # h^4/384 * max|f''''| (= 36).
+    assert 12 < coarse/fine < 20
+    assert table().maxError() < 1e-8
+
+
+def test_derivatives_are_the_interpolants():
+    T = table(Fixed(1/8))
+    rng = random.Random(3)
+    dT = T.partialDerivWRT(0)
+    d2T = T.secondPartialDerivWRT(0, 0)
+    h = 1e-4
+    for j in range(50):
+        x = rng.uniform(-0.4, 1.4)
+        assert dT(x) == pytest.approx((T(x + h) - T(x - h))/(2*h), abs=1e-5)
+        assert d2T(x) == pytest.approx((dT(x + h) - dT(x - h))/(2*h), abs=1e-3)
+    with pytest.raises(IndexError):
+        T.secondPartialDerivWRT(0, 1)
+
+
+def test_value_and_slope_continuous_at_grid_points():
+    T = table(Fixed(1/8))
+    dT = T.partialDerivWRT(0)
+    q = T.step.quanta
+    for i in range(1, T.size - 1):
+        X = T.lo.quanta + i*q
+        for f, tol in ((T, 10), (dT, 100)):
+            left = f(Fixed.fromQuanta(X - 1)).quanta
+            right = f(Fixed.fromQuanta(X + 1)).quanta
+            assert abs(left - right) <= tol
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_tabulatedUnaryFunction.py
+#|==============================================================================
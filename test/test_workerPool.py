@@ -0,0 +1,104 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_workerPool.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of gui.workerPool:  that submitted work gets done, that
+#|      idle workers steal it, and that no submission is left waiting
+#|      for a wakeup that never comes.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import threading
+
+import pytest
+
+from gui.workerPool import WorkerPool
+
+
+    #-- done(item) - Whether the item stopped within a few seconds.
+
+def done(item, timeout=5):
+    item.stopped.wait(timeout)
+    return item.stopped()
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(4, role='testPool')
+    yield pool
+    pool.shutdown()
+
+
+def test_submit_and_map(pool):
+    item = pool.submit(lambda: 6*7)
+    assert done(item)
+    assert item.result == 42 and item.exception is None
+    assert pool.map(lambda x, y: x*y, range(10), range(10)) == \
+        [x*x for x in range(10)]
+
+
+def test_exceptions_stay_in_their_items(pool):
+    def fail():
+        raise ValueError('no')
+    item = pool.submit(fail)
+    assert done(item)
+    assert isinstance(item.exception, ValueError)
+    with pytest.raises(ValueError):
+        pool.runAll([lambda: 1, fail, lambda: 3])
+    assert pool.submit(lambda: 7).future.result(timeout=5) == 7
+
+
+def test_idle_workers_steal(pool):
+    # Hold one worker up, and put everything on its list; the others
+    # have to steal the items to get them done.
+    gate = threading.Event()
+    blocker = pool.submit(gate.wait)
+    blocker.started.wait(5)
+    busy = blocker.owner
+    victim = busy.todo
+    ran = []
+    items = []
+    with victim.lock:
+        for i in range(20):
+            items.append(pool._workItem(lambda i=i: ran.append(
+                threading.current_thread())))
+            victim.addItem(items[-1])
+    pool._wakeup(all=True)
+    try:
+        for item in items:
+            assert done(item)
+    finally:
+        gate.set()
+    assert done(blocker)
+    assert ran and busy not in ran
+
+
+def test_nested_maps(pool):
+    assert pool.runAll([lambda i=i: sum(pool.map(lambda x: x*i, range(5)))
+                        for i in range(8)]) == [10*i for i in range(8)]
+
+
+def test_no_lost_wakeups():
+    # Fresh pools, so that the workers are racing their own start-up.
+    def fail():
+        raise RuntimeError('expected')
+    for trial in range(50):
+        pool = WorkerPool(3, role='stress')
+        try:
+            assert pool.map(abs, [-1, -2, -3]) == [1, 2, 3]
+            assert done(pool.submit(fail))
+            pool.runAll([lambda: pool.map(abs, [-4, 5]) for j in range(4)])
+            assert pool.submit(lambda: 7).future.result(timeout=5) == 7
+        finally:
+            pool.shutdown()
+
+
+def test_shutdown_finishes_submitted_work():
+    pool = WorkerPool(2, role='closing')
+    items = [pool.submit(lambda i=i: i) for i in range(20)]
+    pool.shutdown()
+    assert [item.result for item in items] == list(range(20))
+    assert not any(worker.is_alive() for worker in pool.workers)
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_workerPool.py
+#|==============================================================================
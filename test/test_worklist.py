@@ -0,0 +1,132 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_worklist.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of gui.worklist's work items:  that their futures (and
+#|      awaits) always get settled, whether the item is done, fails,
+#|      is aborted or cancelled, goes stale, or is flushed, and that
+#|      worklists take items in priority order.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import asyncio
+import threading
+import time
+
+from concurrent.futures import CancelledError
+
+import pytest
+
+from gui.workerPool import WorkerPool
+from gui.worklist   import WorkItem, Worklist, WorkAborted, DeadlineExpired
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(1, role='itemTest')
+    yield pool
+    pool.shutdown()
+
+    #-- held(pool) - Holds up the pool's one worker until the returned
+    #   event is set, so that items can be lined up behind it.
+
+def held(pool):
+    gate = threading.Event()
+    pool.submit(gate.wait).started.wait(5)
+    return gate
+
+
+def test_result_and_exception(pool):
+    assert pool.submit(lambda: 5).future.result(timeout=5) == 5
+    def fail():
+        raise KeyError('x')
+    with pytest.raises(KeyError):
+        pool.submit(fail).future.result(timeout=5)
+
+
+def test_abort_before_start(pool):
+    gate = held(pool)
+    item = WorkItem(lambda: 'ran')
+    future = item.future
+    item.requestAbort()
+    pool.submit(item)
+    gate.set()
+    with pytest.raises(WorkAborted):
+        future.result(timeout=5)
+    assert item.failed() and item.stopped() and not item.done()
+    assert item.result is None
+
+
+def test_future_asked_for_after_abort(pool):
+    item = WorkItem(lambda: 'ran')
+    item.requestAbort()
+    pool.submit(item).wait()
+    with pytest.raises(WorkAborted):
+        item.future.result(timeout=5)
+
+
+def test_cancel(pool):
+    gate = held(pool)
+    ran = []
+    item = pool.submit(lambda: ran.append(1))
+    assert item.future.cancel()
+    gate.set()
+    item.stopped.wait(5)
+    assert item.stopped() and not ran
+    with pytest.raises(CancelledError):
+        item.future.result(timeout=5)
+
+
+def test_deadline(pool):
+    gate = held(pool)
+    ran = []
+    stale = pool.submit(lambda: ran.append(1), deadline=time.monotonic() + 0.01)
+    fresh = pool.submit(lambda: 'ok', deadline=time.monotonic() + 60)
+    time.sleep(0.02)
+    gate.set()
+    with pytest.raises(DeadlineExpired):
+        stale.future.result(timeout=5)
+    assert fresh.future.result(timeout=5) == 'ok'
+    assert not ran
+
+
+def test_await(pool):
+    async def main():
+        value = await asyncio.wait_for(pool.submit(lambda: 3*3), 5)
+        item = WorkItem(lambda: 'ran')
+        item.requestAbort()
+        pool.submit(item)
+        with pytest.raises(WorkAborted):
+            await asyncio.wait_for(item, 5)
+        return value
+    assert asyncio.run(main()) == 9
+
+
+def test_flush_drops_items():
+    worklist = Worklist()
+    items = [WorkItem(lambda: None) for i in range(3)]
+    for item in items:
+        worklist.addItem(item)
+    future = items[0].future
+    worklist.reset()
+    assert worklist.empty() and worklist.unfinished_tasks == 0
+    for item in items:
+        assert item.stopped() and item.failed() and not item.onWorklist()
+    with pytest.raises(WorkAborted):
+        future.result(timeout=5)
+    assert worklist.stats.snapshot()['outcomes']['dropped'] == 3
+
+
+def test_priorities(pool):
+    gate = held(pool)
+    order = []
+    items = [pool.submit(lambda p=p: order.append(p), priority=p)
+             for p in (2, 0, 1, 0, -1)]
+    gate.set()
+    for item in items:
+        item.future.result(timeout=5)
+    assert order == [-1, 0, 0, 1, 2]
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_worklist.py
+#|==============================================================================
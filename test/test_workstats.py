@@ -0,0 +1,102 @@
+#|==============================================================================
+#|                      TOP OF FILE:    test_workstats.py
+#|------------------------------------------------------------------------------
+#|
+#|      Tests of gui.workstats:  the histograms, and the depths, outcomes
+#|      and times that a worklist's stats record as its items are done.
+#|
+#|vvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvvv
+
+import threading
+import time
+
+import pytest
+
+from gui.workerPool import WorkerPool
+from gui.worklist   import WorkItem, EarlyCompletion
+from gui.workstats  import Histogram, worklistStats, formatStats
+
+
+def test_histogram_buckets():
+    h = Histogram()
+    assert h.snapshot()['n'] == 0 and h.percentile(0.5) == 0.0
+    for seconds in (0, 0.5e-6, 1e-6, 3e-6, 1000e-6, 1e6):
+        h.add(seconds)
+    assert h.counts[:3] == [2, 1, 1]
+    assert h.counts[10] == 1                # 512 <= 1000 < 1024 us.
+    assert h.counts[-1] == 1                # Way past the last bucket.
+    snap = h.snapshot()
+    assert (snap['n'], snap['max']) == (6, 1e6)
+    assert snap['mean'] == pytest.approx(sum((0, 0.5e-6, 1e-6, 3e-6, 1000e-6, 1e6))/6)
+    assert snap['p50'] == 2e-6              # Top of the third sample's bucket.
+    assert snap['p99'] == 1e6               # Capped at the max.
+
+
+    #-- run(items) - Runs the items in a one-worker pool, all queued up behind
+    #   a task that waits for them all to be there first, and returns the
+    #   snapshot of the worker's worklist's stats.
+
+def run(items):
+    pool = WorkerPool(1, role='statsTest')
+    worklist = pool.workers[0].todo
+    try:
+        gate = threading.Event()
+        pool.submit(gate.wait)
+        for item in items:
+            pool.submit(item)
+        gate.set()
+        for item in items:
+            assert item.stopped.wait(5) is not False
+            item.wait()
+        pool.submit(lambda: None).wait()
+        return worklist.stats.snapshot()
+    finally:
+        pool.shutdown()
+
+def sleepy():
+    time.sleep(0.002)
+
+def failing():
+    raise ValueError('expected')
+
+def quitting():
+    raise EarlyCompletion('expected')
+
+
+def test_outcomes_and_times():
+    aborted = WorkItem(sleepy)
+    aborted.requestAbort()
+    stale = WorkItem(sleepy, deadline=time.monotonic() - 1)
+    items = ([WorkItem(sleepy) for i in range(3)] +
+             [WorkItem(failing), WorkItem(quitting), aborted, stale])
+    snap = run(items)
+    assert snap['added'] == len(items) + 2
+    assert snap['peak'] >= len(items)
+    assert snap['depth'] == 0
+    assert snap['outcomes'] == {'done': 5, 'aborted': 1, 'failed': 1,
+                                'earlyExit': 1, 'dropped': 1}
+    assert snap['wait']['n'] == len(items) + 2
+    assert snap['wait']['max'] > 0
+    assert snap['run']['sleepy']['n'] == 4      # Stale one never ran.
+    assert snap['run']['sleepy']['max'] >= 0.002
+    assert snap['run']['failing']['n'] == 1
+    assert 'statsTest0' in worklistStats()
+
+
+def test_kinds():
+    snap = run([WorkItem(sleepy, kind='napping'), WorkItem(lambda: None)])
+    assert set(snap['run']) >= {'napping', 'test_kinds.<locals>.<lambda>'}
+
+
+def test_format():
+    snap = run([WorkItem(sleepy)])
+    text = formatStats({'w': snap, 'idle': dict(snap, added=0, peak=0)})
+    lines = text.splitlines()
+    assert lines[0].split()[:3] == ['worklist', 'depth', 'peak']
+    assert lines[1].split()[:4] == ['w', '0', str(snap['peak']), '3']
+    assert any(line.strip().startswith('sleepy') for line in lines)
+    assert not any(line.startswith('idle') for line in lines)
+
+#|^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+#|                      END OF FILE:    test_workstats.py
+#|==============================================================================